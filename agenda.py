@@ -0,0 +1,133 @@
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError
+
+# --- AGENDA DOS CUIDADORES ---
+# Pedidos com período (datas reais). A capacidade (pets por dia) é garantida
+# por um contador por cuidador+dia em `agenda_dias`, reservado com update
+# condicional: `ocupados < capacidade` no filtro + upsert. Se o dia já lotou,
+# o filtro não casa e o upsert colide no _id (DuplicateKeyError) — nenhuma
+# janela entre checar e gravar, mesmo com vários tutores ao mesmo tempo.
+PENDENTE, APROVADO, REPROVADO = "Pendente", "Aprovado", "Reprovado"
+OCUPAM = [PENDENTE, APROVADO]
+CAPACIDADE_PADRAO = 1
+MAX_DIAS = 31
+MAX_PENDENTES = 200
+
+
+class DiaLotado(Exception):
+    def __init__(self, dia):
+        super().__init__(f"Sem vaga em {dia:%d/%m/%Y}")
+        self.dia = dia
+
+
+def _meia_noite(d):
+    return datetime.combine(d.date() if isinstance(d, datetime) else d, time.min)
+
+
+def dias(inicio, fim):
+    inicio, fim = _meia_noite(inicio), _meia_noite(fim)
+    return [inicio + timedelta(days=i) for i in range((fim - inicio).days + 1)]
+
+
+def _id_dia(cuidador, dia):
+    return f"{cuidador}|{dia:%Y-%m-%d}"
+
+
+def preparar(db):
+    db.agendamentos.create_index([("cuidador_id", ASCENDING), ("data", ASCENDING), ("status", ASCENDING)])
+    db.agendamentos.create_index([("tutor_id", ASCENDING), ("data", ASCENDING)])
+    db.agenda_dias.create_index([("cuidador_id", ASCENDING), ("dia", ASCENDING)])
+    migrar_legado(db)
+
+
+def migrar_legado(db):
+    """Pedidos antigos com `data` em texto viram período de um dia e passam a contar na capacidade."""
+    for p in db.agendamentos.find({"data": {"$type": "string"}}, {"data": 1, "cuidador_id": 1, "status": 1}):
+        try:
+            dia = datetime.strptime(p["data"][:10], "%Y-%m-%d")
+        except ValueError:
+            continue
+        db.agendamentos.update_one({"_id": p["_id"]}, {"$set": {"data": dia, "fim": dia, "dias": 1}})
+        if p.get("status") in OCUPAM:
+            db.agenda_dias.update_one(
+                {"_id": _id_dia(p["cuidador_id"], dia)},
+                {"$inc": {"ocupados": 1}, "$setOnInsert": {"cuidador_id": p["cuidador_id"], "dia": dia}},
+                upsert=True,
+            )
+
+
+def _ocupar(db, cuidador, dia, capacidade):
+    filtro = {"_id": _id_dia(cuidador, dia), "ocupados": {"$lt": capacidade}}
+    try:
+        db.agenda_dias.update_one(filtro, {"$inc": {"ocupados": 1}, "$setOnInsert": {"cuidador_id": cuidador, "dia": dia}}, upsert=True)
+        return
+    except DuplicateKeyError:
+        pass
+    # o dia já existe: lotado, ou outro pedido simultâneo acabou de criá-lo — tenta sem upsert
+    if not db.agenda_dias.update_one(filtro, {"$inc": {"ocupados": 1}}).matched_count:
+        raise DiaLotado(dia)
+
+
+def _liberar(db, cuidador, lista_dias):
+    for dia, n in Counter(lista_dias).items():
+        db.agenda_dias.update_one({"_id": _id_dia(cuidador, dia), "ocupados": {"$gte": n}}, {"$inc": {"ocupados": -n}})
+
+
+def reservar(db, tutor, cuidador, inicio, fim=None, capacidade=CAPACIDADE_PADRAO):
+    """Cria o pedido se houver vaga em todos os dias; senão desfaz o que ocupou e levanta DiaLotado."""
+    periodo = dias(inicio, fim or inicio)
+    if not periodo or len(periodo) > MAX_DIAS:
+        raise ValueError(f"Período deve ter de 1 a {MAX_DIAS} dias")
+    ocupados = []
+    try:
+        for dia in periodo:
+            _ocupar(db, cuidador, dia, capacidade)
+            ocupados.append(dia)
+        return db.agendamentos.insert_one({
+            "tutor_id": tutor, "cuidador_id": cuidador, "data": periodo[0], "fim": periodo[-1], "dias": len(periodo),
+            "status": PENDENTE, "criado_em": datetime.now(),
+        }).inserted_id
+    except Exception:
+        # lotado, erro do banco no meio ou pedido que não foi gravado: nenhuma vaga fica presa sem pedido
+        _liberar(db, cuidador, ocupados)
+        raise
+
+
+def pendentes(db, cuidador, n=MAX_PENDENTES):
+    return list(db.agendamentos.find({"cuidador_id": cuidador, "status": PENDENTE}).sort("data", ASCENDING).limit(n))
+
+
+def decidir(db, cuidador, ids, status):
+    """Aprova ou reprova vários pedidos pendentes; só os que ainda estavam pendentes mudam."""
+    agora = datetime.now()
+    if status == APROVADO:
+        r = db.agendamentos.update_many(
+            {"_id": {"$in": list(ids)}, "cuidador_id": cuidador, "status": PENDENTE},
+            {"$set": {"status": APROVADO, "decidido_em": agora}},
+        )
+        return r.modified_count
+    # reprovar devolve as vagas: cada pedido é trocado de estado individualmente para
+    # saber exatamente quais saíram de Pendente (e não liberar vaga duas vezes)
+    liberados, decididos = [], 0
+    for _id in ids:
+        p = db.agendamentos.find_one_and_update(
+            {"_id": _id, "cuidador_id": cuidador, "status": PENDENTE},
+            {"$set": {"status": status, "decidido_em": agora}},
+            projection={"data": 1, "fim": 1},
+        )
+        if p:
+            decididos += 1
+            liberados.extend(dias(p["data"], p.get("fim") or p["data"]))
+    _liberar(db, cuidador, liberados)
+    return decididos
+
+
+def ocupacao(db, cuidador, inicio, fim):
+    """{dia: pedidos que ocupam o dia} no período, lido só dos contadores (índice cuidador+dia)."""
+    docs = db.agenda_dias.find(
+        {"cuidador_id": cuidador, "dia": {"$gte": _meia_noite(inicio), "$lte": _meia_noite(fim)}}, {"dia": 1, "ocupados": 1},
+    )
+    return {d["dia"]: d["ocupados"] for d in docs}
@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+# --- ARTEFATOS FORA DA MEMÓRIA (PDFs E MINIATURAS DOS SCANS) ---
+# A sessão guarda só o id; os bytes ficam em arquivos temporários do processo
+# e vão para o download_button por um callable que lê o arquivo no clique.
+# Orçamento de disco com despejo do mais antigo e TTL: um id despejado vira
+# "expirado" na tela, não erro.
+MAX_BYTES = 512 * 2 ** 20
+TTL_SEGUNDOS = 6 * 3600
+
+
+class Armazem:
+    def __init__(self, diretorio=None, max_bytes=MAX_BYTES, ttl=TTL_SEGUNDOS, clock=time.monotonic):
+        self.diretorio = tempfile.mkdtemp(prefix="technobolt_artefatos_", dir=diretorio)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._itens = OrderedDict()  # id -> (tamanho, criado_em), do mais antigo ao mais novo
+        self.bytes = 0
+        self.despejados = 0
+
+    def _caminho(self, aid):
+        return os.path.join(self.diretorio, aid)
+
+    def guardar(self, dados, sufixo=""):
+        aid = uuid.uuid4().hex + sufixo
+        with open(self._caminho(aid), "wb") as f:
+            f.write(dados)
+        with self._lock:
+            self._itens[aid] = (len(dados), self.clock())
+            self.bytes += len(dados)
+            self._podar()
+        return aid
+
+    def _podar(self):
+        limite = self.clock() - self.ttl
+        while self._itens:
+            aid, (tamanho, criado) = next(iter(self._itens.items()))
+            if self.bytes <= self.max_bytes and criado > limite:
+                break
+            self._remover(aid)
+            self.despejados += 1
+
+    def _remover(self, aid):
+        tamanho, _ = self._itens.pop(aid)
+        self.bytes -= tamanho
+        try:
+            os.remove(self._caminho(aid))
+        except FileNotFoundError:
+            pass
+
+    def existe(self, aid):
+        with self._lock:
+            self._podar()
+            return aid in self._itens
+
+    def caminho(self, aid):
+        return self._caminho(aid) if self.existe(aid) else None
+
+    def ler(self, aid):
+        """Bytes do artefato; chamado pelo download_button só no clique."""
+        with open(self._caminho(aid), "rb") as f:
+            return f.read()
+
+    def remover(self, *aids):
+        with self._lock:
+            for aid in aids:
+                if aid in self._itens:
+                    self._remover(aid)
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+            self.bytes = 0
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+
+    def stats(self):
+        with self._lock:
+            return {"itens": len(self._itens), "bytes": self.bytes, "despejados": self.despejados}
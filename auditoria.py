@@ -0,0 +1,129 @@
+import csv
+import io
+import tempfile
+from datetime import datetime, time as dtime
+
+from pymongo import ASCENDING, DESCENDING
+
+# --- AUDITORIA (ADMIN) ---
+# Filtro no servidor, páginas por keyset em (dt, _id), projeção só das colunas
+# exibidas e estatísticas via aggregation. Exportação em blocos direto do
+# cursor para um arquivo temporário (sem DataFrame gigante); o callable do
+# download_button devolve os bytes do arquivo, que o Streamlit aceita (o
+# SpooledTemporaryFile não: "Callable returned unsupported type").
+POR_PAGINA = 50
+BLOCO_EXPORT = 2000
+COLUNAS = ["dt", "sender_id", "receiver_id", "texto"]
+PROJECAO = {c: 1 for c in COLUNAS}
+ORDEM = [("dt", DESCENDING), ("_id", DESCENDING)]
+
+
+def preparar(db):
+    db.mensagens.create_index(ORDEM)
+    db.mensagens.create_index([("sender_id", ASCENDING), ("dt", DESCENDING)])
+    db.mensagens.create_index([("receiver_id", ASCENDING), ("dt", DESCENDING)])
+
+
+def filtro(inicio=None, fim=None, sender=None, receiver=None):
+    f = {}
+    faixa = {}
+    if inicio:
+        faixa["$gte"] = datetime.combine(inicio, dtime.min)
+    if fim:
+        faixa["$lte"] = datetime.combine(fim, dtime.max)
+    if faixa:
+        f["dt"] = faixa
+    if sender:
+        f["sender_id"] = sender
+    if receiver:
+        f["receiver_id"] = receiver
+    return f
+
+
+def pagina(db, f, depois=None, n=POR_PAGINA):
+    """Próxima página após o cursor `depois` = (dt, _id) da última linha vista."""
+    consulta = dict(f)
+    if depois:
+        dt, _id = depois
+        consulta = {"$and": [f, {"$or": [{"dt": {"$lt": dt}}, {"dt": dt, "_id": {"$lt": _id}}]}]}
+    docs = list(db.mensagens.find(consulta, PROJECAO).sort(ORDEM).limit(n + 1))
+    proximo = (docs[n - 1]["dt"], docs[n - 1]["_id"]) if len(docs) > n else None
+    return docs[:n], proximo
+
+
+def total(db, f):
+    return db.mensagens.count_documents(f)
+
+
+def por_dia(db, f):
+    return list(db.mensagens.aggregate([
+        {"$match": f},
+        {"$group": {"_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$dt"}}, "mensagens": {"$sum": 1}}},
+        {"$sort": {"_id": 1}},
+    ]))
+
+
+def top_senders(db, f, n=10):
+    return list(db.mensagens.aggregate([
+        {"$match": f},
+        {"$group": {"_id": "$sender_id", "mensagens": {"$sum": 1}}},
+        {"$sort": {"mensagens": -1}},
+        {"$limit": n},
+    ]))
+
+
+def _blocos(db, f, tamanho=BLOCO_EXPORT):
+    cursor = db.mensagens.find(f, PROJECAO).sort(ORDEM).batch_size(tamanho)
+    bloco = []
+    for doc in cursor:
+        bloco.append(doc)
+        if len(bloco) == tamanho:
+            yield bloco
+            bloco = []
+    if bloco:
+        yield bloco
+
+
+def _conteudo(arq):
+    with arq:
+        arq.seek(0)
+        return arq.read()
+
+
+def exportar_csv(db, f):
+    arq = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    texto = io.TextIOWrapper(arq, encoding="utf-8", newline="")
+    w = csv.writer(texto)
+    w.writerow(COLUNAS)
+    for bloco in _blocos(db, f):
+        w.writerows([[d.get(c, "") for c in COLUNAS] for d in bloco])
+    texto.flush()
+    texto.detach()
+    return _conteudo(arq)
+
+
+def exportar_parquet(db, f):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("dt", pa.timestamp("ms")), ("sender_id", pa.string()), ("receiver_id", pa.string()), ("texto", pa.string()),
+    ])
+    arq = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    with pq.ParquetWriter(arq, schema) as writer:
+        for bloco in _blocos(db, f):
+            colunas = {c: [d.get(c) for d in bloco] for c in COLUNAS}
+            writer.write_table(pa.table(colunas, schema=schema))
+    return _conteudo(arq)
+
+
+# --- CONTROLES MASTER: usuários paginados, sem a senha ---
+PROJECAO_USUARIOS = {"senha": 0, "senha_hash": 0}
+
+
+def pagina_usuarios(db, tipo=None, depois=None, n=POR_PAGINA):
+    f = {"tipo": tipo} if tipo else {}
+    if depois:
+        f["_id"] = {"$gt": depois}
+    docs = list(db.usuarios.find(f, PROJECAO_USUARIOS).sort("_id", ASCENDING).limit(n + 1))
+    return docs[:n], (docs[n - 1]["_id"] if len(docs) > n else None)
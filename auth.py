@@ -0,0 +1,134 @@
+import base64
+import functools
+import hashlib
+import hmac
+import logging
+import secrets
+from datetime import datetime, timedelta
+
+from pymongo import ReturnDocument
+from pymongo.errors import OperationFailure
+
+# --- CREDENCIAIS E SESSÕES ---
+# Senhas com scrypt e sal por usuário. O custo vai gravado no próprio hash:
+# subir CUSTO_SCRYPT não invalida senhas antigas, o login regrava com o novo.
+# Contas antigas em texto puro migram no primeiro login. A sessão é um token
+# assinado (HMAC) guardado em cookie; o registro em `sessions` expira por TTL.
+CUSTO_SCRYPT = 14  # N = 2**14: ~16 MB e dezenas de ms por verificação
+SCRYPT_R, SCRYPT_P = 8, 1
+DURACAO_SESSAO = timedelta(days=7)
+COOKIE = "tb_sessao"
+PROJECAO_LOGIN = {"usuario": 1, "senha": 1, "senha_hash": 1}
+
+log = logging.getLogger("technobolt.auth")
+
+
+def _b64(dados):
+    return base64.urlsafe_b64encode(dados).decode().rstrip("=")
+
+
+def _de_b64(texto):
+    return base64.urlsafe_b64decode(texto + "=" * (-len(texto) % 4))
+
+
+def _scrypt(senha, sal, custo, r, p):
+    return hashlib.scrypt(senha.encode(), salt=sal, n=2 ** custo, r=r, p=p, maxmem=256 * 2 ** custo * r, dklen=32)
+
+
+def gerar_hash(senha, custo=CUSTO_SCRYPT):
+    sal = secrets.token_bytes(16)
+    return f"scrypt${custo}${SCRYPT_R}${SCRYPT_P}${_b64(sal)}${_b64(_scrypt(senha, sal, custo, SCRYPT_R, SCRYPT_P))}"
+
+
+def _partes(armazenado):
+    _, custo, r, p, sal, esperado = armazenado.split("$")
+    return int(custo), int(r), int(p), _de_b64(sal), _de_b64(esperado)
+
+
+def verificar(senha, armazenado):
+    try:
+        custo, r, p, sal, esperado = _partes(armazenado)
+    except ValueError:
+        return False
+    return hmac.compare_digest(_scrypt(senha, sal, custo, r, p), esperado)
+
+
+def precisa_rehash(armazenado, custo=CUSTO_SCRYPT):
+    return _partes(armazenado)[:3] != (custo, SCRYPT_R, SCRYPT_P)
+
+
+@functools.lru_cache(maxsize=1)
+def _hash_falso():
+    return gerar_hash(secrets.token_urlsafe(16))
+
+
+def preparar(db):
+    try:
+        db.usuarios.create_index("usuario", unique=True)
+    except OperationFailure as e:
+        # usuários duplicados de antes do índice: o app segue, mas avisa no log
+        log.warning("índice único em usuarios.usuario não criado: %s", e)
+    db.sessions.create_index("expira_em", expireAfterSeconds=0)
+
+
+def autenticar(db, usuario, senha, custo=CUSTO_SCRYPT):
+    """`usuario` se a senha confere; senão None. Regrava o hash se o custo mudou."""
+    doc = db.usuarios.find_one({"usuario": usuario}, PROJECAO_LOGIN)
+    if doc is None:
+        verificar(senha, _hash_falso())  # mesmo tempo de resposta para usuário inexistente
+        return None
+    if doc.get("senha_hash"):
+        if not verificar(senha, doc["senha_hash"]):
+            return None
+        if precisa_rehash(doc["senha_hash"], custo):
+            db.usuarios.update_one({"_id": doc["_id"]}, {"$set": {"senha_hash": gerar_hash(senha, custo)}})
+        return usuario
+    legado = doc.get("senha")
+    if legado is None or not hmac.compare_digest(str(legado).encode(), senha.encode()):
+        return None
+    db.usuarios.update_one({"_id": doc["_id"]}, {"$set": {"senha_hash": gerar_hash(senha, custo)}, "$unset": {"senha": ""}})
+    return usuario
+
+
+# --- SESSÕES ---
+def chave_sessao(db, secrets_app):
+    """Chave do HMAC: SESSION_SECRET das secrets ou, sem ela, uma gerada e guardada no banco."""
+    if secrets_app.get("SESSION_SECRET"):
+        return secrets_app["SESSION_SECRET"].encode()
+    doc = db.config.find_one_and_update(
+        {"_id": "sessao"}, {"$setOnInsert": {"chave": secrets.token_urlsafe(32)}}, upsert=True, return_document=ReturnDocument.AFTER,
+    )
+    return doc["chave"].encode()
+
+
+def _assinar(chave, sid):
+    return _b64(hmac.new(chave, sid.encode(), hashlib.sha256).digest())
+
+
+def criar_sessao(db, chave, usuario, duracao=DURACAO_SESSAO):
+    sid = secrets.token_urlsafe(24)
+    agora = datetime.now()
+    db.sessions.insert_one({"_id": sid, "usuario": usuario, "criado_em": agora, "expira_em": agora + duracao})
+    return f"{sid}.{_assinar(chave, sid)}"
+
+
+def _sid(chave, token):
+    sid, _, assinatura = (token or "").partition(".")
+    if sid and assinatura and hmac.compare_digest(_assinar(chave, sid), assinatura):
+        return sid
+    return None
+
+
+def restaurar(db, chave, token):
+    """Usuário dono do token, ou None. Token forjado nem chega ao banco."""
+    sid = _sid(chave, token)
+    if sid is None:
+        return None
+    doc = db.sessions.find_one({"_id": sid, "expira_em": {"$gt": datetime.now()}}, {"usuario": 1})
+    return doc["usuario"] if doc else None
+
+
+def encerrar(db, chave, token):
+    sid = _sid(chave, token)
+    if sid:
+        db.sessions.delete_one({"_id": sid})
@@ -0,0 +1,117 @@
+"""Tempo de render por aba de cada perfil (AppTest headless + mongomock).
+
+Uso: python benchmarks/bench_abas.py [--cuidadores 200] [--mensagens 500] [--repeat 5]
+
+Sobe o app.py com um MongoDB em memória (mongomock) populado, faz login como
+Admin, Cuidador e Tutor e abre cada aba `--repeat` vezes. Para cada aba mostra
+o tempo do rerun inteiro e o tempo só do corpo da aba (`tempo_aba`, o mesmo
+que aparece com ?perf=1). Antes das abas sob demanda todo rerun executava o
+corpo de todas as abas do perfil; a linha "antes" é essa soma.
+
+O mongomock não tem latência de rede: com um MongoDB remoto a diferença é maior.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import warnings
+from datetime import date, datetime, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+LANCADOR = f"""
+import sys
+sys.path.insert(0, {RAIZ!r})
+import db
+import bench_abas
+db.MongoClient = lambda *a, **k: bench_abas.CLIENTE
+exec(compile(open({os.path.join(RAIZ, "app.py")!r}).read(), "app.py", "exec"), {{"__name__": "__main__"}})
+"""
+
+ABAS = {
+    "Admin": ("adm", "abas_admin", ["🏠 Instruções", "💬 Auditoria de Chats", "⚙️ Controles Master", "⚡ Performance"]),
+    "Cuidador": ("cui", "abas_cuidador", ["🏠 Instruções", "👤 Perfil", "📅 Agendamentos", "💬 Mensagens"]),
+    "Tutor": ("tut", "abas_tutor", ["🏠 Instruções", "🧬 PetScan IA", "🤝 Cuidadores", "💬 Chats"]),
+}
+CLIENTE = None
+
+
+def popular(db, n_cuidadores, n_mensagens):
+    import auth
+
+    senha = auth.gerar_hash("x", 10)
+    db.usuarios.insert_many([
+        {"nome": u.upper(), "usuario": u, "senha_hash": senha, "tipo": t, "status": "Ativo", "rating": 5.0, "valores": 100}
+        for u, t in [("tut", "Tutor"), ("cui", "Cuidador"), ("adm", "Admin")]
+    ])
+    db.usuarios.insert_many([
+        {"nome": f"Cuidador {i}", "usuario": f"c{i}", "senha_hash": senha, "tipo": "Cuidador", "status": "Ativo",
+         "rating": i % 5, "valores": 50 + i, "endereco": f"Rua {i}"}
+        for i in range(n_cuidadores)
+    ])
+    agora = datetime.now()
+    db.mensagens.insert_many([
+        {"sender_id": ("tut", "cui")[i % 2], "receiver_id": ("cui", "tut")[i % 2], "texto": f"mensagem {i}", "dt": agora - timedelta(minutes=i)}
+        for i in range(n_mensagens)
+    ])
+    db.pets.insert_one({"owner_id": "tut", "nome": "Rex", "especie": "Cão"})
+    for i in range(10):
+        db.agendamentos.insert_one({"tutor_id": "tut", "cuidador_id": "cui", "data": str(date.today() + timedelta(days=i)), "status": "Pendente"})
+
+
+def abrir_sessao(usuario):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_string(LANCADOR, default_timeout=60)
+    at.secrets["MONGO_URI"] = "mongodb://bench"
+    at.run()
+    at.text_input[0].input(usuario)
+    at.text_input[1].input("x")
+    at.button[0].click()
+    at.run()
+    assert not at.exception, at.exception
+    return at
+
+
+def main():
+    global CLIENTE
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cuidadores", type=int, default=200)
+    ap.add_argument("--mensagens", type=int, default=500)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+    warnings.filterwarnings("ignore")
+
+    import mongomock
+    import streamlit.logger
+
+    streamlit.logger.set_log_level("error")
+    sys.modules["bench_abas"] = sys.modules[__name__]
+    CLIENTE = mongomock.MongoClient()
+    popular(CLIENTE["technoboltpets"], args.cuidadores, args.mensagens)
+
+    for perfil, (usuario, chave, abas) in ABAS.items():
+        at = abrir_sessao(usuario)
+        print(f"\n{perfil}")
+        soma = 0.0
+        for aba in abas:
+            reruns, corpos = [], []
+            for _ in range(args.repeat):
+                at.session_state[chave] = aba
+                t0 = time.perf_counter()
+                at.run()
+                reruns.append((time.perf_counter() - t0) * 1000)
+                assert not at.exception, at.exception
+                nome, ms = at.session_state["tempo_aba"]
+                assert nome == aba, (nome, aba)
+                corpos.append(ms)
+            corpo = statistics.median(corpos)
+            soma += corpo
+            print(f"  {aba:<24} rerun={statistics.median(reruns):7.1f} ms  só a aba={corpo:7.1f} ms")
+        print(f"  {'antes (todas por rerun)':<24} corpo das abas={soma:7.1f} ms em todo rerun")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Exportação da auditoria (CSV e Parquet) pelo mesmo caminho do clique no download_button.
+
+Uso:
+    python benchmarks/bench_auditoria.py [--mensagens 50000]
+    python benchmarks/bench_auditoria.py --mongo-uri mongodb://localhost:27017 --mensagens 500000
+
+Semeia mensagens num banco descartável (`technoboltpets_bench_auditoria`;
+mongomock sem --mongo-uri), registra o callable de cada exportação num
+MediaFileManager como o st.download_button faz e executa o deferred como no
+clique (`execute_deferred`: o Streamlit recusa tipos que não sabe converter).
+Confere o número de linhas de cada arquivo e mede tempo e pico de memória
+Python (tracemalloc). Código de saída 1 se alguma exportação falhar.
+"""
+import argparse
+import csv
+import io
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auditoria  # noqa: E402
+
+NOME_DB = "technoboltpets_bench_auditoria"
+
+
+def semear(db, n, seed):
+    rng = random.Random(seed)
+    inicio = datetime.combine(date.today() - timedelta(days=90), datetime.min.time())
+    usuarios = [f"u{i}" for i in range(200)]
+    for i in range(0, n, 10000):
+        db.mensagens.insert_many([{
+            "sender_id": rng.choice(usuarios), "receiver_id": rng.choice(usuarios),
+            "texto": f"mensagem {j} " + "x" * rng.randint(0, 120),
+            "dt": inicio + timedelta(seconds=rng.randint(0, 90 * 86400)),
+        } for j in range(i, min(n, i + 10000))])
+    auditoria.preparar(db)
+
+
+def linhas_csv(dados):
+    return sum(1 for _ in csv.reader(io.StringIO(dados.decode("utf-8")))) - 1
+
+
+def linhas_parquet(dados):
+    import pyarrow.parquet as pq
+
+    return pq.read_table(io.BytesIO(dados)).num_rows
+
+
+def baixar(gerenciador, callable_, mime):
+    # o que o st.download_button registra na renderização e o servidor executa no clique
+    file_id = gerenciador.add_deferred(callable_, mime, "bench")
+    url = gerenciador.execute_deferred(file_id)
+    return gerenciador._storage.get_file(url.rsplit("/", 1)[-1]).content
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mensagens", type=int, default=50000)
+    ap.add_argument("--mongo-uri")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    import streamlit.logger
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+    streamlit.logger.set_log_level("error")
+    if args.mongo_uri:
+        from pymongo import MongoClient
+
+        cliente = MongoClient(args.mongo_uri)
+    else:
+        import mongomock
+
+        cliente = mongomock.MongoClient()
+    cliente.drop_database(NOME_DB)
+    db = cliente[NOME_DB]
+    gerenciador = MediaFileManager(MemoryMediaFileStorage("/media"))
+    falhas = 0
+    try:
+        semear(db, args.mensagens, args.seed)
+        f = auditoria.filtro()
+        print(f"{args.mensagens} mensagens")
+        for nome, exportar, mime, contar in (
+            ("CSV", auditoria.exportar_csv, "text/csv", linhas_csv),
+            ("Parquet", auditoria.exportar_parquet, "application/octet-stream", linhas_parquet),
+        ):
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            try:
+                dados = baixar(gerenciador, lambda: exportar(db, f), mime)
+            except Exception as e:
+                tracemalloc.stop()
+                print(f"{nome:<8} FALHOU: {e}")
+                falhas += 1
+                continue
+            ms = (time.perf_counter() - t0) * 1000
+            pico = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            linhas = contar(dados)
+            ok = linhas == args.mensagens
+            falhas += not ok
+            print(f"{nome:<8} {ms:8.0f} ms  {len(dados) / 2 ** 20:6.1f} MB  pico {pico / 2 ** 20:6.1f} MB  "
+                  f"{linhas} linhas {'ok' if ok else 'DIVERGENTE'}")
+    finally:
+        cliente.drop_database(NOME_DB)
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == "__main__":
+    main()
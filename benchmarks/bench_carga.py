@@ -0,0 +1,467 @@
+"""Teste de carga dos fluxos por perfil: AppTest headless + MongoDB local + Gemini falso.
+
+Uso:
+    python benchmarks/bench_carga.py [--tutores 50] [--cuidadores 10] [--admins 2] [--rodadas 3]
+    python benchmarks/bench_carga.py --cuidadores-base 2000 --mensagens 20000 --agendamentos 3000
+    python benchmarks/bench_carga.py --latencia-ia 1.5 --erro-ia 0.1 --chaves 2
+    python benchmarks/bench_carga.py --mongo-uri "mongodb://localhost:27017" --salvar base.json
+    python benchmarks/bench_carga.py --comparar base.json [--tolerancia 0.25]
+
+Popula usuários, pets, cuidadores, mensagens e agendamentos sintéticos na
+escala pedida, abre uma sessão do app.py por usuário (login incluso) e, a cada
+rodada, cada sessão percorre a jornada do seu perfil:
+  - Tutor: PetScan (upload + laudo em streaming + PDF), busca de cuidadores,
+    mensagem e pedido de agendamento, chat;
+  - Cuidador: agenda (aprova os pedidos pendentes), mensagens, perfil;
+  - Admin: auditoria, controles, performance.
+O `call_ia` vai para o `FakeGemini` (latência e taxa de erro ajustáveis) no
+lugar do SDK, via `model_factory` do IARouter.
+
+Relatório por perfil e passo: latência do rerun (p50/p95/máx), comandos ao
+MongoDB por rerun (spans `mongo` do próprio coletor de telemetria) e memória
+por sessão (tamanho do session_state de cada sessão ao final).
+
+O AppTest troca estado global do Streamlit a cada run (runtime, secrets),
+então as sessões são intercaladas numa thread só: N sessões vivas ao mesmo
+tempo, um rerun por vez. Concorrência real nos recursos compartilhados está
+em stress_agenda.py, bench_router.py e bench_chat.py.
+
+Sem --mongo-uri usa mongomock, que não dispara command monitoring: um proxy
+do cliente gera os eventos para os listeners do app (1 evento por chamada de
+coleção). Com --mongo-uri os números vêm do driver, num banco temporário
+apagado ao final.
+
+Regressões (código de saída 1, com --comparar): p95 de rerun, comandos por
+rerun ou memória por sessão de um perfil acima da base + tolerância.
+"""
+import argparse
+import gc
+import io
+import itertools
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import types
+import warnings
+from collections import defaultdict
+from datetime import date, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from fake_gemini import FakeGemini  # noqa: E402
+from ia_router import percentil  # noqa: E402
+
+NOME_DB = "technoboltpets_bench_carga"
+LANCADOR = f"""
+import sys
+sys.path.insert(0, {RAIZ!r})
+import functools
+import db
+import recursos
+import bench_carga
+from ia_router import IARouter
+db.NOME_DB = bench_carga.NOME_DB
+if bench_carga.CLIENTE is not None:
+    db.MongoClient = lambda *a, **k: bench_carga.ClienteMonitorado(bench_carga.CLIENTE, k.get("event_listeners", []))
+recursos.IARouter = functools.partial(IARouter, model_factory=bench_carga.FAKE)
+exec(compile(open({os.path.join(RAIZ, "app.py")!r}).read(), "app.py", "exec"), {{"__name__": "__main__"}})
+"""
+CLIENTE = None
+FAKE = None
+
+
+# --- MONGOMOCK COM COMMAND MONITORING ---
+class _Evento:
+    """O que os listeners do app leem de CommandStarted/Succeeded/FailedEvent."""
+
+    def __init__(self, request_id, command_name, command, database_name, duration_micros=0):
+        self.request_id = request_id
+        self.command_name = command_name
+        self.command = command
+        self.database_name = database_name
+        self.duration_micros = duration_micros
+
+
+_IDS = itertools.count()
+# método da coleção -> comando do servidor (o que o driver mandaria)
+COMANDOS = {
+    "find": "find", "find_one": "find", "count_documents": "aggregate", "estimated_document_count": "count",
+    "aggregate": "aggregate", "distinct": "distinct",
+    "insert_one": "insert", "insert_many": "insert", "update_one": "update", "update_many": "update",
+    "replace_one": "update", "delete_one": "delete", "delete_many": "delete", "bulk_write": "bulkWrite",
+    "find_one_and_update": "findAndModify", "find_one_and_replace": "findAndModify", "find_one_and_delete": "findAndModify",
+    "create_index": "createIndexes", "create_indexes": "createIndexes",
+}
+
+
+class _ColecaoMonitorada:
+    def __init__(self, colecao, listeners):
+        self._colecao, self._listeners = colecao, listeners
+
+    def __getattr__(self, nome):
+        attr = getattr(self._colecao, nome)
+        comando = COMANDOS.get(nome)
+        if comando is None:
+            return attr
+
+        def chamar(*a, **kw):
+            filtro = a[0] if a and isinstance(a[0], dict) else kw.get("filter", {})
+            inicio = _Evento(next(_IDS), comando, {comando: self._colecao.name, "filter": filtro}, self._colecao.database.name)
+            for l in self._listeners:
+                l.started(inicio)
+            t0 = time.perf_counter()
+            try:
+                r = attr(*a, **kw)
+            except Exception:
+                fim = _Evento(inicio.request_id, comando, None, inicio.database_name, int((time.perf_counter() - t0) * 1e6))
+                for l in self._listeners:
+                    l.failed(fim)
+                raise
+            fim = _Evento(inicio.request_id, comando, None, inicio.database_name, int((time.perf_counter() - t0) * 1e6))
+            for l in self._listeners:
+                l.succeeded(fim)
+            return r
+        return chamar
+
+
+class _BancoMonitorado:
+    def __init__(self, banco, listeners):
+        self._banco, self._listeners = banco, listeners
+
+    def __getattr__(self, nome):
+        attr = getattr(self._banco, nome)
+        return _ColecaoMonitorada(attr, self._listeners) if hasattr(attr, "insert_one") else attr
+
+    def __getitem__(self, nome):
+        return _ColecaoMonitorada(self._banco[nome], self._listeners)
+
+
+class ClienteMonitorado:
+    def __init__(self, cliente, listeners):
+        self._cliente, self._listeners = cliente, listeners
+
+    def __getattr__(self, nome):
+        return getattr(self._cliente, nome)
+
+    def __getitem__(self, nome):
+        return _BancoMonitorado(self._cliente[nome], self._listeners)
+
+
+# --- DADOS SINTÉTICOS ---
+def semear(db, args, rng):
+    import agenda
+    import auth
+    import chat
+
+    senha = auth.gerar_hash("x", 10)
+    tutores = [f"t{i}" for i in range(args.tutores)]
+    cuidadores = [f"c{i}" for i in range(max(args.cuidadores_base, args.cuidadores))]
+    admins = [f"a{i}" for i in range(args.admins)]
+    db.usuarios.insert_many(
+        [{"nome": f"Tutor {u[1:]}", "usuario": u, "senha_hash": senha, "tipo": "Tutor", "status": "Ativo"} for u in tutores]
+        + [{"nome": f"Cuidador {u[1:]}", "usuario": u, "senha_hash": senha, "tipo": "Cuidador", "status": "Ativo",
+            "rating": rng.uniform(3, 5), "rating_count": rng.randint(0, 50), "valores": rng.randint(40, 300),
+            "endereco": f"Rua {u[1:]}", "capacidade": rng.randint(1, 4)} for u in cuidadores]
+        + [{"nome": f"Admin {u[1:]}", "usuario": u, "senha_hash": senha, "tipo": "Admin", "status": "Ativo"} for u in admins]
+    )
+    db.pets.insert_many([
+        {"owner_id": t, "nome": f"Pet {t}-{j}", "especie": rng.choice(["Cão", "Gato"])}
+        for t in tutores for j in range(args.pets)
+    ])
+    # mensagens e pedidos concentrados nos cuidadores com sessão (os que aprovam e respondem)
+    ativos = cuidadores[:max(args.cuidadores, 1)]
+    for i in range(args.mensagens):
+        t, c = rng.choice(tutores), rng.choice(ativos)
+        chat.enviar(db, *((t, c) if i % 2 else (c, t)), f"mensagem {i}")
+    hoje = date.today()
+    for _ in range(args.agendamentos):
+        inicio = hoje + timedelta(days=rng.randint(0, 30))
+        try:
+            agenda.reservar(db, rng.choice(tutores), rng.choice(ativos), inicio, inicio + timedelta(days=rng.randint(0, 2)), 4)
+        except (agenda.DiaLotado, ValueError):
+            pass
+    return tutores, cuidadores[:args.cuidadores], admins
+
+
+def foto(i, lado=1200):
+    # uma foto diferente por tutor: o primeiro scan vai ao modelo, a repetição sai do cache
+    from PIL import Image, ImageDraw
+
+    img = Image.new("RGB", (lado, lado * 3 // 4), ((i * 37) % 256, (i * 91) % 256, 140))
+    draw = ImageDraw.Draw(img)
+    for x in range(0, lado, 24):
+        draw.line([(x, 0), (lado - x, lado)], fill=(x % 256, (x + i) % 256, 60), width=3)
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=88)
+    return buf.getvalue()
+
+
+# --- MEDIÇÃO ---
+class Medidor:
+    """Latência de cada `at.run()` e os spans `mongo` que ele gerou (lidos do arquivo do coletor)."""
+
+    def __init__(self, arquivo):
+        self.arquivo = arquivo
+        self._pos = 0
+        self.amostras = defaultdict(list)
+
+    def _spans_novos(self):
+        import recursos
+
+        recursos.obter_coletor().descarregar()
+        with open(self.arquivo, encoding="utf-8") as f:
+            f.seek(self._pos)
+            linhas = f.readlines()
+            self._pos = f.tell()
+        return [json.loads(l) for l in linhas]
+
+    def rodar(self, at, perfil, passo):
+        t0 = time.perf_counter()
+        at.run()
+        ms = (time.perf_counter() - t0) * 1000
+        if at.exception:
+            raise RuntimeError(f"{perfil}/{passo}: {at.exception[0].message}")
+        # só os comandos da thread do script (o stream do chat roda fora de qualquer rerun)
+        spans = [s for s in self._spans_novos() if s["rerun"] is not None]
+        mongo = [s for s in spans if s["tipo"] == "mongo"]
+        self.amostras[(perfil, passo)].append({
+            "ms": ms, "mongo": len(mongo), "mongo_ms": sum(s["ms"] for s in mongo),
+            "ia": sum(s["tipo"] == "ia" for s in spans),
+        })
+
+
+def tamanho(obj):
+    """Bytes alcançáveis a partir de `obj` (sem módulos, classes e funções, que são do processo)."""
+    vistos, pilha, total = set(), [obj], 0
+    while pilha:
+        o = pilha.pop()
+        if id(o) in vistos or isinstance(o, (type, types.ModuleType, types.FunctionType, types.MethodType, types.BuiltinFunctionType)):
+            continue
+        vistos.add(id(o))
+        total += sys.getsizeof(o)
+        pilha.extend(gc.get_referents(o))
+    return total
+
+
+# --- JORNADAS ---
+def _botao(at, rotulo):
+    return next(b for b in at.button if b.label == rotulo)
+
+
+def _chave(widgets, prefixo):
+    # resto da key do primeiro widget com esse prefixo (ex.: t_<cuidador>, tut_res_<thread>)
+    return next((w.key[len(prefixo):] for w in widgets if w.key and w.key.startswith(prefixo)), None)
+
+
+def abrir_sessao(med, perfil, usuario, secrets):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_string(LANCADOR, default_timeout=120)
+    at.secrets.update(secrets)
+    med.rodar(at, perfil, "tela de login")
+    at.text_input[0].input(usuario)
+    at.text_input[1].input("x")
+    at.button[0].click()
+    med.rodar(at, perfil, "login")
+    return at
+
+
+def aba(med, at, perfil, chave, nome):
+    at.session_state[chave] = nome
+    med.rodar(at, perfil, nome)
+
+
+def jornada_tutor(med, at, ctx):
+    perfil, n = "Tutor", ctx["n"]
+    aba(med, at, perfil, "abas_tutor", "🧬 PetScan IA")
+    at.file_uploader[0].set_value((f"pet_{n}.jpg", ctx["foto"], "image/jpeg"))
+    med.rodar(at, perfil, "upload")
+    _botao(at, "EXECUTAR SCAN").click()
+    med.rodar(at, perfil, "scan (IA + PDF)")
+
+    aba(med, at, perfil, "abas_tutor", "🤝 Cuidadores")
+    if not at.button(key="cb_next").disabled:
+        at.button(key="cb_next").click()
+        med.rodar(at, perfil, "cuidadores: próxima página")
+    lista = at.selectbox(key="cb_aberto_" + _chave(at.selectbox, "cb_aberto_"))
+    if len(lista.options) < 2:
+        return
+    lista.select_index(ctx["rng"].randrange(1, len(lista.options)))
+    med.rodar(at, perfil, "cuidadores: abrir")
+    aberto = _chave(at.text_area, "t_")
+    at.text_area(key=f"t_{aberto}").input(f"olá de {ctx['usuario']}")
+    at.button(key=f"s_{aberto}").click()
+    med.rodar(at, perfil, "cuidadores: mensagem")
+    inicio = date.today() + timedelta(days=ctx["rng"].randint(1, 20))
+    at.date_input(key=f"d_{aberto}").set_value((inicio, inicio + timedelta(days=1)))
+    at.button(key=f"r_{aberto}").click()
+    med.rodar(at, perfil, "cuidadores: agendar")
+
+    aba(med, at, perfil, "abas_tutor", "💬 Chats")
+    _conversar(med, at, perfil, "tut", ctx)
+
+
+def jornada_cuidador(med, at, ctx):
+    perfil = "Cuidador"
+    aba(med, at, perfil, "abas_cuidador", "📅 Agendamentos")
+    if _chave(at.checkbox, "ag_todos") is not None:
+        at.checkbox(key="ag_todos").check()
+        med.rodar(at, perfil, "agenda: selecionar")
+        at.button(key="ag_aprovar").click()
+        med.rodar(at, perfil, "agenda: aprovar")
+    aba(med, at, perfil, "abas_cuidador", "💬 Mensagens")
+    _conversar(med, at, perfil, "cuid", ctx)
+    aba(med, at, perfil, "abas_cuidador", "👤 Perfil")
+
+
+def jornada_admin(med, at, ctx):
+    for nome in ("💬 Auditoria de Chats", "⚙️ Controles Master", "⚡ Performance", "🏠 Instruções"):
+        aba(med, at, "Admin", "abas_admin", nome)
+
+
+def _conversar(med, at, perfil, prefixo, ctx):
+    # conversa aberta = a primeira da lista (a mais recente)
+    tid = _chave(at.text_input, f"{prefixo}_res_")
+    if tid is None:
+        return
+    at.text_input(key=f"{prefixo}_res_{tid}").input(f"resposta de {ctx['usuario']}")
+    at.button(key=f"{prefixo}_btn_{tid}").click()
+    med.rodar(at, perfil, "chat: enviar")
+
+
+JORNADAS = {"Tutor": jornada_tutor, "Cuidador": jornada_cuidador, "Admin": jornada_admin}
+
+
+# --- RELATÓRIO ---
+def resumir(med, memoria):
+    por_perfil = defaultdict(lambda: {"ms": [], "mongo": []})
+    print(f"{'perfil':<9} {'passo':<28} {'n':>4} {'p50':>8} {'p95':>8} {'máx':>8} {'mongo/rerun':>12} {'mongo ms':>9} {'ia':>4}")
+    for (perfil, passo), amostras in sorted(med.amostras.items(), key=lambda x: x[0][0]):
+        ms = [a["ms"] for a in amostras]
+        mongo = [a["mongo"] for a in amostras]
+        por_perfil[perfil]["ms"] += ms
+        por_perfil[perfil]["mongo"] += mongo
+        print(f"{perfil:<9} {passo:<28} {len(ms):4d} {percentil(ms, .5):6.1f}ms {percentil(ms, .95):6.1f}ms {max(ms):6.1f}ms "
+              f"{sum(mongo) / len(mongo):12.1f} {sum(a['mongo_ms'] for a in amostras) / len(amostras):7.1f}ms "
+              f"{sum(a['ia'] for a in amostras):4d}")
+    resultado = {}
+    print()
+    for perfil, v in sorted(por_perfil.items()):
+        mem = memoria.get(perfil, [0])
+        resultado[perfil] = {
+            "reruns": len(v["ms"]), "p50_ms": percentil(v["ms"], .5), "p95_ms": percentil(v["ms"], .95),
+            "mongo_por_rerun": sum(v["mongo"]) / len(v["mongo"]),
+            "memoria_sessao_kb": sum(mem) / len(mem) / 1024, "memoria_sessao_max_kb": max(mem) / 1024,
+        }
+        r = resultado[perfil]
+        print(f"{perfil:<9} reruns={r['reruns']:5d}  p50={r['p50_ms']:7.1f} ms  p95={r['p95_ms']:7.1f} ms  "
+              f"mongo/rerun={r['mongo_por_rerun']:5.1f}  session_state={r['memoria_sessao_kb']:8.1f} KB (máx {r['memoria_sessao_max_kb']:.1f} KB)")
+    return resultado
+
+
+def comparar(resultado, base, tolerancia):
+    falhas = []
+    for perfil, r in resultado.items():
+        antes = base.get(perfil)
+        if not antes:
+            continue
+        for campo in ("p95_ms", "mongo_por_rerun", "memoria_sessao_kb"):
+            if antes[campo] and r[campo] > antes[campo] * (1 + tolerancia):
+                falhas.append(f"{perfil}/{campo}: {antes[campo]:.1f} -> {r[campo]:.1f}")
+    return falhas
+
+
+def main():
+    global CLIENTE, FAKE
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tutores", type=int, default=50, help="sessões de tutor (e tutores semeados)")
+    ap.add_argument("--cuidadores", type=int, default=10, help="sessões de cuidador")
+    ap.add_argument("--admins", type=int, default=2, help="sessões de admin")
+    ap.add_argument("--cuidadores-base", type=int, default=200, help="cuidadores semeados (inclui os com sessão)")
+    ap.add_argument("--pets", type=int, default=2, help="pets por tutor")
+    ap.add_argument("--mensagens", type=int, default=2000)
+    ap.add_argument("--agendamentos", type=int, default=300)
+    ap.add_argument("--rodadas", type=int, default=3, help="jornadas por sessão")
+    ap.add_argument("--latencia-ia", type=float, default=0.3, help="segundos por resposta do modelo falso")
+    ap.add_argument("--erro-ia", type=float, default=0.05, help="fração de respostas 503")
+    ap.add_argument("--chaves", type=int, default=3, help="chaves Gemini (falsas)")
+    ap.add_argument("--mongo-uri")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--salvar")
+    ap.add_argument("--comparar")
+    ap.add_argument("--tolerancia", type=float, default=0.25)
+    args = ap.parse_args()
+    warnings.filterwarnings("ignore")
+
+    import streamlit.logger
+
+    streamlit.logger.set_log_level("error")
+    sys.modules["bench_carga"] = sys.modules[__name__]
+    rng = random.Random(args.seed)
+    FAKE = FakeGemini(latencia=args.latencia_ia, taxa_erro=args.erro_ia, seed=args.seed)
+    if args.mongo_uri:
+        from pymongo import MongoClient
+
+        banco = MongoClient(args.mongo_uri)[NOME_DB]
+        banco.client.drop_database(NOME_DB)
+    else:
+        import mongomock
+
+        CLIENTE = mongomock.MongoClient()
+        banco = CLIENTE[NOME_DB]
+    spans = tempfile.NamedTemporaryFile(prefix="bench_carga_", suffix=".jsonl", delete=False).name
+    secrets = {"MONGO_URI": args.mongo_uri or "mongodb://bench", "SPANS_ARQUIVO": spans,
+               **{f"GEMINI_CHAVE_{i}": f"fake-{i}" for i in range(1, args.chaves + 1)}}
+
+    try:
+        t0 = time.perf_counter()
+        tutores, cuidadores, admins = semear(banco, args, rng)
+        print(f"semeado em {time.perf_counter() - t0:.1f}s: {len(tutores)} tutores, {args.cuidadores_base} cuidadores, "
+              f"{args.mensagens} mensagens, {args.agendamentos} agendamentos")
+        med = Medidor(spans)
+        sessoes = []
+        t0 = time.perf_counter()
+        for perfil, usuarios in (("Tutor", tutores), ("Cuidador", cuidadores), ("Admin", admins)):
+            for n, u in enumerate(usuarios):
+                ctx = {"n": n, "usuario": u, "rng": random.Random(args.seed + n), "cuidadores": cuidadores or ["c0"]}
+                if perfil == "Tutor":
+                    ctx["foto"] = foto(n)
+                sessoes.append((perfil, abrir_sessao(med, perfil, u, secrets), ctx))
+        print(f"{len(sessoes)} sessões abertas em {time.perf_counter() - t0:.1f}s")
+
+        t0 = time.perf_counter()
+        for _ in range(args.rodadas):
+            # intercalado: todas as sessões continuam vivas entre os próprios reruns
+            for perfil, at, ctx in sessoes:
+                JORNADAS[perfil](med, at, ctx)
+        print(f"{args.rodadas} rodadas em {time.perf_counter() - t0:.1f}s · modelo falso: {FAKE.chamadas} chamadas\n")
+
+        memoria = defaultdict(list)
+        for perfil, at, _ in sessoes:
+            memoria[perfil].append(tamanho(at.session_state._state))
+        resultado = resumir(med, memoria)
+        print(f"\npico de RSS do processo: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    finally:
+        os.unlink(spans)
+        if args.mongo_uri:
+            banco.client.drop_database(NOME_DB)
+
+    if args.salvar:
+        with open(args.salvar, "w") as f:
+            json.dump(resultado, f, indent=2)
+    falhas = []
+    if args.comparar:
+        with open(args.comparar) as f:
+            falhas = comparar(resultado, json.load(f), args.tolerancia)
+    for f in falhas:
+        print("REGRESSÃO:", f)
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Carga no banco do chat: polling por rerun vs. change stream com fan-out.
+
+Uso:
+    python benchmarks/bench_chat.py [--sessoes 50] [--ticks 30] [--mensagens 3]
+    python benchmarks/bench_chat.py --mongo-uri "mongodb://localhost:27017/?replicaSet=rs0"
+
+Simula `--sessoes` abas, cada uma com uma conversa aberta (pares de usuários),
+e `--ticks` atualizações da tela; a cada tick chegam `--mensagens` mensagens
+novas em conversas aleatórias. Compara:
+  - polling: cada aba roda `chat.sincronizar` a cada tick (o caminho sem stream);
+  - stream: um `chat_vivo.Distribuidor` por processo; a aba só lê a caixa em memória.
+Conta comandos enviados ao banco (leituras das abas + getMore do stream) e
+confere que todas as abas terminam com o histórico completo.
+
+Sem --mongo-uri roda em mongomock com um stream substituto alimentado pelos
+próprios envios; com --mongo-uri precisa de um replica set (change streams).
+"""
+import argparse
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from pymongo import monitoring
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chat  # noqa: E402
+import chat_vivo  # noqa: E402
+
+
+class ContaComandos(monitoring.CommandListener):
+    """Todos os comandos do processo, de todas as threads."""
+
+    def __init__(self):
+        self.contagem = Counter()
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        with self._lock:
+            self.contagem[event.command_name] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+class _ColecaoContada:
+    def __init__(self, colecao, contagem):
+        self._colecao, self._contagem = colecao, contagem
+
+    def __getattr__(self, nome):
+        metodo = getattr(self._colecao, nome)
+
+        def chamar(*a, **kw):
+            self._contagem[nome] += 1
+            return metodo(*a, **kw)
+        return chamar
+
+
+class BancoContado:
+    """Equivalente, no mongomock, ao listener de comandos: conta chamadas por método."""
+
+    def __init__(self, db):
+        self._db, self.contagem = db, Counter()
+
+    def __getattr__(self, nome):
+        return _ColecaoContada(getattr(self._db, nome), self.contagem)
+
+
+class StreamSubstituto:
+    """Imita o ChangeStream do pymongo: try_next, resume_token, alive e context manager."""
+
+    def __init__(self):
+        self.fila = queue.Queue()
+        self.alive = True
+        self.resume_token = None
+
+    def publicar(self, msg):
+        self.fila.put({"operationType": "insert", "fullDocument": msg})
+
+    def try_next(self):
+        try:
+            return self.fila.get(timeout=0.05)
+        except queue.Empty:
+            return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def cenario(n_sessoes):
+    usuarios = [f"u{i}" for i in range(n_sessoes)]
+    return [(u, usuarios[i ^ 1]) for i, u in enumerate(usuarios)]
+
+
+def simular(db, abas, ticks, por_tick, proxima_leitura, rng, publicar=None):
+    estados = [{} for _ in abas]
+    for estado, (u, outro) in zip(estados, abas):
+        chat.sincronizar(db, estado, chat.thread_id(u, outro))
+    enviadas = 0
+    for _ in range(ticks):
+        for _ in range(por_tick):
+            u, outro = rng.choice(abas)
+            msg = chat.enviar(db, u, outro, f"msg {enviadas}")
+            enviadas += 1
+            if publicar:
+                publicar(msg)
+        for i, (estado, (u, outro)) in enumerate(zip(estados, abas)):
+            proxima_leitura(i, estado, chat.thread_id(u, outro))
+    return estados, enviadas
+
+
+def conferir(db, estados, abas):
+    for estado, (u, outro) in zip(estados, abas):
+        tid = chat.thread_id(u, outro)
+        esperado = [m["_id"] for m in db.mensagens.find({"thread_id": tid}).sort([("dt", 1), ("_id", 1)])]
+        assert [m["_id"] for m in estado[tid]["msgs"]] == esperado, f"aba de {u} ficou sem mensagens"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessoes", type=int, default=50)
+    ap.add_argument("--ticks", type=int, default=30)
+    ap.add_argument("--mensagens", type=int, default=3, help="mensagens novas por tick")
+    ap.add_argument("--mongo-uri")
+    args = ap.parse_args()
+    abas = cenario(args.sessoes)
+
+    if args.mongo_uri:
+        from pymongo import MongoClient
+
+        contador = ContaComandos()
+        base = MongoClient(args.mongo_uri, event_listeners=[contador])["technoboltpets_bench_chat"]
+        db, contagem = base, contador.contagem
+    else:
+        import mongomock
+
+        base = mongomock.MongoClient()["technoboltpets_bench_chat"]
+        db = BancoContado(base)
+        contagem = db.contagem
+
+    resultados = {}
+    for modo in ("polling", "stream"):
+        base.mensagens.drop()
+        base.conversas.drop()
+        chat.preparar(base)
+        rng = random.Random(7)
+        publicar, dist = None, None
+        if modo == "polling":
+            def ler(i, estado, tid):
+                chat.sincronizar(db, estado, tid)
+        else:
+            substituto = None if args.mongo_uri else StreamSubstituto()
+            dist = chat_vivo.Distribuidor(base.mensagens, abrir=substituto and (lambda token: substituto))
+            assert dist.iniciar(), "servidor sem change streams (precisa de replica set)"
+            publicar = substituto and substituto.publicar
+            for i, (u, outro) in enumerate(abas):
+                dist.assinar(f"s{i}", chat.thread_id(u, outro))
+
+            def ler(i, estado, tid):
+                chat_vivo.mesclar(estado[tid], dist.retirar(f"s{i}", tid))
+
+        contagem.clear()
+        t0 = time.perf_counter()
+        estados, enviadas = simular(db, abas, args.ticks, args.mensagens, ler, rng, publicar)
+        if dist is not None:
+            # o stream entrega em outra thread: espera as últimas chegarem
+            limite = time.monotonic() + 5
+            while dist.eventos < enviadas and time.monotonic() < limite:
+                time.sleep(0.05)
+            for i, (estado, (u, outro)) in enumerate(zip(estados, abas)):
+                ler(i, estado, chat.thread_id(u, outro))
+            dist.parar()
+        dt = time.perf_counter() - t0
+        escritas = enviadas * 2  # insert da mensagem + update do resumo, iguais nos dois modos
+        leituras = sum(contagem.values()) - escritas
+        conferir(base, estados, abas)
+        resultados[modo] = leituras
+        print(f"{modo:<8} mensagens={enviadas}  leituras no banco={leituras:6d}  "
+              f"por aba/tick={leituras / (args.sessoes * args.ticks):.2f}  tempo={dt:.2f}s  {dict(contagem)}")
+    print(f"redução de leituras: {resultados['polling'] / max(resultados['stream'], 1):.0f}x")
+    if args.mongo_uri:
+        base.client.drop_database(base.name)
+
+
+if __name__ == "__main__":
+    main()
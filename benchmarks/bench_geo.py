@@ -0,0 +1,118 @@
+"""Benchmark "perto de mim": $geoNear com 2dsphere vs. varrer a lista toda.
+
+Uso:
+    python benchmarks/bench_geo.py --mongo-uri mongodb://localhost:27017 [--escalas 10000 100000]
+
+Gera cuidadores sintéticos espalhados pela Grande São Paulo num banco
+descartável (`technoboltpets_bench_geo`), e mede:
+  - legado: find({"tipo": "Cuidador"}) completo + distância/ordenação em Python
+    (o que a aba Cuidadores fazia antes);
+  - geoNear: `geo.proximos` com raio e limite.
+Sem --mongo-uri só roda o gerador e a parte em Python sobre a lista em memória.
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import geo  # noqa: E402
+
+CENTRO = (-23.5505, -46.6333)
+BAIRROS = ["Pinheiros", "Moema", "Tatuapé", "Santana", "Butantã", "Mooca", "Lapa", "Vila Mariana", "Osasco", "Santo André"]
+
+
+def gerar_cuidadores(n, seed=42, espalhamento_graus=0.35):
+    rng = random.Random(seed)
+    for i in range(n):
+        lat = CENTRO[0] + rng.uniform(-espalhamento_graus, espalhamento_graus)
+        lon = CENTRO[1] + rng.uniform(-espalhamento_graus, espalhamento_graus)
+        yield {
+            "nome": f"Cuidador {i}",
+            "usuario": f"bench_cuid_{i}",
+            "tipo": "Cuidador",
+            "status": "Ativo",
+            "endereco": f"Rua {rng.randint(1, 999)}, {rng.choice(BAIRROS)} - SP",
+            "valores": rng.randint(40, 300),
+            "rating": round(rng.uniform(3, 5), 1),
+            "rating_count": rng.randint(0, 200),
+            "localizacao": geo.ponto(lat, lon),
+        }
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    r = 6371000.0
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * r * math.asin(math.sqrt(a))
+
+
+def legado(lista, lat, lon, raio_km, limite):
+    perto = []
+    for c in lista:
+        clat, clon = geo.coordenadas(c)
+        d = haversine_m(lat, lon, clat, clon)
+        if d <= raio_km * 1000:
+            perto.append((d, c))
+    perto.sort(key=lambda x: x[0])
+    return [c for _, c in perto[:limite]]
+
+
+def cronometrar(fn, repeat):
+    tempos = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        res = fn()
+        tempos.append(time.perf_counter() - t0)
+    return sorted(tempos)[len(tempos) // 2], res
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mongo-uri")
+    ap.add_argument("--escalas", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--raio", type=float, default=5)
+    ap.add_argument("--limite", type=int, default=geo.LIMITE_PADRAO)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    db = None
+    if args.mongo_uri:
+        from pymongo import MongoClient
+
+        db = MongoClient(args.mongo_uri)["technoboltpets_bench_geo"]
+
+    lat, lon = -23.5614, -46.6559  # Av. Paulista
+    for n in args.escalas:
+        docs = list(gerar_cuidadores(n))
+        if db is None:
+            t, res = cronometrar(lambda: legado(docs, lat, lon, args.raio, args.limite), args.repeat)
+            print(f"n={n:>7}  legado (só Python, lista já em memória): {t * 1000:8.1f} ms  -> {len(res)} resultados")
+            continue
+
+        db.usuarios.drop()
+        for i in range(0, n, 5000):
+            db.usuarios.insert_many(docs[i:i + 5000])
+        geo.preparar(db)
+
+        t_leg, res_leg = cronometrar(
+            lambda: legado(list(db.usuarios.find({"tipo": "Cuidador"})), lat, lon, args.raio, args.limite), args.repeat
+        )
+        t_geo, res_geo = cronometrar(lambda: geo.proximos(db, lat, lon, args.raio, args.limite), args.repeat)
+        assert [c["usuario"] for c in res_leg] == [c["usuario"] for c in res_geo]
+        print(
+            f"n={n:>7}  legado={t_leg * 1000:8.1f} ms  geoNear={t_geo * 1000:7.1f} ms  "
+            f"speedup={t_leg / t_geo:6.1f}x  ({len(res_geo)} resultados em {args.raio} km)"
+        )
+    if db is not None:
+        db.client.drop_database("technoboltpets_bench_geo")
+    else:
+        print("Sem --mongo-uri: $geoNear não medido (precisa de um MongoDB real).")
+
+
+if __name__ == "__main__":
+    main()
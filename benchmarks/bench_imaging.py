@@ -0,0 +1,90 @@
+"""Benchmark do pipeline de normalização do PetScan.
+
+Uso: python benchmarks/bench_imaging.py [--mp 12] [--repeat 3]
+
+Compara o caminho antigo (decode completo + WebP lossless feito pelo SDK do
+Gemini sobre o PIL.Image) com `imaging.normalize_image`, por estágio.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+from PIL import Image, ImageDraw, ImageOps
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from imaging import normalize_image, pillow_heif  # noqa: E402
+
+
+def gerar_amostra(formato, megapixels):
+    w = int((megapixels * 1_000_000 * 4 / 3) ** 0.5)
+    h = int(w * 3 / 4)
+    img = Image.radial_gradient("L").resize((w, h)).convert("RGB")
+    draw = ImageDraw.Draw(img)
+    for i in range(0, w, max(w // 40, 1)):
+        draw.line([(i, 0), (w - i, h)], fill=(i % 255, 90, 200 - i % 200), width=3)
+    buf = io.BytesIO()
+    if formato == "HEIC":
+        img.save(buf, format="HEIF", quality=80)
+    elif formato == "JPEG":
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientation: foto de celular em retrato
+        img.save(buf, format="JPEG", quality=92, exif=exif)
+    else:
+        img.save(buf, format=formato)
+    return buf.getvalue()
+
+
+def legado(raw):
+    timings = {}
+    t0 = time.perf_counter()
+    img = ImageOps.exif_transpose(Image.open(io.BytesIO(raw))).convert("RGB")
+    timings["decode"] = time.perf_counter() - t0
+    timings["resize"] = 0.0
+    t0 = time.perf_counter()
+    buf = io.BytesIO()
+    img.save(buf, format="webp", lossless=True)
+    timings["encode"] = time.perf_counter() - t0
+    return timings, len(buf.getvalue()), img.size
+
+
+def medir(fn, raw, repeat):
+    melhor = None
+    for _ in range(repeat):
+        r = fn(raw)
+        total = sum(r[0].values())
+        if melhor is None or total < sum(melhor[0].values()):
+            melhor = r
+    return melhor
+
+
+def novo(raw):
+    scan = normalize_image(raw)
+    return scan.timings, len(scan.data), scan.size
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mp", type=float, default=12)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    formatos = ["JPEG", "PNG"] + (["HEIC"] if pillow_heif else [])
+    print(f"{'formato':<8}{'caminho':<10}{'decode ms':>11}{'resize ms':>11}{'encode ms':>11}{'payload KB':>12}  dimensões")
+    for formato in formatos:
+        raw = gerar_amostra(formato, args.mp)
+        for nome, fn in (("legado", legado), ("normaliz.", novo)):
+            timings, payload, size = medir(fn, raw, args.repeat)
+            print(
+                f"{formato:<8}{nome:<10}"
+                f"{timings['decode'] * 1000:>11.1f}{timings['resize'] * 1000:>11.1f}{timings['encode'] * 1000:>11.1f}"
+                f"{payload / 1024:>12.1f}  {size[0]}x{size[1]} (upload {len(raw) / 1024:.0f} KB)"
+            )
+    if not pillow_heif:
+        print("pillow-heif não instalado: HEIC ignorado.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Partida a frio do app por perfil, com `python -X importtime`.
+
+Uso:
+    python benchmarks/bench_importtime.py [--perfis anonimo Tutor Cuidador Admin]
+    python benchmarks/bench_importtime.py --salvar base.json
+    python benchmarks/bench_importtime.py --comparar base.json [--tolerancia 0.25]
+
+Cada perfil roda num processo novo (imports frios) com o app.py sob AppTest e
+um MongoDB em memória (o mesmo do bench_abas): primeiro a tela de login, depois
+o login e a aba inicial do perfil. Para cada fase mostra o tempo de parede, o
+tempo gasto em imports e quais dependências pesadas entraram.
+
+Regressões (código de saída 1):
+  - a tela de login importou alguma dependência de PESADOS;
+  - com --comparar, o tempo de imports de um perfil (login + aba inicial)
+    passou da base + tolerância.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PESADOS = ["pandas", "numpy", "pyarrow", "altair", "PIL", "pillow_heif", "fpdf", "fontTools", "google.generativeai"]
+PERFIS = {"anonimo": None, "Tutor": "tut", "Cuidador": "cui", "Admin": "adm"}
+MARCA = "### fase "
+_LINHA = re.compile(r"^import time:\s+(\d+) \|\s+\d+ \| +(\S+)$")
+
+FILHO = """
+import sys, time
+sys.path[:0] = [{raiz!r}, {bench!r}]
+import warnings; warnings.filterwarnings("ignore")
+import mongomock, streamlit.logger
+import bench_abas
+streamlit.logger.set_log_level("error")
+bench_abas.CLIENTE = mongomock.MongoClient()
+bench_abas.popular(bench_abas.CLIENTE["technoboltpets"], 50, 100)
+from streamlit.testing.v1 import AppTest
+
+def fase(nome, passo):
+    sys.stderr.write("{marca}" + nome + "\\n"); sys.stderr.flush()
+    t0 = time.perf_counter()
+    passo()
+    sys.stderr.write("{marca}fim %.1f\\n" % ((time.perf_counter() - t0) * 1000)); sys.stderr.flush()
+
+at = AppTest.from_string(bench_abas.LANCADOR, default_timeout=120)
+at.secrets["MONGO_URI"] = "mongodb://bench"
+fase("login", at.run)
+assert not at.exception, at.exception
+usuario = {usuario!r}
+if usuario:
+    def entrar():
+        at.text_input[0].input(usuario); at.text_input[1].input("x"); at.button[0].click(); at.run()
+    fase("perfil", entrar)
+    assert not at.exception, at.exception
+"""
+
+
+def medir(usuario):
+    codigo = FILHO.format(raiz=RAIZ, bench=os.path.join(RAIZ, "benchmarks"), marca=MARCA, usuario=usuario)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo], capture_output=True, text=True, cwd=RAIZ)
+    if proc.returncode:
+        raise SystemExit(proc.stderr[-3000:])
+    fases, atual = {}, None
+    for linha in proc.stderr.splitlines():
+        if linha.startswith(MARCA):
+            nome = linha[len(MARCA):]
+            if nome.startswith("fim "):
+                fases[atual]["parede_ms"] = float(nome[4:])
+                atual = None
+            else:
+                atual = nome
+                fases[atual] = {"imports_ms": 0.0, "modulos": 0, "pesados": {}}
+            continue
+        m = _LINHA.match(linha)
+        if not m or atual is None:
+            continue
+        proprio, modulo = int(m.group(1)), m.group(2)
+        f = fases[atual]
+        f["imports_ms"] += proprio / 1000
+        f["modulos"] += 1
+        # tempo próprio dos módulos do pacote (as dependências dele aparecem nas próprias linhas)
+        pacote = next((p for p in PESADOS if modulo == p or modulo.startswith(p + ".")), None)
+        if pacote:
+            f["pesados"][pacote] = f["pesados"].get(pacote, 0) + proprio / 1000
+    return fases
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--perfis", nargs="+", default=list(PERFIS), choices=list(PERFIS))
+    ap.add_argument("--salvar")
+    ap.add_argument("--comparar")
+    ap.add_argument("--tolerancia", type=float, default=0.25)
+    args = ap.parse_args()
+
+    resultado, falhas = {}, []
+    print(f"{'perfil':<10} {'fase':<7} {'parede':>9} {'imports':>9} {'módulos':>8}  pesados (ms em imports)")
+    for perfil in args.perfis:
+        fases = resultado[perfil] = medir(PERFIS[perfil])
+        for nome, f in fases.items():
+            pesados = ", ".join(f"{p} {ms:.0f}" for p, ms in sorted(f["pesados"].items(), key=lambda x: -x[1])) or "—"
+            print(f"{perfil:<10} {nome:<7} {f['parede_ms']:7.0f}ms {f['imports_ms']:7.0f}ms {f['modulos']:8d}  {pesados}")
+        if fases["login"]["pesados"]:
+            falhas.append(f"tela de login importou {sorted(fases['login']['pesados'])}")
+
+    if args.salvar:
+        with open(args.salvar, "w") as f:
+            json.dump(resultado, f, indent=2)
+    if args.comparar:
+        with open(args.comparar) as f:
+            base = json.load(f)
+        # por perfil (login + aba inicial): mover um import da tela de login para a aba não é regressão
+        for perfil, fases in resultado.items():
+            if perfil not in base:
+                continue
+            antes = sum(f["imports_ms"] for f in base[perfil].values())
+            agora = sum(f["imports_ms"] for f in fases.values())
+            print(f"{perfil:<10} imports {antes:6.0f} -> {agora:6.0f} ms ({agora / antes - 1:+.0%})")
+            if agora > antes * (1 + args.tolerancia):
+                falhas.append(f"{perfil}: imports {antes:.0f} -> {agora:.0f} ms")
+    for f in falhas:
+        print("REGRESSÃO:", f)
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == "__main__":
+    main()
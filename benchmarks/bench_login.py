@@ -0,0 +1,77 @@
+"""Microbenchmark do login: custo do scrypt e caminho completo.
+
+Uso:
+    python benchmarks/bench_login.py [--custos 12 13 14 15 16] [--repeat 10]
+    python benchmarks/bench_login.py --mongo-uri mongodb://localhost:27017
+
+Mede, por custo (N = 2**custo), o tempo de `auth.gerar_hash`/`auth.verificar`.
+Com --mongo-uri mede também, num banco descartável (`technoboltpets_bench_login`):
+  - legado: find_one({"usuario", "senha"}) com senha em texto puro;
+  - login: `auth.autenticar` + `auth.criar_sessao` no custo padrão;
+  - refresh: `auth.restaurar` a partir do cookie (o que um F5 custa agora).
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auth  # noqa: E402
+
+
+def cronometrar(fn, repeat):
+    tempos = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        tempos.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(tempos), max(tempos)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--custos", type=int, nargs="+", default=[12, 13, 14, 15, 16])
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("--mongo-uri")
+    args = ap.parse_args()
+
+    print(f"{'custo':>5} {'N':>7} {'memória':>8} {'verificar (mediana/máx)':>24}")
+    for custo in args.custos:
+        h = auth.gerar_hash("senha-de-teste", custo)
+        med, pior = cronometrar(lambda: auth.verificar("senha-de-teste", h), args.repeat)
+        marca = "  <- padrão" if custo == auth.CUSTO_SCRYPT else ""
+        print(f"{custo:>5} {2 ** custo:>7} {128 * 2 ** custo * auth.SCRYPT_R / 2 ** 20:>6.0f}MB {med:>11.1f} / {pior:.1f} ms{marca}")
+
+    if not args.mongo_uri:
+        return
+    from pymongo import MongoClient
+
+    db = MongoClient(args.mongo_uri)["technoboltpets_bench_login"]
+    db.usuarios.drop()
+    db.sessions.drop()
+    auth.preparar(db)
+    db.usuarios.insert_one({"usuario": "legado", "senha": "senha-de-teste"})
+    db.usuarios.insert_one({"usuario": "bench", "senha_hash": auth.gerar_hash("senha-de-teste")})
+    chave = auth.chave_sessao(db, {"SESSION_SECRET": "bench"})
+    token = auth.criar_sessao(db, chave, "bench")
+
+    def login():
+        assert auth.autenticar(db, "bench", "senha-de-teste")
+        auth.criar_sessao(db, chave, "bench")
+
+    casos = [
+        ("legado (texto puro)", lambda: db.usuarios.find_one({"usuario": "legado", "senha": "senha-de-teste"})),
+        (f"login (custo {auth.CUSTO_SCRYPT})", login),
+        ("refresh via cookie", lambda: auth.restaurar(db, chave, token)),
+        ("token forjado", lambda: auth.restaurar(db, chave, token[:-4] + "AAAA")),
+    ]
+    for nome, fn in casos:
+        med, pior = cronometrar(fn, args.repeat)
+        print(f"{nome:<24} mediana={med:7.1f} ms  máx={pior:7.1f} ms")
+    db.client.drop_database(db.name)
+
+
+if __name__ == "__main__":
+    main()
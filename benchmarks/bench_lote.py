@@ -0,0 +1,65 @@
+"""Benchmark do PetScan em lote contra o FakeGemini.
+
+Uso: python benchmarks/bench_lote.py [--fotos 12] [--chaves 3] [--latencia 0.5] [--interativas 5]
+
+Compara o tempo de parede do lote com a soma das chamadas individuais (o que
+o fluxo sequencial antigo custaria). Durante o lote, outra "sessão" faz
+`--interativas` scans avulsos em sequência: com as vagas reservadas
+(RESERVA_INTERATIVA) cada um custa uma chamada, não a fila do lote inteiro.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_imaging import gerar_amostra  # noqa: E402
+from fake_gemini import FakeGemini  # noqa: E402
+from ia_router import IARouter, percentil  # noqa: E402
+from scan_lote import executar_lote  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--fotos", type=int, default=12)
+    ap.add_argument("--chaves", type=int, default=3)
+    ap.add_argument("--latencia", type=float, default=0.5)
+    ap.add_argument("--interativas", type=int, default=5, help="scans avulsos de outra sessão durante o lote")
+    args = ap.parse_args()
+
+    fake = FakeGemini(latencia=args.latencia, jitter=0.3, seed=7)
+    router = IARouter([f"k{i}" for i in range(args.chaves)], ["m-unico"], model_factory=fake)
+    fotos = [gerar_amostra("JPEG", 12) for _ in range(args.fotos)]
+
+    def analisar(item):
+        return router.gerar(["prompt", item.scan_img.as_part()]), False
+
+    interativas = []
+
+    def interativo():
+        time.sleep(args.latencia)  # o lote já ocupou as vagas dele
+        for _ in range(args.interativas):
+            t = time.perf_counter()
+            router.gerar(["prompt", "avulso"])
+            interativas.append(time.perf_counter() - t)
+
+    outra_sessao = threading.Thread(target=interativo)
+    t0 = time.perf_counter()
+    outra_sessao.start()
+    itens = list(executar_lote(fotos, analisar, workers_ia=router.workers_lote))
+    parede = time.perf_counter() - t0
+    outra_sessao.join()
+
+    assert not any(i.erro for i in itens), [i.erro for i in itens if i.erro]
+    soma = sum(i.latencia for i in itens)
+    print(f"fotos={args.fotos}  chaves={args.chaves}  limite/chave={router.limite_por_chave}  threads do lote={router.workers_lote}")
+    print(f"parede={parede:.2f}s  soma das chamadas={soma:.2f}s  mais lenta={max(i.latencia for i in itens):.2f}s")
+    print(f"speedup vs sequencial={soma / parede:.1f}x")
+    if interativas:
+        print(f"scans avulsos durante o lote: p50={percentil(interativas, .5):.2f}s  máx={max(interativas):.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Memória por sessão com muitas sessões vivas: AppTest headless + MongoDB em memória + Gemini falso.
+
+Uso:
+    python benchmarks/bench_memoria.py [--sessoes 40] [--mp 12] [--scans 2]
+    python benchmarks/bench_memoria.py --sessoes 200 --mp 4 --salvar base.json
+    python benchmarks/bench_memoria.py --comparar base.json [--tolerancia 0.25]
+
+Abre N sessões de tutor do app.py (login incluso) e, intercaladas, cada uma
+faz `--scans` PetScans com uma foto de `--mp` megapixels (ruído em JPEG, do
+tamanho de uma foto de celular) depois de abrir os chats. Ao final, por sessão, o que o
+servidor continua segurando depois do último rerun:
+  - session_state (objetos alcançáveis);
+  - uploads: bytes que o file_uploader da sessão ainda mantém registrados
+    (no servidor ficam no MemoryUploadedFileManager até o widget sumir);
+  - mídia: st.image / download_button com bytes do último rerun (no
+    servidor ficam no MemoryMediaFileStorage até o próximo rerun da sessão).
+E do processo, depois de uma sessão de aquecimento: crescimento do heap Python
+(tracemalloc) e do RSS por sessão, pico de RSS e o armazém de artefatos em disco (recursos.obter_armazem).
+
+O AppTest recria o runtime a cada run, então uploads e mídia são lidos do
+próprio AppTest (widgets e o storage de mídia do último run de cada sessão).
+Cenário e sementes vêm do bench_carga.py (lançador, dados, fotos).
+
+Regressões (código de saída 1, com --comparar): memória retida por sessão
+(session_state + uploads + mídia) acima da base + tolerância.
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import bench_carga  # noqa: E402
+from fake_gemini import FakeGemini  # noqa: E402
+
+
+# --- MÍDIA DO ÚLTIMO RUN ---
+class _Midia:
+    """Guarda o storage de mídia que o AppTest cria a cada run."""
+
+    ultimo = None
+
+    @classmethod
+    def instalar(cls):
+        from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+        from streamlit.testing.v1 import app_test
+
+        class Storage(MemoryMediaFileStorage):
+            def __init__(self, *a, **k):
+                super().__init__(*a, **k)
+                cls.ultimo = self
+
+        app_test.MemoryMediaFileStorage = Storage
+
+
+def rodar(at):
+    """`at.run()` e os bytes de mídia que sobraram (o Streamlit remove os órfãos ao fim do run)."""
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return sum(f.content_size for f in _Midia.ultimo._files_by_id.values())
+
+
+def uploads(at):
+    return sum(len(conteudo) for w in at.file_uploader for _, _, conteudo, _ in w._get_files_to_register())
+
+
+def rss():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def foto(i, mp):
+    # textura grossa (sobrevive à redução para MAX_EDGE) + grão fino: JPEG do tamanho de uma foto de celular
+    from PIL import Image, ImageChops
+
+    lado = int((mp * 1e6 * 4 / 3) ** .5)
+    alto = lado * 3 // 4
+    grosso = Image.effect_noise((lado // 3, alto // 3), 60).resize((lado, alto), Image.BICUBIC)
+    canal = ImageChops.add(grosso, Image.effect_noise((lado, alto), 20 + i % 20), 2, -64)
+    img = Image.merge("RGB", (canal, canal.transpose(Image.FLIP_LEFT_RIGHT), canal.transpose(Image.FLIP_TOP_BOTTOM)))
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=88)
+    return buf.getvalue()
+
+
+# --- SESSÃO ---
+def jornada(at, n, foto_bytes, scans):
+    at.session_state["abas_tutor"] = "💬 Chats"
+    rodar(at)
+    at.session_state["abas_tutor"] = "🧬 PetScan IA"
+    for s in range(scans):
+        # depois de um scan o uploader troca de chave: o widget novo só aparece no rerun seguinte
+        rodar(at)
+        at.file_uploader[0].set_value((f"pet_{n}_{s}.jpg", foto_bytes, "image/jpeg"))
+        rodar(at)
+        bench_carga._botao(at, "EXECUTAR SCAN").click()
+        midia = rodar(at)
+    # o tutor fica na tela do scan: o que sobra é o que o próximo rerun (qualquer clique) ainda segura
+    return max(midia, rodar(at))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessoes", type=int, default=40, help="sessões de tutor vivas ao mesmo tempo")
+    ap.add_argument("--mp", type=float, default=12, help="megapixels de cada foto")
+    ap.add_argument("--scans", type=int, default=2, help="scans por sessão")
+    ap.add_argument("--mensagens", type=int, default=2000)
+    ap.add_argument("--latencia-ia", type=float, default=0.05)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--salvar")
+    ap.add_argument("--comparar")
+    ap.add_argument("--tolerancia", type=float, default=0.25)
+    args = ap.parse_args()
+    warnings.filterwarnings("ignore")
+
+    import mongomock
+    import streamlit.logger
+
+    streamlit.logger.set_log_level("error")
+    _Midia.instalar()
+    rng = random.Random(args.seed)
+    bench_carga.FAKE = FakeGemini(latencia=args.latencia_ia, taxa_erro=0, seed=args.seed)
+    bench_carga.CLIENTE = mongomock.MongoClient()
+    banco = bench_carga.CLIENTE[bench_carga.NOME_DB]
+    spans = tempfile.NamedTemporaryFile(prefix="bench_memoria_", suffix=".jsonl", delete=False).name
+    secrets = {"MONGO_URI": "mongodb://bench", "SPANS_ARQUIVO": spans, "GEMINI_CHAVE_1": "fake-1"}
+    cenario = argparse.Namespace(tutores=args.sessoes + 1, cuidadores=5, cuidadores_base=20, admins=0, pets=1,
+                                 mensagens=args.mensagens, agendamentos=0)
+
+    try:
+        tutores, _, _ = bench_carga.semear(banco, cenario, rng)
+        fotos = [foto(i, args.mp) for i in range(4)]
+        print(f"fotos de {args.mp:g} MP: {sum(map(len, fotos)) / len(fotos) / 2 ** 20:.1f} MB em média")
+        med = bench_carga.Medidor(spans)
+
+        sessoes = [bench_carga.abrir_sessao(med, "Tutor", u, secrets) for u in tutores]
+        # aquecimento: imports (Pillow, fpdf, pandas, altair) e caches do processo ficam fora da conta
+        jornada(sessoes.pop(), args.sessoes, fotos[0], args.scans)
+        gc.collect()
+        tracemalloc.start()
+        heap0, rss0 = tracemalloc.get_traced_memory()[0], rss()
+
+        t0 = time.perf_counter()
+        midia = []
+        for n, at in enumerate(sessoes):
+            # intercalado: as sessões anteriores continuam vivas com o que guardaram
+            midia.append(jornada(at, n, fotos[n % len(fotos)], args.scans))
+        duracao = time.perf_counter() - t0
+        gc.collect()
+        heap, pico_heap = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rss1 = rss()
+
+        estado = [bench_carga.tamanho(at.session_state._state) for at in sessoes]
+        enviados = [uploads(at) for at in sessoes]
+        n = len(sessoes)
+        resultado = {
+            "sessoes": n,
+            "session_state_kb": sum(estado) / n / 1024,
+            "uploads_kb": sum(enviados) / n / 1024,
+            "midia_kb": sum(midia) / n / 1024,
+            "heap_por_sessao_kb": (heap - heap0) / n / 1024,
+            "rss_por_sessao_kb": (rss1 - rss0) / n / 1024,
+        }
+        resultado["retido_por_sessao_kb"] = resultado["session_state_kb"] + resultado["uploads_kb"] + resultado["midia_kb"]
+        print(f"{n} sessões × {args.scans} scans em {duracao:.1f}s\n")
+        print("por sessão, depois do último rerun:")
+        print(f"  session_state    {resultado['session_state_kb']:10.1f} KB (máx {max(estado) / 1024:.1f} KB)")
+        print(f"  uploads          {resultado['uploads_kb']:10.1f} KB")
+        print(f"  mídia            {resultado['midia_kb']:10.1f} KB")
+        print(f"  total retido     {resultado['retido_por_sessao_kb']:10.1f} KB")
+        print(f"  heap Python      {resultado['heap_por_sessao_kb']:10.1f} KB (tracemalloc; pico do heap {pico_heap / 2 ** 20:.0f} MB)")
+        print(f"  RSS              {resultado['rss_por_sessao_kb']:10.1f} KB")
+        print(f"\npico de RSS do processo: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+        import recursos
+
+        a = recursos.obter_armazem().stats()
+        print(f"artefatos em disco: {a['itens']} arquivos, {a['bytes'] / 2 ** 20:.1f} MB, {a['despejados']} despejados")
+    finally:
+        os.unlink(spans)
+
+    if args.salvar:
+        with open(args.salvar, "w") as f:
+            json.dump(resultado, f, indent=2)
+    falhas = []
+    if args.comparar:
+        with open(args.comparar) as f:
+            base = json.load(f)
+        antes, depois = base["retido_por_sessao_kb"], resultado["retido_por_sessao_kb"]
+        if antes and depois > antes * (1 + args.tolerancia):
+            falhas.append(f"retido_por_sessao_kb: {antes:.1f} -> {depois:.1f}")
+    for f in falhas:
+        print("REGRESSÃO:", f)
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Benchmark do gerador de PDF dos laudos.
+
+Uso: python benchmarks/bench_pdf.py [--relatorios 30] [--tamanho 3]
+
+Compara o caminho antigo (um TechnoboltPDF em Helvetica por laudo, com
+sanitize latin-1 e multi_cell) com `pdf.create_pdf_report` e `pdf.render_lote`:
+relatórios por segundo e pico de memória (tracemalloc).
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+from fpdf import FPDF
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdf  # noqa: E402
+
+LAUDO = """### Avaliação Geral
+O **paciente** apresenta pelagem íntegra, olhos limpos e postura alerta. Não há sinais
+evidentes de desidratação; mucosas aparentemente róseas na foto.
+
+### Pontos de Atenção
+* **Escore corporal:** leve acúmulo de gordura na região lombar e na base da cauda.
+* **Pele:** área de rarefação pilosa próxima à orelha esquerda — vale observar coceira.
+* Unhas um pouco compridas; sugere-se corte na próxima visita.
+
+### Recomendações
+1. Ajustar a porção diária em cerca de 10% e reavaliar em 30 dias.
+2. Caminhadas de 20–30 minutos, duas vezes ao dia.
+3. Consultar o veterinário se houver vômito, apatia ou perda de apetite.
+
+ECC: 6/9
+SINAIS: rarefação pilosa; sobrepeso leve
+"""
+
+
+# --- CAMINHO ANTIGO (cópia do pdf.py anterior, para comparação) ---
+class _PDFAntigo(FPDF):
+    def header(self):
+        self.set_fill_color(62, 39, 35)
+        self.rect(0, 0, 210, 45, 'F')
+        self.set_y(15)
+        self.set_font('Helvetica', 'B', 28)
+        self.set_text_color(255, 255, 255)
+        self.cell(0, 10, 'TECHNOBOLT', new_x="LMARGIN", new_y="NEXT", align='C')
+        self.set_font('Helvetica', 'I', 11)
+        self.cell(0, 10, 'Health Analytics & Veterinary AI Report', new_x="LMARGIN", new_y="NEXT", align='C')
+        self.ln(20)
+
+
+def _sanitize(text):
+    if not text:
+        return ""
+    return text.encode('latin-1', 'replace').decode('latin-1').replace('?', '')
+
+
+def pdf_antigo(pet_name, especie, modo, sintomas, laudo):
+    p = _PDFAntigo()
+    p.add_page()
+    p.set_text_color(62, 39, 35)
+    p.set_font('Helvetica', 'B', 16)
+    p.cell(0, 10, _sanitize(f"PACIENTE: {pet_name.upper()} ({especie.upper()})"), new_x="LMARGIN", new_y="NEXT")
+    p.ln(5)
+    p.set_font('Helvetica', 'B', 12)
+    p.set_text_color(0, 0, 0)
+    p.cell(0, 10, _sanitize(f"Modulo: {modo}"), new_x="LMARGIN", new_y="NEXT")
+    p.multi_cell(0, 8, _sanitize(f"Sintomas: {sintomas if sintomas else 'Nenhum descrito'}"))
+    p.ln(5)
+    p.set_fill_color(245, 245, 245)
+    p.set_font('Helvetica', 'B', 14)
+    p.cell(0, 12, "PARECER TECNICO IA", new_x="LMARGIN", new_y="NEXT", fill=True, align='C')
+    p.ln(5)
+    p.set_font('Helvetica', '', 11)
+    p.multi_cell(0, 8, _sanitize(laudo.replace('**', '').replace('###', '').replace('*', '-')))
+    return bytes(p.output())
+
+
+def medir(nome, gerar, n):
+    t0 = time.perf_counter()
+    saida = gerar()
+    dt = time.perf_counter() - t0
+    # tracemalloc deixa tudo bem mais lento: o pico sai de uma segunda rodada
+    tracemalloc.start()
+    gerar()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(saida) == n and all(s.startswith(b"%PDF") for s in saida)
+    print(f"{nome:<26} {n / dt:8.1f} relatórios/s  {dt / n * 1000:7.1f} ms/relatório  pico={pico / 1e6:6.1f} MB")
+    return dt
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--relatorios", type=int, default=30)
+    ap.add_argument("--tamanho", type=int, default=3, help="repetições do laudo-modelo (laudos longos)")
+    args = ap.parse_args()
+
+    laudo = LAUDO * args.tamanho
+    relatorios = [(f"Pet {i}", "Cão", "Scan IA", "Análise Visual", laudo) for i in range(args.relatorios)]
+
+    t0 = time.perf_counter()
+    pdf.fonte_padrao()
+    print(f"preparo da fonte (uma vez por processo): {(time.perf_counter() - t0) * 1000:.0f} ms  família={pdf.fonte_padrao().familia}")
+    pdf_antigo(*relatorios[0])  # aquece imports/caches do fpdf para os dois lados
+    pdf.create_pdf_report(*relatorios[0])
+
+    antigo = medir("antigo (Helvetica)", lambda: [pdf_antigo(*r) for r in relatorios], args.relatorios)
+    novo = medir("create_pdf_report", lambda: [pdf.create_pdf_report(*r) for r in relatorios], args.relatorios)
+    lote = medir("render_lote", lambda: pdf.render_lote(relatorios), args.relatorios)
+    print(f"speedup: create_pdf_report={antigo / novo:.1f}x  render_lote={antigo / lote:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
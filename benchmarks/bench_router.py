@@ -0,0 +1,113 @@
+"""Harness do roteador de IA contra o FakeGemini.
+
+Uso: python benchmarks/bench_router.py [--chamadas 200]
+
+Cenário: uma chave estourada (429), o modelo preferido fora do ar e um
+modelo lento. Compara a estratégia antiga de call_ia (chave aleatória,
+modelos em sequência, GenerativeModel novo a cada tentativa) com o IARouter
+e verifica que o roteador converge para o par saudável mais rápido. Também
+mede o tempo até o primeiro pedaço no modo streaming.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_gemini import FakeGemini  # noqa: E402
+from ia_router import IAIndisponivel, IARouter, percentil  # noqa: E402
+
+MOTORES = ["m-preview", "m-lento", "m-rapido", "m-latest"]
+CHAVES = ["k1", "k2", "k3"]
+
+
+def cenario(seed):
+    fake = FakeGemini(latencia=0.02, seed=seed)
+    fake.configurar_modelo("m-preview", taxa_erro=1.0)
+    fake.configurar_modelo("m-lento", latencia=0.08)
+    fake.configurar_modelo("m-rapido", latencia=0.01)
+    fake.configurar_modelo("m-latest", latencia=0.03, taxa_erro=0.2)
+    fake.chaves_estouradas.add("k2")
+    return fake
+
+
+def call_ia_legado(fake):
+    chave = random.choice(CHAVES)
+    tentativas = 0
+    for motor in MOTORES:
+        tentativas += 1
+        try:
+            return fake(chave, motor).generate_content("prompt").text, tentativas
+        except Exception:
+            continue
+    return None, tentativas
+
+
+def rodar(nome, chamar, n):
+    latencias, falhas = [], 0
+    for _ in range(n):
+        t0 = time.perf_counter()
+        ok = chamar()
+        latencias.append(time.perf_counter() - t0)
+        falhas += not ok
+    print(
+        f"{nome:<10} ok={n - falhas:>4}/{n}  p50={percentil(latencias, .5) * 1000:7.1f} ms  "
+        f"p95={percentil(latencias, .95) * 1000:7.1f} ms  total={sum(latencias):6.2f} s"
+    )
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--chamadas", type=int, default=200)
+    args = ap.parse_args()
+
+    fake = cenario(1)
+    rodar("legado", lambda: call_ia_legado(fake)[0] is not None, args.chamadas)
+    print(f"{'':<10} chamadas ao modelo={fake.chamadas}  instâncias criadas={fake.instancias}")
+
+    fake = cenario(1)
+    router = IARouter(CHAVES, MOTORES, model_factory=fake)
+
+    def via_router():
+        try:
+            return router.gerar("prompt") is not None
+        except IAIndisponivel:
+            return False
+
+    rodar("router", via_router, args.chamadas)
+    print(f"{'':<10} chamadas ao modelo={fake.chamadas}  instâncias criadas={fake.instancias}")
+    for linha in router.stats():
+        print("   ", linha)
+
+    stats = {linha["alvo"]: linha for linha in router.stats()}
+    assert stats["chave #2"]["circuito"] == "aberto", "chave com 429 deveria estar com circuito aberto"
+    assert stats["m-preview"]["circuito"] == "aberto", "modelo fora do ar deveria estar com circuito aberto"
+    assert stats["m-rapido"]["chamadas"] > stats["m-lento"]["chamadas"], "tráfego deveria ir para o modelo mais rápido"
+    assert fake.instancias <= len(CHAVES) * len(MOTORES), "instâncias de modelo deveriam ser reaproveitadas"
+    print("OK: circuitos abertos e tráfego no par mais rápido.")
+
+    # Streaming: o preferido falha antes do 1º pedaço e o fallback assume
+    fake = cenario(2)
+    fake.configurar_modelo("m-rapido", latencia=0.2)
+    router = IARouter(CHAVES, ["m-preview", "m-rapido"], model_factory=fake)
+    ttft, total = [], []
+    for _ in range(10):
+        t0 = time.perf_counter()
+        partes = []
+        for parte in router.gerar_stream("prompt"):
+            if not partes:
+                ttft.append(time.perf_counter() - t0)
+            partes.append(parte)
+        total.append(time.perf_counter() - t0)
+        assert "".join(partes) == fake.texto_laudo("m-rapido") + "\n"
+    print(
+        f"stream     1º pedaço p50={percentil(ttft, .5) * 1000:7.1f} ms  "
+        f"resposta completa p50={percentil(total, .5) * 1000:7.1f} ms"
+    )
+    print("OK: fallback antes do primeiro pedaço e texto completo coletado.")
+
+
+if __name__ == "__main__":
+    main()
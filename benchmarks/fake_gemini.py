@@ -0,0 +1,111 @@
+"""Stand-in local do Gemini para harness e benchmarks.
+
+`FakeGemini` serve como `model_factory` do `IARouter`: cada modelo tem
+latência e taxa de falha ajustáveis, e chaves podem ser marcadas como
+estouradas (429) para exercitar os circuit breakers sem rede.
+"""
+import random
+import threading
+import time
+
+
+class ResourceExhausted(Exception):
+    code = 429
+
+
+class ServiceUnavailable(Exception):
+    code = 503
+
+
+class FakeUsage:
+    def __init__(self, entrada, saida):
+        self.prompt_token_count = entrada
+        self.candidates_token_count = saida
+
+
+class FakeResponse:
+    def __init__(self, text, usage_metadata=None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class FakeChunk:
+    def __init__(self, text, usage_metadata=None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+def _tokens(conteudo):
+    # ~4 caracteres por token no texto; imagem inline conta como 258 (tile do Gemini)
+    partes = conteudo if isinstance(conteudo, list) else [conteudo]
+    return sum(len(p) // 4 if isinstance(p, str) else 258 for p in partes)
+
+
+class FakeModel:
+    def __init__(self, backend, chave, motor):
+        self.backend = backend
+        self.chave = chave
+        self.model_name = motor
+
+    def generate_content(self, conteudo, stream=False, **kwargs):
+        return self.backend.responder(self.chave, self.model_name, conteudo, stream)
+
+
+class FakeGemini:
+    def __init__(self, latencia=0.05, jitter=0.2, taxa_erro=0.0, seed=None, sleep=time.sleep):
+        self.latencia_padrao = latencia
+        self.jitter = jitter
+        self.taxa_erro_padrao = taxa_erro
+        self.latencias = {}
+        self.taxas_erro = {}
+        self.chaves_estouradas = set()
+        self.chamadas = 0
+        self.instancias = 0
+        self.sleep = sleep
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self, chave, motor):
+        with self._lock:
+            self.instancias += 1
+        return FakeModel(self, chave, motor)
+
+    def configurar_modelo(self, motor, latencia=None, taxa_erro=None):
+        if latencia is not None:
+            self.latencias[motor] = latencia
+        if taxa_erro is not None:
+            self.taxas_erro[motor] = taxa_erro
+
+    def texto_laudo(self, motor):
+        return (
+            f"### Laudo ({motor})\n"
+            "**Escore corporal:** 5/9 (ideal)\n"
+            "- Pelagem brilhante\n"
+            "- Sem sinais visíveis de lesões\n"
+        )
+
+    def responder(self, chave, motor, conteudo, stream=False):
+        with self._lock:
+            self.chamadas += 1
+            falhar = self.rng.random() < self.taxas_erro.get(motor, self.taxa_erro_padrao)
+            base = self.latencias.get(motor, self.latencia_padrao)
+            latencia = base * (1 + self.rng.uniform(-self.jitter, self.jitter))
+        if chave in self.chaves_estouradas:
+            self.sleep(latencia * 0.1)
+            raise ResourceExhausted("429 Resource has been exhausted (e.g. check quota).")
+        if falhar:
+            self.sleep(latencia * 0.5)
+            raise ServiceUnavailable(f"503 {motor} indisponível")
+        texto = self.texto_laudo(motor)
+        uso = FakeUsage(_tokens(conteudo), len(texto) // 4)
+        if not stream:
+            self.sleep(latencia)
+            return FakeResponse(texto, uso)
+        return self._stream(texto, latencia, uso)
+
+    def _stream(self, texto, latencia, uso):
+        partes = texto.split("\n")
+        for i, parte in enumerate(partes):
+            self.sleep(latencia / len(partes))
+            # como no Gemini, o uso de tokens vem no último pedaço
+            yield FakeChunk(parte + "\n", uso if i == len(partes) - 1 else None)
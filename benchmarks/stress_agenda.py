@@ -0,0 +1,113 @@
+"""Stress de concorrência da agenda: vários tutores reservando o mesmo cuidador ao mesmo tempo.
+
+Uso:
+    python benchmarks/stress_agenda.py --mongo-uri mongodb://localhost:27017 [--tutores 64] [--capacidade 3] [--rodadas 5]
+
+Num banco descartável (`technoboltpets_stress_agenda`), dispara todas as
+reservas juntas (threading.Barrier) para períodos sobrepostos e compara:
+  - legado: conta os pedidos do dia e insere se houver vaga (checar e depois gravar);
+  - agenda: `agenda.reservar`, com update condicional por dia.
+Ao final confere, dia a dia, pedidos aceitos vs. capacidade. O caminho novo
+nunca pode passar da capacidade; o legado costuma passar.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agenda  # noqa: E402
+
+CUIDADOR = "stress_cuidador"
+
+
+def reserva_legada(db, tutor, inicio, fim, capacidade):
+    periodo = agenda.dias(inicio, fim)
+    for dia in periodo:
+        if db.agendamentos.count_documents({"cuidador_id": CUIDADOR, "data": {"$lte": dia}, "fim": {"$gte": dia}, "status": {"$in": agenda.OCUPAM}}) >= capacidade:
+            raise agenda.DiaLotado(dia)
+    db.agendamentos.insert_one({"tutor_id": tutor, "cuidador_id": CUIDADOR, "data": periodo[0], "fim": periodo[-1], "status": agenda.PENDENTE})
+
+
+def reserva_nova(db, tutor, inicio, fim, capacidade):
+    agenda.reservar(db, tutor, CUIDADOR, inicio, fim, capacidade)
+
+
+def rodada(db, reservar, pedidos, capacidade):
+    db.agendamentos.delete_many({"cuidador_id": CUIDADOR})
+    db.agenda_dias.delete_many({"cuidador_id": CUIDADOR})
+    barreira = threading.Barrier(len(pedidos))
+    latencias, aceitos, lotados, erros = [], [], [], []
+    trava = threading.Lock()
+
+    def tutor(i, inicio, fim):
+        barreira.wait()
+        t0 = time.perf_counter()
+        try:
+            reservar(db, f"tutor_{i}", inicio, fim, capacidade)
+            resultado = aceitos
+        except agenda.DiaLotado:
+            resultado = lotados
+        except Exception as e:  # noqa: BLE001 - o stress conta qualquer falha
+            resultado = erros
+            print("erro:", e)
+        with trava:
+            latencias.append((time.perf_counter() - t0) * 1000)
+            resultado.append(i)
+
+    threads = [threading.Thread(target=tutor, args=(i, *p)) for i, p in enumerate(pedidos)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    por_dia = Counter()
+    for p in db.agendamentos.find({"cuidador_id": CUIDADOR, "status": {"$in": agenda.OCUPAM}}):
+        por_dia.update(agenda.dias(p["data"], p["fim"]))
+    excesso = {d: n for d, n in por_dia.items() if n > capacidade}
+    return len(aceitos), len(lotados), len(erros), excesso, latencias
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mongo-uri", required=True)
+    ap.add_argument("--tutores", type=int, default=64)
+    ap.add_argument("--capacidade", type=int, default=3)
+    ap.add_argument("--rodadas", type=int, default=5)
+    ap.add_argument("--janela", type=int, default=5, help="dias em que os pedidos se concentram")
+    args = ap.parse_args()
+
+    from pymongo import MongoClient
+
+    db = MongoClient(args.mongo_uri, maxPoolSize=args.tutores + 4)["technoboltpets_stress_agenda"]
+    agenda.preparar(db)
+    rng = random.Random(42)
+    base = date.today() + timedelta(days=30)
+
+    for nome, reservar in [("legado", reserva_legada), ("agenda", reserva_nova)]:
+        total_excesso, todas = 0, []
+        for _ in range(args.rodadas):
+            pedidos = []
+            for _ in range(args.tutores):
+                inicio = base + timedelta(days=rng.randrange(args.janela))
+                pedidos.append((inicio, inicio + timedelta(days=rng.randrange(3))))
+            aceitos, lotados, erros, excesso, latencias = rodada(db, reservar, pedidos, args.capacidade)
+            total_excesso += sum(n - args.capacidade for n in excesso.values())
+            todas += latencias
+            print(f"{nome:<7} aceitos={aceitos:3d} lotados={lotados:3d} erros={erros} dias acima da capacidade={len(excesso)}")
+        todas.sort()
+        print(f"{nome:<7} reservas além da capacidade={total_excesso}  p50={statistics.median(todas):.1f} ms  "
+              f"p95={todas[int(len(todas) * 0.95) - 1]:.1f} ms")
+        if nome == "agenda":
+            assert total_excesso == 0, "agenda aceitou reservas além da capacidade"
+    db.client.drop_database(db.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import json
+from datetime import datetime
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import DuplicateKeyError
+
+# --- CHAT ENGINE ---
+# Cada conversa tem um `thread_id` estável (participantes ordenados) e um
+# documento-resumo em `conversas` (última mensagem, não lidas por usuário), de
+# modo que a lista de conversas custa uma query e o histórico é paginado por
+# keyset em (thread_id, dt, _id). Nome de usuário é texto livre: não vira
+# caminho de campo (`nao_lidas` é uma lista de {usuario, n}) nem separador.
+PAGINA = 20
+LIMITE_CONVERSAS = 50
+# O que cada sessão guarda: as últimas conversas abertas e as mensagens mais
+# recentes de cada uma (o "carregar mais" do usuário sobe o limite da conversa).
+MAX_CONVERSAS_SESSAO = 5
+MAX_MSGS_SESSAO = 200
+CAMPOS_MENSAGEM = {"sender_id": 1, "texto": 1, "dt": 1}
+
+
+def thread_id(a, b):
+    # JSON da dupla ordenada: sem ambiguidade com "|" ou "." no nome
+    return json.dumps(sorted([a, b]), ensure_ascii=False)
+
+
+def preparar(db):
+    db.mensagens.create_index([("thread_id", ASCENDING), ("dt", DESCENDING), ("_id", DESCENDING)])
+    db.conversas.create_index([("participantes", ASCENDING), ("ultima_dt", DESCENDING)])
+    migrar_legado(db)
+
+
+def migrar_legado(db):
+    """Preenche `thread_id` e os resumos para mensagens anteriores ao modelo de conversas."""
+    antigas = list(db.mensagens.find({"thread_id": {"$exists": False}}, {"sender_id": 1, "receiver_id": 1}))
+    if not antigas:
+        return 0
+    por_thread = {}
+    for m in antigas:
+        por_thread.setdefault(thread_id(m["sender_id"], m["receiver_id"]), []).append(m["_id"])
+    for tid, ids in por_thread.items():
+        db.mensagens.update_many({"_id": {"$in": ids}}, {"$set": {"thread_id": tid}})
+        ultima = next(db.mensagens.find({"thread_id": tid}).sort([("dt", DESCENDING), ("_id", DESCENDING)]).limit(1), None)
+        if ultima:
+            resumo = _resumo(ultima)
+            db.conversas.update_one(
+                {"_id": tid},
+                {"$set": resumo, "$setOnInsert": {"nao_lidas": _contadores(resumo["participantes"])}},
+                upsert=True,
+            )
+    return len(antigas)
+
+
+def _contadores(participantes, receiver=None):
+    return [{"usuario": u, "n": int(u == receiver)} for u in dict.fromkeys(participantes)]
+
+
+def _resumo(msg):
+    return {
+        "participantes": sorted([msg["sender_id"], msg["receiver_id"]]),
+        "ultima_msg": msg["texto"],
+        "ultima_dt": msg["dt"],
+        "ultimo_sender": msg["sender_id"],
+    }
+
+
+def enviar(db, sender, receiver, texto):
+    tid = thread_id(sender, receiver)
+    msg = {"thread_id": tid, "sender_id": sender, "receiver_id": receiver, "texto": texto, "dt": datetime.now()}
+    db.mensagens.insert_one(msg)
+    resumo = _resumo(msg)
+    # Conversa existente: "nao_lidas.$" é o contador do destinatário (um round trip)
+    filtro = {"_id": tid, "nao_lidas.usuario": receiver}
+    mudanca = {"$set": resumo, "$inc": {"nao_lidas.$.n": 1}}
+    if not db.conversas.update_one(filtro, mudanca).matched_count:
+        try:
+            db.conversas.insert_one({"_id": tid, **resumo, "nao_lidas": _contadores(resumo["participantes"], receiver)})
+        except DuplicateKeyError:
+            # outra mensagem criou a conversa no meio
+            db.conversas.update_one(filtro, mudanca)
+    return msg
+
+
+def listar_conversas(db, usuario, limite=LIMITE_CONVERSAS):
+    return list(db.conversas.find({"participantes": usuario}).sort("ultima_dt", DESCENDING).limit(limite))
+
+
+def outro_participante(conversa, usuario):
+    return next((p for p in conversa["participantes"] if p != usuario), usuario)
+
+
+def nao_lidas(conversa, usuario):
+    return next((c["n"] for c in conversa.get("nao_lidas", []) if c["usuario"] == usuario), 0)
+
+
+def marcar_lidas(db, tid, usuario):
+    db.conversas.update_one({"_id": tid, "nao_lidas.usuario": usuario}, {"$set": {"nao_lidas.$.n": 0}})
+
+
+def _pagina(db, filtro, ordem, n):
+    return list(db.mensagens.find(filtro, CAMPOS_MENSAGEM).sort([("dt", ordem), ("_id", ordem)]).limit(n))
+
+
+def ultimas(db, tid, n=PAGINA):
+    return _pagina(db, {"thread_id": tid}, DESCENDING, n)[::-1]
+
+
+def anteriores(db, tid, primeira, n=PAGINA):
+    filtro = {"thread_id": tid, "$or": [
+        {"dt": {"$lt": primeira["dt"]}},
+        {"dt": primeira["dt"], "_id": {"$lt": primeira["_id"]}},
+    ]}
+    return _pagina(db, filtro, DESCENDING, n)[::-1]
+
+
+def novas(db, tid, ultima):
+    filtro = {"thread_id": tid, "$or": [
+        {"dt": {"$gt": ultima["dt"]}},
+        {"dt": ultima["dt"], "_id": {"$gt": ultima["_id"]}},
+    ]}
+    return _pagina(db, filtro, ASCENDING, 500)
+
+
+def sincronizar(db, estado, tid, n=PAGINA):
+    """Atualiza o estado local de uma conversa com o mínimo de leitura.
+
+    Primeira abertura: últimas `n` mensagens. Depois: só as mais novas que a
+    última já vista.
+    """
+    if tid not in estado:
+        msgs = ultimas(db, tid, n)
+        estado[tid] = {"msgs": msgs, "tem_mais": len(msgs) == n}
+    elif estado[tid]["msgs"]:
+        estado[tid]["msgs"].extend(novas(db, tid, estado[tid]["msgs"][-1]))
+    else:
+        estado[tid]["msgs"] = ultimas(db, tid, n)
+    return estado[tid]
+
+
+def carregar_mais(db, estado, tid, n=PAGINA):
+    conv = estado[tid]
+    if not conv["msgs"]:
+        conv["tem_mais"] = False
+        return conv
+    antigas = anteriores(db, tid, conv["msgs"][0], n)
+    conv["msgs"][:0] = antigas
+    conv["tem_mais"] = len(antigas) == n
+    conv["limite"] = max(conv.get("limite", MAX_MSGS_SESSAO), len(conv["msgs"]))
+    return conv
+
+
+def podar(estado, tid, max_conversas=MAX_CONVERSAS_SESSAO, max_msgs=MAX_MSGS_SESSAO):
+    """Mantém `tid` como a conversa mais recente e descarta as mais antigas (conversas e mensagens)."""
+    estado[tid] = estado.pop(tid)
+    while len(estado) > max_conversas:
+        del estado[next(iter(estado))]
+    conv = estado[tid]
+    limite = conv.get("limite", max_msgs)
+    if len(conv["msgs"]) > limite:
+        del conv["msgs"][:-limite]
+        conv["tem_mais"] = True
+    return conv
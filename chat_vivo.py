@@ -0,0 +1,170 @@
+import logging
+import threading
+import time
+from collections import deque
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+# --- CHAT EM TEMPO REAL ---
+# Um único change stream por processo em `mensagens` (inserts). Cada sessão do
+# Streamlit assina as conversas abertas e recebe as mensagens novas numa caixa
+# em memória; o fragmento da conversa só lê essa caixa — nenhuma query por
+# tick. Sem replica set (ou sem change streams), `ativo` fica False e o app
+# volta ao polling indexado de `chat.novas`.
+PIPELINE = [{"$match": {"operationType": "insert"}}]
+ESPERA_MS = 1000  # max_await_time_ms: de quanto em quanto tempo o loop olha o `parar`
+MAX_CAIXA = 200  # mensagens guardadas por sessão+conversa até o fragmento buscar
+SESSAO_ORFA = 120.0  # s sem buscar a caixa: aba fechada, assinatura descartada
+BACKOFF_MAX = 30.0
+
+log = logging.getLogger("technobolt.chat")
+
+
+class Distribuidor:
+    def __init__(self, colecao, ao_receber=None, clock=time.monotonic, abrir=None):
+        self.colecao = colecao
+        self.ao_receber = ao_receber
+        self.clock = clock
+        self._abrir = abrir or (lambda token: colecao.watch(PIPELINE, resume_after=token, max_await_time_ms=ESPERA_MS))
+        self._lock = threading.Lock()
+        self._assinantes = {}  # thread_id -> {sessao}
+        self._caixas = {}  # sessao -> {thread_id: deque}
+        self._vistos = {}  # sessao -> último acesso
+        self._conexao_sessao = {}  # sessao -> `conexoes` quando a caixa passou a valer
+        self._token = None
+        self._parar = threading.Event()
+        self._pronto = threading.Event()
+        self._thread = None
+        self.ativo = False
+        self.conexoes = 0  # streams abertos; entre um e outro nada chega às caixas
+        self.eventos = 0
+        self.entregas = 0
+
+    def iniciar(self, espera=5.0):
+        """Sobe a thread do stream; retorna `ativo` (False = servidor sem change streams)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="chat-stream", daemon=True)
+            self._thread.start()
+        self._pronto.wait(espera)
+        return self.ativo
+
+    def parar(self):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _loop(self):
+        atraso = 1.0
+        conectou = False
+        while not self._parar.is_set():
+            try:
+                with self._abrir(self._token) as stream:
+                    self.conexoes += 1
+                    self.ativo = conectou = True
+                    self._pronto.set()
+                    atraso = 1.0
+                    while stream.alive and not self._parar.is_set():
+                        ev = stream.try_next()
+                        if ev is not None:
+                            self._distribuir(ev["fullDocument"])
+                        self._token = stream.resume_token
+            except (OperationFailure, TypeError, NotImplementedError) as e:
+                if not conectou:
+                    # standalone / mongomock: não há o que reconectar
+                    log.info("change streams indisponíveis, chat em polling: %s", e)
+                    self._pronto.set()
+                    return
+                # o driver já retoma sozinho o que é retomável: o token não serve mais
+                # (ex.: ChangeStreamHistoryLost); reabre do agora e as sessões
+                # sincronizam pelo banco (`assinar` vê a nova conexão)
+                log.warning("change stream encerrado, reabrindo sem o token: %s", e)
+                self._token = None
+            except PyMongoError as e:
+                log.warning("change stream caiu, retomando em %.0fs: %s", atraso, e)
+            except Exception:
+                # bug num evento ou no `ao_receber`: a thread não pode morrer com as sessões esperando o stream
+                log.exception("erro no change stream, retomando em %.0fs", atraso)
+            finally:
+                # fora do stream as sessões voltam ao polling até reconectar
+                self.ativo = False
+            self._parar.wait(atraso)
+            atraso = min(atraso * 2, BACKOFF_MAX)
+
+    def _distribuir(self, msg):
+        self.eventos += 1
+        tid = msg.get("thread_id")
+        with self._lock:
+            for sessao in self._assinantes.get(tid, ()):
+                self._caixas[sessao].setdefault(tid, deque(maxlen=MAX_CAIXA)).append(msg)
+                self.entregas += 1
+        if self.ao_receber:
+            self.ao_receber(msg)
+
+    # --- sessões ---
+    def assinar(self, sessao, tid):
+        """Passa a guardar as mensagens de `tid` para a sessão (uma conversa aberta por vez).
+
+        True quando a caixa começa agora (assinatura nova ou stream reaberto): o que
+        chegou antes só está no banco e a sessão precisa sincronizar por lá.
+        """
+        with self._lock:
+            self._vistos[sessao] = self.clock()
+            caixa = self._caixas.setdefault(sessao, {})
+            nova = self._conexao_sessao.get(sessao) != self.conexoes
+            self._conexao_sessao[sessao] = self.conexoes
+            if tid in caixa:
+                return nova
+            for antigo in list(caixa):
+                self._desassinar(sessao, antigo)
+            caixa[tid] = deque(maxlen=MAX_CAIXA)
+            self._assinantes.setdefault(tid, set()).add(sessao)
+            self._limpar_orfas()
+            return True
+
+    def retirar(self, sessao, tid):
+        """Mensagens recebidas desde a última chamada (e esvazia a caixa)."""
+        with self._lock:
+            self._vistos[sessao] = self.clock()
+            caixa = self._caixas.get(sessao, {}).get(tid)
+            if not caixa:
+                return []
+            msgs = list(caixa)
+            caixa.clear()
+            return msgs
+
+    def sair(self, sessao):
+        with self._lock:
+            for tid in list(self._caixas.get(sessao, ())):
+                self._desassinar(sessao, tid)
+            self._caixas.pop(sessao, None)
+            self._vistos.pop(sessao, None)
+            self._conexao_sessao.pop(sessao, None)
+
+    def _desassinar(self, sessao, tid):
+        self._caixas.get(sessao, {}).pop(tid, None)
+        inscritos = self._assinantes.get(tid)
+        if inscritos:
+            inscritos.discard(sessao)
+            if not inscritos:
+                del self._assinantes[tid]
+
+    def _limpar_orfas(self):
+        limite = self.clock() - SESSAO_ORFA
+        for sessao in [s for s, t in self._vistos.items() if t < limite]:
+            for tid in list(self._caixas.get(sessao, ())):
+                self._desassinar(sessao, tid)
+            self._caixas.pop(sessao, None)
+            self._conexao_sessao.pop(sessao, None)
+            del self._vistos[sessao]
+
+    def sessoes(self):
+        with self._lock:
+            return len(self._caixas)
+
+
+def mesclar(conv, msgs):
+    """Acrescenta ao estado local da conversa as mensagens ainda não vistas (o envio local também chega pelo stream)."""
+    vistos = {m["_id"] for m in conv["msgs"][-MAX_CAIXA:]}
+    novas = [m for m in msgs if m["_id"] not in vistos]
+    conv["msgs"].extend(novas)
+    return novas
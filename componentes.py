@@ -0,0 +1,154 @@
+import time
+import uuid
+
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+
+import chat
+import chat_vivo
+import jobs
+from recursos import iniciar_conexao, obter_dados, obter_distribuidor
+
+# --- COMPONENTES COMPARTILHADOS PELAS TELAS ---
+# Fragmentos com run_every que depende do estado são embrulhados na chamada
+# (st.fragment(func, run_every=...)): o decorador no módulo seria avaliado uma
+# vez só, no primeiro import.
+
+# --- RERUN DO FRAGMENTO ---
+def rerun_fragmento():
+    # Clique dentro de um fragmento reexecuta só ele; num rerun completo (ex.: outro widget
+    # mudou junto) o Streamlit recusa scope="fragment" e o app todo reexecuta
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+# --- ABAS SOB DEMANDA ---
+def renderizar_abas(chave, abas):
+    # Só a aba aberta executa (tabs com on_change="rerun"): as queries das outras abas não rodam
+    conteineres = st.tabs(list(abas), key=chave, on_change="rerun")
+    for aba, (nome, render) in zip(conteineres, abas.items()):
+        if aba.open:
+            with aba:
+                t0 = time.perf_counter()
+                render()
+                st.session_state.tempo_aba = (nome, (time.perf_counter() - t0) * 1000)
+
+# --- CHAT UI ---
+def render_chat(prefixo, usuario):
+    db, dados, distribuidor = iniciar_conexao(), obter_dados(), obter_distribuidor()
+    conversas = dados.conversas(usuario) if db is not None else []
+    if not conversas:
+        st.info("Nenhuma conversa ainda.")
+        return
+
+    por_id = {c['_id']: c for c in conversas}
+    def rotulo(tid):
+        nl = chat.nao_lidas(por_id[tid], usuario)
+        return f"Conversa com {chat.outro_participante(por_id[tid], usuario)}" + (f" · 🔴 {nl}" if nl else "")
+
+    tid = st.selectbox("Conversas", list(por_id), format_func=rotulo, key=f"{prefixo}_thread")
+    if chat.nao_lidas(por_id[tid], usuario):
+        dados.marcar_lidas(tid, usuario)
+    # Com change stream o tick só lê a caixa em memória da sessão; sem ele, busca no banco só as mensagens novas
+    run_every = 2 if distribuidor is not None and distribuidor.ativo else 5
+    st.fragment(conversa_aberta, run_every=run_every)(prefixo, tid, chat.outro_participante(por_id[tid], usuario), usuario)
+
+def conversa_aberta(prefixo, tid, outro, usuario):
+    db, dados, distribuidor = iniciar_conexao(), obter_dados(), obter_distribuidor()
+    estado = st.session_state.setdefault("chat_threads", {})
+    ao_vivo = distribuidor is not None and distribuidor.ativo
+    caixa_nova = False
+    if ao_vivo:
+        sessao = st.session_state.setdefault("chat_sessao", uuid.uuid4().hex)
+        # antes da carga: o que chegar no meio vem em dobro e é deduplicado
+        caixa_nova = distribuidor.assinar(sessao, tid)
+    if tid not in estado:
+        conv, novas = chat.sincronizar(db, estado, tid), []
+    elif ao_vivo and not caixa_nova:
+        conv = estado[tid]
+        novas = chat_vivo.mesclar(conv, distribuidor.retirar(sessao, tid))
+    else:
+        # polling, ou a caixa acabou de começar (voltou à conversa, stream reaberto): busca no banco
+        antes = len(estado[tid]['msgs'])
+        conv = chat.sincronizar(db, estado, tid)
+        novas = conv['msgs'][antes:]
+    chat.podar(estado, tid)
+    if any(m['sender_id'] != usuario for m in novas):
+        dados.marcar_lidas(tid, usuario)
+
+    if conv['tem_mais'] and st.button("⬆️ Carregar mensagens anteriores", key=f"{prefixo}_mais_{tid}"):
+        chat.carregar_mais(db, estado, tid)
+    # O histórico é desenhado depois do envio (no container acima do campo), sem precisar de outro rerun
+    historico = st.container()
+    resp = st.text_input("Mensagem", key=f"{prefixo}_res_{tid}")
+    if st.button("Enviar", key=f"{prefixo}_btn_{tid}"):
+        chat_vivo.mesclar(conv, [dados.enviar_mensagem(usuario, outro, resp)])
+    with historico:
+        for m in conv['msgs']:
+            cl = "sent" if m['sender_id'] == usuario else "received"
+            st.markdown(f"<div class='bubble {cl}'>{m['texto']}</div>", unsafe_allow_html=True)
+
+# --- FILA DE SCANS (POLLING) ---
+# A sessão guarda só os ids dos últimos jobs; o PDF vem do banco no clique
+MAX_JOBS_SESSAO = 10
+
+def painel_jobs(usuario):
+    st.fragment(_painel_jobs, run_every=3 if st.session_state.get("scan_jobs_pendentes") else None)(usuario)
+
+def _painel_jobs(usuario):
+    db, dados = iniciar_conexao(), obter_dados()
+    ids = st.session_state.get("scan_jobs", [])
+    if not ids or db is None:
+        return
+    st.markdown("#### 🗂️ Scans em segundo plano")
+    estado = jobs.estados(db, ids)
+    pendentes = False
+    for jid in reversed(ids):
+        j = estado.get(jid)
+        if j is None:
+            continue
+        nome = j.get('rotulo', 'Scan')
+        if j['status'] == jobs.CONCLUIDO:
+            with st.expander(f"✅ {nome}", expanded=jid == ids[-1]):
+                st.markdown(f"<div class='elite-card'>{j['resultado']['laudo']}</div>", unsafe_allow_html=True)
+                st.download_button("📥 BAIXAR PDF TECHNOBOLT", data=lambda jid=jid: jobs.pdf(db, jid), file_name="laudo_technobolt.pdf", mime="application/pdf", key=f"job_pdf_{jid}", on_click="ignore")
+            if jid not in st.session_state.scan_jobs_vistos:
+                # Worker gravou histórico do pet: descarta o cache local
+                st.session_state.scan_jobs_vistos.add(jid)
+                dados.cache.invalidar(usuario, "pets")
+                dados.cache.invalidar(usuario, "scans")
+        elif j['status'] == jobs.FALHOU:
+            st.error(f"❌ {nome}: {j.get('erro', 'falha')}")
+        else:
+            pendentes = True
+            extra = f" · tentativa {j['tentativas']}, último erro: {j['erro']}" if j.get('erro') else ""
+            st.caption(f"⏳ {nome} — {j['status']}{extra}")
+    if len(ids) > MAX_JOBS_SESSAO:
+        # Descarta os terminados mais antigos; pendente continua na lista até terminar
+        terminados = [jid for jid in ids if estado.get(jid, {}).get('status') in (jobs.CONCLUIDO, jobs.FALHOU, None)]
+        sair = set(terminados[:len(ids) - MAX_JOBS_SESSAO])
+        ids[:] = [jid for jid in ids if jid not in sair]
+        st.session_state.scan_jobs_vistos -= sair
+    if pendentes != st.session_state.get("scan_jobs_pendentes", False):
+        # Liga/desliga o polling redefinindo o fragmento num rerun completo
+        st.session_state.scan_jobs_pendentes = pendentes
+        st.rerun()
+
+# --- PAGINAÇÃO POR KEYSET ---
+def paginador(chave, assinatura):
+    # Pilha de cursores por tela; mudou o filtro, volta para a primeira página
+    pag = st.session_state.get(chave)
+    if pag is None or pag["assinatura"] != assinatura:
+        pag = st.session_state[chave] = {"assinatura": assinatura, "cursores": [None]}
+    return pag
+
+def botoes_paginador(pag, proximo, prefixo):
+    b1, b2, b3 = st.columns([1, 2, 1])
+    if b1.button("⬅️ Anterior", disabled=len(pag["cursores"]) == 1, key=f"{prefixo}_prev"):
+        pag["cursores"].pop()
+        rerun_fragmento()
+    b2.caption(f"Página {len(pag['cursores'])}")
+    if b3.button("Próxima ➡️", disabled=proximo is None, key=f"{prefixo}_next"):
+        pag["cursores"].append(proximo)
+        rerun_fragmento()
@@ -0,0 +1,45 @@
+from pymongo import ASCENDING, DESCENDING, TEXT
+
+# --- BUSCA DE CUIDADORES ---
+# Filtro, ordenação e paginação no servidor, projetando só o que o card usa.
+POR_PAGINA = 10
+CAMPOS_CARD = {"usuario": 1, "nome": 1, "endereco": 1, "valores": 1, "rating": 1, "rating_count": 1, "capacidade": 1}
+ORDENS = {
+    "rating": [("rating", DESCENDING), ("_id", ASCENDING)],
+    "preco_asc": [("valores", ASCENDING), ("_id", ASCENDING)],
+    "preco_desc": [("valores", DESCENDING), ("_id", ASCENDING)],
+}
+
+
+def preparar(db):
+    db.usuarios.create_index(
+        [("nome", TEXT), ("endereco", TEXT)], default_language="portuguese", name="busca_cuidadores"
+    )
+    db.usuarios.create_index([("tipo", ASCENDING), ("rating", DESCENDING)])
+    db.usuarios.create_index([("tipo", ASCENDING), ("valores", ASCENDING)])
+
+
+def filtro_busca(texto=None, preco_min=None, preco_max=None):
+    filtro = {"tipo": "Cuidador"}
+    if texto:
+        filtro["$text"] = {"$search": texto}
+    faixa = {}
+    if preco_min is not None:
+        faixa["$gte"] = preco_min
+    if preco_max is not None:
+        faixa["$lte"] = preco_max
+    if faixa:
+        filtro["valores"] = faixa
+    return filtro
+
+
+def buscar(db, texto=None, preco_min=None, preco_max=None, ordem="rating", pagina=0, por_pagina=POR_PAGINA):
+    """Uma página de cuidadores e se há próxima (busca `por_pagina + 1`, sem count)."""
+    cursor = (
+        db.usuarios.find(filtro_busca(texto, preco_min, preco_max), CAMPOS_CARD)
+        .sort(ORDENS[ordem])
+        .skip(pagina * por_pagina)
+        .limit(por_pagina + 1)
+    )
+    itens = list(cursor)
+    return itens[:por_pagina], len(itens) > por_pagina
@@ -0,0 +1,173 @@
+import threading
+import time
+
+from pymongo import monitoring
+
+import agenda
+import chat
+import cuidadores
+import geo
+import scans
+
+# --- DATA ACCESS LAYER ---
+# Leituras repetidas a cada rerun passam por um cache com TTL, chaveado por
+# (usuário, coleção). Toda escrita feita pelo app passa por `Dados` e invalida
+# as chaves afetadas, inclusive as de outros usuários (ex.: um agendamento novo
+# invalida a lista de pedidos do cuidador).
+TTL_PADRAO = 60.0
+TODOS = "*"
+# Chaves (usuário, coleção) no cache do processo; acima disso saem as expiradas e depois as mais antigas
+MAX_CHAVES = 5000
+# Só os campos que as telas leem: o perfil volta a cada rerun de cada sessão
+PROJECAO_PERFIL = {"_id": 0, "usuario": 1, "nome": 1, "tipo": 1, "endereco": 1, "valores": 1, "capacidade": 1, "localizacao": 1}
+
+
+class ContadorComandos(monitoring.CommandListener):
+    """Conta round trips ao MongoDB por thread (= por rerun do Streamlit).
+
+    Com `observador` (telemetria.ObservadorComandos), cada comando também vira um span.
+    """
+
+    def __init__(self, observador=None):
+        self._local = threading.local()
+        self.observador = observador
+
+    def iniciar_rerun(self):
+        self._local.total = 0
+
+    def total(self):
+        return getattr(self._local, "total", 0)
+
+    def started(self, event):
+        self._local.total = self.total() + 1
+        if self.observador:
+            self.observador.started(event)
+
+    def succeeded(self, event):
+        if self.observador:
+            self.observador.succeeded(event)
+
+    def failed(self, event):
+        if self.observador:
+            self.observador.failed(event)
+
+
+class CacheConsultas:
+    def __init__(self, ttl=TTL_PADRAO, clock=time.monotonic, max_chaves=MAX_CHAVES):
+        self.ttl = ttl
+        self.clock = clock
+        self.max_chaves = max_chaves
+        self._lock = threading.Lock()
+        self._dados = {}
+        self.hits = 0
+        self.misses = 0
+
+    def obter(self, usuario, colecao, consulta, carregar, ttl=None):
+        """Valor em cache ou `carregar()`; o resultado é compartilhado, não mutar."""
+        agora = self.clock()
+        with self._lock:
+            item = self._dados.get((usuario, colecao), {}).get(consulta)
+            if item and item[0] > agora:
+                self.hits += 1
+                return item[1]
+            self.misses += 1
+        valor = carregar()
+        with self._lock:
+            self._dados.setdefault((usuario, colecao), {})[consulta] = (agora + (ttl or self.ttl), valor)
+            if len(self._dados) > self.max_chaves:
+                self._podar(agora)
+        return valor
+
+    def _podar(self, agora):
+        for chave, consultas in list(self._dados.items()):
+            for consulta, (expira, _) in list(consultas.items()):
+                if expira <= agora:
+                    del consultas[consulta]
+            if not consultas:
+                del self._dados[chave]
+        while len(self._dados) > self.max_chaves:
+            del self._dados[next(iter(self._dados))]
+
+    def invalidar(self, usuario, colecao):
+        with self._lock:
+            self._dados.pop((usuario, colecao), None)
+
+
+class Dados:
+    def __init__(self, db, cache=None):
+        self.db = db
+        self.cache = cache or CacheConsultas()
+
+    # --- leituras ---
+    def usuario(self, usuario):
+        return self.cache.obter(usuario, "perfil", "doc", lambda: self.db.usuarios.find_one({"usuario": usuario}, PROJECAO_PERFIL))
+
+    def pets(self, usuario):
+        return self.cache.obter(usuario, "pets", "todos", lambda: list(self.db.pets.find({"owner_id": usuario})))
+
+    def buscar_cuidadores(self, **filtros):
+        consulta = ("busca",) + tuple(sorted(filtros.items()))
+        return self.cache.obter(TODOS, "usuarios", consulta, lambda: cuidadores.buscar(self.db, **filtros))
+
+    def cuidadores_proximos(self, lat, lon, raio_km):
+        consulta = ("perto", round(lat, 4), round(lon, 4), raio_km)
+        return self.cache.obter(TODOS, "usuarios", consulta, lambda: geo.proximos(self.db, lat, lon, raio_km))
+
+    def pedidos_pendentes(self, cuidador):
+        return self.cache.obter(cuidador, "agendamentos", "pendentes", lambda: agenda.pendentes(self.db, cuidador))
+
+    def ocupacao(self, cuidador, inicio, fim):
+        return self.cache.obter(cuidador, "agenda", (inicio, fim), lambda: agenda.ocupacao(self.db, cuidador, inicio, fim), ttl=15.0)
+
+    def conversas(self, usuario):
+        return self.cache.obter(usuario, "conversas", "lista", lambda: chat.listar_conversas(self.db, usuario), ttl=30.0)
+
+    def historico_scans(self, pet):
+        return self.cache.obter(pet["owner_id"], "scans", pet["_id"], lambda: scans.historico(self.db, pet["_id"]))
+
+    # --- escritas (write-through + invalidação) ---
+    def criar_usuario(self, doc):
+        self.db.usuarios.insert_one(doc)
+        self.cache.invalidar(TODOS, "usuarios")
+
+    def atualizar_perfil(self, usuario, campos, remover=()):
+        mudanca = {"$set": campos}
+        if remover:
+            mudanca["$unset"] = {c: "" for c in remover}
+        self.db.usuarios.update_one({"usuario": usuario}, mudanca)
+        self.cache.invalidar(usuario, "perfil")
+        self.cache.invalidar(TODOS, "usuarios")
+
+    def salvar_pet(self, usuario, nome, especie):
+        self.db.pets.insert_one({"owner_id": usuario, "nome": nome, "especie": especie})
+        self.cache.invalidar(usuario, "pets")
+
+    def registrar_scan(self, pet, laudo, image_bytes, chave=None):
+        doc = scans.registrar(self.db, pet, laudo, image_bytes, chave)
+        self.cache.invalidar(pet["owner_id"], "pets")
+        self.cache.invalidar(pet["owner_id"], "scans")
+        return doc
+
+    def enviar_mensagem(self, sender, receiver, texto):
+        msg = chat.enviar(self.db, sender, receiver, texto)
+        self.cache.invalidar(sender, "conversas")
+        self.cache.invalidar(receiver, "conversas")
+        return msg
+
+    def marcar_lidas(self, tid, usuario):
+        chat.marcar_lidas(self.db, tid, usuario)
+        self.cache.invalidar(usuario, "conversas")
+
+    def solicitar_agendamento(self, tutor, cuidador, inicio, fim=None, capacidade=agenda.CAPACIDADE_PADRAO):
+        try:
+            return agenda.reservar(self.db, tutor, cuidador, inicio, fim, capacidade)
+        finally:
+            # lotado também invalida: a ocupação em cache estava desatualizada
+            self.cache.invalidar(cuidador, "agenda")
+            self.cache.invalidar(cuidador, "agendamentos")
+
+    def decidir_agendamentos(self, cuidador, ids, status):
+        n = agenda.decidir(self.db, cuidador, ids, status)
+        self.cache.invalidar(cuidador, "agendamentos")
+        self.cache.invalidar(cuidador, "agenda")
+        return n
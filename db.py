@@ -0,0 +1,40 @@
+import os
+import tomllib
+import urllib.parse
+
+from pymongo import MongoClient
+
+# --- CONEXÃO FORA DO STREAMLIT ---
+# O app usa st.secrets; processos avulsos (worker, scripts) leem o mesmo
+# .streamlit/secrets.toml, com variáveis de ambiente por cima.
+NOME_DB = "technoboltpets"
+SECRETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".streamlit", "secrets.toml")
+
+
+def mongo_uri(secrets):
+    if secrets.get("MONGO_URI"):
+        return secrets["MONGO_URI"]
+    user = secrets["MONGO_USER"]
+    password = urllib.parse.quote_plus(secrets["MONGO_PASS"])
+    host = secrets["MONGO_HOST"]
+    return f"mongodb+srv://{user}:{password}@{host}/?appName=Cluster0"
+
+
+def carregar_secrets(caminho=SECRETS_PATH):
+    secrets = {}
+    if os.path.exists(caminho):
+        with open(caminho, "rb") as f:
+            secrets.update(tomllib.load(f))
+    for nome, valor in os.environ.items():
+        if nome.startswith(("MONGO_", "GEMINI_CHAVE_")):
+            secrets[nome] = valor
+    return secrets
+
+
+def conectar(secrets, **kwargs):
+    kwargs.setdefault("serverSelectionTimeoutMS", 5000)
+    if not secrets.get("MONGO_URI"):
+        kwargs.setdefault("tlsAllowInvalidCertificates", True)
+    client = MongoClient(mongo_uri(secrets), **kwargs)
+    client.admin.command("ping")
+    return client[NOME_DB]
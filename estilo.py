@@ -0,0 +1,209 @@
+import functools
+import re
+
+import streamlit as st
+
+# --- DESIGN SYSTEM: OBSIDIAN & DEEP COCOA ---
+# O bloco é fixo: minificado uma vez por processo e reenviado igual a cada rerun
+CSS = """
+<style>
+    @import url('https://fonts.googleapis.com/css2?family=Plus+Jakarta+Sans:wght@300;400;600;800&display=swap');
+    
+    [data-testid="stSidebar"], .stApp, [data-testid="stHeader"], [data-testid="stSidebarContent"], .main { 
+        background-color: #000000 !important; color: #ffffff !important; 
+    }
+    * { font-family: 'Plus Jakarta Sans', sans-serif; color: #ffffff !important; }
+
+    /* MENU SUPERIOR (TABS) */
+    .stTabs [data-baseweb="tab-list"] {
+        background-color: #000000 !important;
+        border-bottom: 2px solid #3e2723 !important;
+        gap: 15px !important;
+    }
+    .stTabs [data-baseweb="tab"] {
+        height: 50px !important; background-color: #0d0d0d !important;
+        border-radius: 12px 12px 0 0 !important; color: #bbbbbb !important;
+        border: 1px solid #1a1a1a !important; padding: 0 30px !important;
+    }
+    .stTabs [aria-selected="true"] {
+        background-color: #3e2723 !important; color: #ffffff !important; border-color: #3e2723 !important;
+    }
+
+    /* --- CORREÇÃO: LABELS E TEXTOS FLUTUANTES (TRANSPARENTES) --- */
+    label, [data-testid="stLabel"], .stMarkdown p {
+        background-color: transparent !important;
+        color: #ffffff !important;
+    }
+
+    /* --- AJUSTE: FORMS E CONTAINERS --- */
+    div[data-testid="stForm"], .stForm {
+        background-color: #1e110f !important; /* Marrom escuro profundo */
+        border: 1px solid #4e342e !important;
+        padding: 20px !important;
+        border-radius: 15px !important;
+    }
+
+    /* --- CORREÇÃO: EXPANDER (CONVERSA COM...) --- */
+    [data-testid="stExpander"] {
+        background-color: #1e110f !important;
+        border: 1px solid #4e342e !important;
+        border-radius: 15px !important;
+        color: #ffffff !important;
+    }
+    [data-testid="stExpander"] summary {
+        color: #ffffff !important;
+        background-color: #1e110f !important; /* Remove fundo branco do header */
+    }
+    [data-testid="stExpander"] summary:hover {
+        background-color: #3e2723 !important;
+        color: #ffffff !important;
+    }
+    [data-testid="stExpander"] div[role="button"] p {
+        color: #ffffff !important;
+    }
+    
+    /* --- AJUSTE: INPUTS ESPECÍFICOS (Apenas a caixa digitável fica marrom) --- */
+    input, textarea, .stNumberInput input { 
+        background-color: #3e2723 !important; /* Marrom Cocoa */
+        color: #ffffff !important;
+        border-radius: 5px !important;
+    }
+    
+    /* Borda dos inputs */
+    div[data-baseweb="input"], div[data-baseweb="base-input"] {
+        background-color: #3e2723 !important;
+        border: 1px solid #5d4037 !important; 
+        border-radius: 5px !important;
+    }
+
+    /* --- AJUSTE: DROPDOWN (SELECTBOX) --- */
+    div[data-baseweb="select"] > div {
+        background-color: #3e2723 !important;
+        border: 1px solid #5d4037 !important;
+        color: #ffffff !important;
+    }
+    
+    /* Lista Suspensa (Popover e Virtual Dropdown) */
+    div[data-baseweb="popover"], div[role="listbox"], ul[data-testid="stSelectboxVirtualDropdown"] {
+        background-color: #2b1d16 !important; /* Marrom Coffee */
+        color: #ffffff !important;
+        border: 1px solid #4e342e !important;
+    }
+    div[role="option"], li[role="option"] { 
+        color: #ffffff !important; 
+        background-color: transparent !important; 
+    }
+    div[role="option"]:hover, li[role="option"]:hover { 
+        background-color: #4e342e !important; 
+    }
+
+    /* --- CORREÇÃO DEFINITIVA: CALENDÁRIO (DATE INPUT) --- */
+    /* 1. Container Flutuante (Popover) */
+    div[data-baseweb="popover"] > div,
+    div[data-baseweb="popover"] > div > div {
+        background-color: #2b1d16 !important;
+        border-color: #4e342e !important;
+    }
+
+    /* 2. O Widget de Calendário - Fundo Geral */
+    div[data-baseweb="calendar"] {
+        background-color: #2b1d16 !important;
+        color: #ffffff !important;
+    }
+
+    /* 3. "Nuclear": Força transparência em TODOS os divs internos para remover fundos brancos herdados */
+    div[data-baseweb="calendar"] div {
+        background-color: transparent !important;
+        color: #ffffff !important;
+    }
+
+    /* 4. Textos, Botões e Setas */
+    div[data-baseweb="calendar"] button {
+        background-color: transparent !important;
+        color: #ffffff !important;
+    }
+    div[data-baseweb="calendar"] svg {
+        fill: #ffffff !important;
+    }
+
+    /* 5. Interatividade (Hover e Seleção) */
+    div[data-baseweb="calendar"] button:hover {
+        background-color: #3e2723 !important;
+        color: #ffffff !important;
+    }
+    div[data-baseweb="calendar"] button[aria-selected="true"] {
+        background-color: #5d4037 !important; /* Marrom mais claro */
+        color: #ffffff !important;
+        font-weight: bold !important;
+        border: 1px solid #ffffff !important;
+    }
+
+    /* --- CORREÇÃO: FILE UPLOADER --- */
+    [data-testid="stFileUploader"] {
+        padding: 10px;
+    }
+    [data-testid="stFileUploaderDropzone"] {
+        background-color: #1e110f !important;
+        border: 1px dashed #4e342e !important;
+    }
+    [data-testid="stFileUploaderDropzone"] div {
+        color: #bbbbbb !important;
+        background-color: transparent !important;
+    }
+    [data-testid="stFileUploaderDropzone"] small {
+        color: #888888 !important;
+    }
+    
+    /* BOTÃO "BROWSE FILES" */
+    [data-testid="stFileUploader"] button {
+        background-color: #3e2723 !important; 
+        color: #ffffff !important;
+        border: 1px solid #5d4037 !important;
+    }
+    [data-testid="stFileUploader"] button:hover {
+        background-color: #4b3621 !important;
+        border-color: #ffffff !important;
+    }
+
+    /* BOTÕES GERAIS E ESPECÍFICOS */
+    .stButton > button, 
+    .stDownloadButton > button,
+    [data-testid="stFormSubmitButton"] > button,
+    button[kind="primary"], 
+    button[kind="secondary"] {
+        background-color: #3e2723 !important; 
+        color: #ffffff !important;
+        border: 1px solid #4b3621 !important; 
+        border-radius: 14px !important;
+        font-weight: 700 !important; 
+        transition: 0.3s ease;
+        width: 100% !important;
+    }
+    
+    .stButton > button:hover, 
+    .stDownloadButton > button:hover,
+    [data-testid="stFormSubmitButton"] > button:hover { 
+        background-color: #4b3621 !important; 
+        border-color: #ffffff !important; 
+        color: white !important; 
+    }
+
+    /* CARDS E CHAT */
+    .elite-card { background: #0d0d0d; border: 1px solid #3e2723; border-radius: 20px; padding: 25px; margin-bottom: 15px; }
+    .instruction-box { background: linear-gradient(145deg, #1a0f0d, #000000); border-left: 5px solid #3e2723; padding: 20px; border-radius: 10px; margin-bottom: 20px; }
+    .bubble { padding: 12px; border-radius: 15px; max-width: 80%; line-height: 1.4; margin-bottom: 5px; }
+    .sent { background-color: #3e2723; align-self: flex-end; color: white; margin-left: auto; }
+    .received { background-color: #1a1a1a; align-self: flex-start; color: #bbbbbb; margin-right: auto; }
+</style>
+"""
+
+
+@functools.lru_cache(maxsize=1)
+def minificado():
+    css = re.sub(r"/\*.*?\*/", "", CSS, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{};:,>])\s*", r"\1", css).strip()
+
+
+def aplicar():
+    st.markdown(minificado(), unsafe_allow_html=True)
@@ -0,0 +1,55 @@
+import re
+
+from pymongo import GEOSPHERE
+
+import cuidadores
+
+# --- MATCHING GEOGRÁFICO DE CUIDADORES ---
+# `localizacao` é um GeoJSON Point [lon, lat] sob índice 2dsphere; "perto de
+# mim" vira um $geoNear limitado por raio e quantidade, em vez de varrer todos.
+RAIO_PADRAO_KM = 10
+LIMITE_PADRAO = 20
+_COORDS = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*[,; ]\s*(-?\d+(?:\.\d+)?)\s*$")
+
+
+def preparar(db):
+    db.usuarios.create_index([("localizacao", GEOSPHERE)])
+
+
+def ponto(lat, lon):
+    return {"type": "Point", "coordinates": [float(lon), float(lat)]}
+
+
+def parse_coordenadas(texto):
+    """'-23.55, -46.63' -> (lat, lon); None se vazio/inválido."""
+    m = _COORDS.match(texto or "")
+    if not m:
+        return None
+    lat, lon = float(m.group(1)), float(m.group(2))
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon
+
+
+def coordenadas(doc):
+    loc = doc.get("localizacao")
+    if not loc:
+        return None
+    lon, lat = loc["coordinates"]
+    return lat, lon
+
+
+def proximos(db, lat, lon, raio_km=RAIO_PADRAO_KM, limite=LIMITE_PADRAO):
+    pipeline = [
+        {"$geoNear": {
+            "near": ponto(lat, lon),
+            "distanceField": "distancia_m",
+            "maxDistance": raio_km * 1000,
+            "query": {"tipo": "Cuidador"},
+            "spherical": True,
+        }},
+        {"$limit": limite},
+        {"$project": {**cuidadores.CAMPOS_CARD, "distancia_m": 1}},
+    ]
+    return list(db.usuarios.aggregate(pipeline))
+
@@ -0,0 +1,39 @@
+import scans
+from ia_router import IAIndisponivel, SAFE_CONFIG
+from recursos import obter_ia_router
+
+# --- AI CORE ENGINE (CORRIGIDO) ---
+PROMPT_SCAN = "Analise este animal: Escore corporal visual e sinais visíveis de saúde." + scans.INSTRUCAO_ESTRUTURA
+ERROS_IA = ("Erro:", "IA Offline")
+IA_INTERROMPIDA = "⚠️ Resposta da IA interrompida"
+
+def call_ia(prompt, img=None, stream=False, router=None):
+    # `router` explícito para threads de lote (sem contexto do Streamlit)
+    router = router or obter_ia_router()
+    conteudo = [prompt, img] if img else prompt
+    if not router.chaves:
+        erro = "Erro: Chaves de API (GEMINI_CHAVE_X) não encontradas no secrets."
+        return iter([erro]) if stream else erro
+
+    if stream:
+        return _call_ia_stream(router, conteudo)
+    try:
+        return router.gerar(conteudo, safety_settings=SAFE_CONFIG)
+    except IAIndisponivel as e:
+        return f"IA Offline ou sobrecarregada. Detalhe do erro: {e.last_error}"
+
+def _call_ia_stream(router, conteudo):
+    recebeu = False
+    try:
+        for parte in router.gerar_stream(conteudo, safety_settings=SAFE_CONFIG):
+            recebeu = True
+            yield parte
+    except IAIndisponivel as e:
+        yield f"IA Offline ou sobrecarregada. Detalhe do erro: {e.last_error}"
+    except Exception as e:
+        if not recebeu:
+            raise
+        yield f"\n\n{IA_INTERROMPIDA}: {e}"
+
+def laudo_valido(res):
+    return bool(res.strip()) and not res.startswith(ERROS_IA) and IA_INTERROMPIDA not in res
@@ -0,0 +1,321 @@
+import random
+import threading
+import time
+from collections import deque
+
+# --- ROTEADOR DE CHAVES/MODELOS DO GEMINI ---
+# Vive o processo inteiro (st.cache_resource). Guarda taxa de erro e latência
+# por chave e por modelo, abre circuito em chaves com 429/cota e em modelos que
+# falham seguidamente, e reaproveita as instâncias de GenerativeModel.
+JANELA = 100
+COOLDOWN_COTA = 60.0
+COOLDOWN_MODELO = 30.0
+FALHAS_PARA_ABRIR = 3
+LIMITE_POR_CHAVE = 2
+# Vagas que o modo lote deixa livres para scans interativos de outras sessões
+RESERVA_INTERATIVA = 2
+ESPERA_VAGA = 60.0
+
+MOTORES = [
+    "models/gemini-3-flash-preview",
+    "models/gemini-2.5-flash",
+    "models/gemini-2.0-flash",
+    "models/gemini-flash-latest"
+]
+
+# Configuração de segurança para permitir análise veterinária
+SAFE_CONFIG = [
+    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"}
+]
+
+
+def chaves_gemini(secrets):
+    return [secrets.get(f"GEMINI_CHAVE_{i}") for i in range(1, 8) if secrets.get(f"GEMINI_CHAVE_{i}")]
+
+
+class IAIndisponivel(Exception):
+    def __init__(self, last_error):
+        super().__init__(str(last_error))
+        self.last_error = last_error
+
+
+def erro_de_cota(e):
+    if type(e).__name__ in ("ResourceExhausted", "TooManyRequests"):
+        return True
+    if getattr(e, "code", None) == 429:
+        return True
+    msg = str(e).lower()
+    return "429" in msg or "quota" in msg or "rate limit" in msg
+
+
+def percentil(valores, p):
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p * (len(ordenados) - 1))))]
+
+
+class Saude:
+    def __init__(self, janela=JANELA):
+        self.latencias = deque(maxlen=janela)
+        self.resultados = deque(maxlen=janela)
+        self.falhas_seguidas = 0
+        self.aberto_ate = 0.0
+
+    def sucesso(self, latencia):
+        self.latencias.append(latencia)
+        self.resultados.append(True)
+        self.falhas_seguidas = 0
+        self.aberto_ate = 0.0
+
+    def falha(self):
+        self.resultados.append(False)
+        self.falhas_seguidas += 1
+
+    def abrir(self, agora, cooldown):
+        self.aberto_ate = max(self.aberto_ate, agora + cooldown)
+
+    def disponivel(self, agora):
+        return self.aberto_ate <= agora
+
+    @property
+    def taxa_erro(self):
+        if not self.resultados:
+            return 0.0
+        return self.resultados.count(False) / len(self.resultados)
+
+    @property
+    def p50(self):
+        return percentil(self.latencias, 0.50)
+
+    @property
+    def p95(self):
+        return percentil(self.latencias, 0.95)
+
+    def resumo(self, agora):
+        return {
+            "chamadas": len(self.resultados),
+            "taxa_erro": round(self.taxa_erro, 3),
+            "p50_s": round(self.p50, 3) if self.p50 is not None else None,
+            "p95_s": round(self.p95, 3) if self.p95 is not None else None,
+            "circuito": "aberto" if not self.disponivel(agora) else "fechado",
+        }
+
+
+def _modelo_gemini(chave, motor):
+    import google.generativeai as genai
+    from google.ai import generativelanguage as glm
+
+    model = genai.GenerativeModel(motor)
+    # Cliente próprio por chave: genai.configure() é global ao processo
+    model._client = glm.GenerativeServiceClient(client_options={"api_key": chave})
+    return model
+
+
+def _tokens(resposta):
+    uso = getattr(resposta, "usage_metadata", None)
+    if uso is None:
+        return None
+    return getattr(uso, "prompt_token_count", 0) or 0, getattr(uso, "candidates_token_count", 0) or 0
+
+
+def _texto(chunk):
+    if chunk is None:
+        return ""
+    try:
+        return chunk.text
+    except ValueError:
+        # Pedaço sem parte de texto (ex.: só metadados de segurança)
+        return ""
+
+
+class IARouter:
+    def __init__(self, chaves, motores, model_factory=_modelo_gemini, clock=time.monotonic, limite_por_chave=LIMITE_POR_CHAVE,
+                 espera_vaga=ESPERA_VAGA):
+        self.chaves = list(chaves)
+        self.motores = list(motores)
+        self.limite_por_chave = limite_por_chave
+        self.espera_vaga = espera_vaga
+        # Chamadas simultâneas por chave (evita estourar a cota); a chamada pega a
+        # primeira chave com vaga e só espera quando todas estão ocupadas
+        self._ocupadas = {c: 0 for c in self.chaves}
+        self._vaga_livre = threading.Condition()
+        self.model_factory = model_factory
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._modelos = {}
+        self.saude_chaves = {c: Saude() for c in self.chaves}
+        self.saude_motores = {m: Saude() for m in self.motores}
+        # observador(motor, chave, latencia, erro=None, tokens=None): uma chamada por tentativa (telemetria)
+        self.observador = None
+
+    @property
+    def workers_lote(self):
+        """Threads de IA do modo lote: todas as vagas menos a reserva para os scans interativos."""
+        return max(1, len(self.chaves) * self.limite_por_chave - RESERVA_INTERATIVA)
+
+    def _reservar(self, chaves):
+        """Primeira chave de `chaves` (na ordem) com vaga; sem nenhuma, espera até `espera_vaga` por qualquer uma."""
+        prazo = time.monotonic() + self.espera_vaga
+        with self._vaga_livre:
+            while True:
+                for chave in chaves:
+                    if self._ocupadas[chave] < self.limite_por_chave:
+                        self._ocupadas[chave] += 1
+                        return chave
+                restante = prazo - time.monotonic()
+                if restante <= 0:
+                    raise IAIndisponivel(f"nenhuma vaga livre nas chaves após {self.espera_vaga:.0f}s")
+                self._vaga_livre.wait(restante)
+
+    def _liberar(self, chave):
+        with self._vaga_livre:
+            self._ocupadas[chave] -= 1
+            self._vaga_livre.notify_all()
+
+    def _modelo(self, chave, motor):
+        with self._lock:
+            model = self._modelos.get((chave, motor))
+            if model is None:
+                model = self._modelos[(chave, motor)] = self.model_factory(chave, motor)
+            return model
+
+    def _ordenar(self, alvos, saude, agora, custo):
+        # Saudáveis primeiro, por custo (sort estável: a ordem da lista desempata).
+        # Sem nenhum saudável, tenta o circuito que fecha primeiro (half-open).
+        abertos = [a for a in alvos if not saude[a].disponivel(agora)]
+        fechados = [a for a in alvos if saude[a].disponivel(agora)]
+        fechados.sort(key=lambda a: custo(saude[a]))
+        if fechados:
+            return fechados
+        return sorted(abertos, key=lambda a: saude[a].aberto_ate)[:1]
+
+    def _chaves_ordenadas(self, agora):
+        chaves = list(self.chaves)
+        random.shuffle(chaves)  # espalha carga entre chaves equivalentes
+        return self._ordenar(chaves, self.saude_chaves, agora, lambda s: s.taxa_erro)
+
+    def _motores_ordenados(self):
+        with self._lock:
+            # Latência p50 (sem histórico = 0, para explorar) penalizada por erros
+            return self._ordenar(
+                self.motores, self.saude_motores, self.clock(), lambda s: (s.p50 or 0.0) * (1 + 4 * s.taxa_erro)
+            )
+
+    def _observar(self, chave, motor, latencia, **kwargs):
+        if self.observador:
+            self.observador(motor, f"chave #{self.chaves.index(chave) + 1}", latencia, **kwargs)
+
+    def _falhou(self, chave, motor, e, latencia=None):
+        """Registra a falha; True se o problema é da chave (tentar a próxima)."""
+        self._observar(chave, motor, latencia, erro=e)
+        with self._lock:
+            agora = self.clock()
+            if erro_de_cota(e):
+                self.saude_chaves[chave].falha()
+                self.saude_chaves[chave].abrir(agora, COOLDOWN_COTA)
+                return True
+            saude = self.saude_motores[motor]
+            saude.falha()
+            if saude.falhas_seguidas >= FALHAS_PARA_ABRIR:
+                saude.abrir(agora, COOLDOWN_MODELO)
+            return False
+
+    def _sucesso(self, chave, motor, latencia, tokens=None):
+        self._observar(chave, motor, latencia, tokens=tokens)
+        with self._lock:
+            self.saude_chaves[chave].sucesso(latencia)
+            self.saude_motores[motor].sucesso(latencia)
+
+    def gerar(self, conteudo, **kwargs):
+        if not self.chaves:
+            raise IAIndisponivel("nenhuma chave configurada")
+
+        last_error = None
+        for motor in self._motores_ordenados():
+            with self._lock:
+                chaves = self._chaves_ordenadas(self.clock())
+            while chaves:
+                chave = self._reservar(chaves)
+                chaves.remove(chave)
+                t0 = self.clock()
+                try:
+                    resposta = self._modelo(chave, motor).generate_content(conteudo, **kwargs)
+                    texto = resposta.text
+                except Exception as e:
+                    last_error = e
+                    if self._falhou(chave, motor, e, self.clock() - t0):
+                        continue
+                    break
+                finally:
+                    self._liberar(chave)
+                self._sucesso(chave, motor, self.clock() - t0, _tokens(resposta))
+                return texto
+
+        raise IAIndisponivel(last_error)
+
+    def gerar_stream(self, conteudo, **kwargs):
+        """Como `gerar`, mas produz o texto em pedaços conforme o Gemini envia.
+
+        O fallback para o próximo par (chave, modelo) só acontece antes do
+        primeiro pedaço (stream vazio ou bloqueado também é falha); depois
+        disso o erro sobe para quem está consumindo.
+        """
+        if not self.chaves:
+            raise IAIndisponivel("nenhuma chave configurada")
+
+        last_error = None
+        for motor in self._motores_ordenados():
+            with self._lock:
+                chaves = self._chaves_ordenadas(self.clock())
+            while chaves:
+                chave = self._reservar(chaves)
+                chaves.remove(chave)
+                t0 = self.clock()
+                try:
+                    it = iter(self._modelo(chave, motor).generate_content(conteudo, stream=True, **kwargs))
+                    ultimo = next(it, None)
+                    if ultimo is None:
+                        raise ValueError("stream terminou sem nenhum pedaço")
+                    # como em `gerar`: resposta bloqueada levanta ValueError em `.text` e vai para o fallback
+                    texto = ultimo.text
+                    if not texto:
+                        raise ValueError("primeiro pedaço do stream sem texto")
+                except Exception as e:
+                    self._liberar(chave)
+                    last_error = e
+                    if self._falhou(chave, motor, e, self.clock() - t0):
+                        continue
+                    break
+
+                try:
+                    yield texto
+                    for ultimo in it:
+                        texto = _texto(ultimo)
+                        if texto:
+                            yield texto
+                except Exception as e:
+                    self._falhou(chave, motor, e, self.clock() - t0)
+                    raise
+                finally:
+                    self._liberar(chave)
+                # o uso de tokens vem no último pedaço do stream
+                self._sucesso(chave, motor, self.clock() - t0, _tokens(ultimo))
+                return
+
+        raise IAIndisponivel(last_error)
+
+    def stats(self):
+        with self._lock:
+            agora = self.clock()
+            linhas = [
+                {"alvo": m, "tipo": "modelo", **s.resumo(agora)} for m, s in self.saude_motores.items()
+            ]
+            linhas += [
+                {"alvo": f"chave #{i + 1}", "tipo": "chave", **self.saude_chaves[c].resumo(agora)}
+                for i, c in enumerate(self.chaves)
+            ]
+            return linhas
@@ -0,0 +1,87 @@
+import io
+import time
+from dataclasses import dataclass, field
+
+from PIL import Image, ImageOps
+
+try:
+    import pillow_heif
+    pillow_heif.register_heif_opener()
+except Exception:
+    pillow_heif = None
+
+# --- PRE-SCAN IMAGE PIPELINE ---
+# O modelo não ganha nada com fotos de 12-48 MP: limitamos a maior aresta
+# antes do upload para o Gemini e reencodamos sem metadados (EXIF/GPS).
+MAX_EDGE = 1536
+FORMATO_PADRAO = "JPEG"
+QUALIDADE_PADRAO = 85
+
+MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+
+@dataclass
+class ScanImage:
+    data: bytes
+    mime_type: str
+    size: tuple
+    source_bytes: int
+    timings: dict = field(default_factory=dict)
+
+    def as_part(self):
+        """Blob inline aceito pelo `generate_content` do Gemini."""
+        return {"mime_type": self.mime_type, "data": self.data}
+
+
+def _ler_bytes(src):
+    if isinstance(src, (bytes, bytearray)):
+        return bytes(src)
+    if hasattr(src, "getvalue"):
+        return src.getvalue()
+    if hasattr(src, "seek"):
+        src.seek(0)
+    return src.read()
+
+
+def _trocar(img, nova):
+    # Fecha a intermediária na hora em vez de esperar o GC: na foto cheia cada cópia pesa dezenas de MB
+    if nova is not img:
+        img.close()
+    return nova
+
+
+def normalize_image(src, max_edge=MAX_EDGE, formato=FORMATO_PADRAO, quality=QUALIDADE_PADRAO):
+    raw = _ler_bytes(src)
+    timings = {}
+
+    t0 = time.perf_counter()
+    img = Image.open(io.BytesIO(raw))
+    try:
+        # JPEG: o decoder já entrega a imagem em escala 1/2, 1/4 ou 1/8
+        if img.format == "JPEG":
+            img.draft("RGB", (max_edge, max_edge))
+        img.load()
+        timings["decode"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        fator = max(img.size) // max_edge
+        if fator >= 2:
+            img = _trocar(img, img.reduce(fator))
+        if max(img.size) > max_edge:
+            img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+        # Rotaciona só depois de reduzir: girar a foto cheia custa caro
+        img = _trocar(img, ImageOps.exif_transpose(img))
+        if img.mode != "RGB":
+            img = _trocar(img, img.convert("RGB"))
+        timings["resize"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        buf = io.BytesIO()
+        # Sem `exif=`/`icc_profile=` o Pillow não copia os metadados da origem
+        img.save(buf, format=formato, quality=quality, optimize=formato == "JPEG")
+        data = buf.getvalue()
+        timings["encode"] = time.perf_counter() - t0
+
+        return ScanImage(data=data, mime_type=MIME_TYPES[formato], size=img.size, source_bytes=len(raw), timings=timings)
+    finally:
+        img.close()
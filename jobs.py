@@ -0,0 +1,100 @@
+import io
+import random
+from datetime import datetime, timedelta
+
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+# --- FILA DE JOBS (MONGODB) ---
+# Scans e PDFs saem da thread do script: a sessão enfileira, um worker
+# (`python worker.py`) reserva com lease, executa, e grava o resultado no
+# próprio job. Falhas voltam para a fila com backoff exponencial.
+PENDENTE, EXECUTANDO, CONCLUIDO, FALHOU = "pendente", "executando", "concluido", "falhou"
+MAX_TENTATIVAS = 4
+BACKOFF_BASE = 5.0
+BACKOFF_MAX = 300.0
+LEASE = 120.0
+RETENCAO = timedelta(days=1)
+
+
+def preparar(db):
+    db.jobs.create_index([("status", ASCENDING), ("proximo_em", ASCENDING)])
+    # Um job vivo por chave: `chave_ativa` só existe enquanto o job não falhou de vez
+    db.jobs.create_index("chave_ativa", unique=True, partialFilterExpression={"chave_ativa": {"$exists": True}})
+    db.jobs.create_index("expira_em", expireAfterSeconds=0)
+
+
+def enfileirar(db, tipo, payload, chave=None, rotulo=None, max_tentativas=MAX_TENTATIVAS):
+    """Cria o job, ou devolve o existente com a mesma `chave` que não falhou."""
+    while True:
+        if chave:
+            existente = db.jobs.find_one({"chave_ativa": chave}, {"_id": 1})
+            if existente:
+                return existente["_id"]
+        agora = datetime.now()
+        doc = {
+            "tipo": tipo, "status": PENDENTE, "payload": payload, "chave": chave, "rotulo": rotulo,
+            "tentativas": 0, "max_tentativas": max_tentativas,
+            "proximo_em": agora, "criado_em": agora, "atualizado_em": agora,
+        }
+        if chave:
+            doc["chave_ativa"] = chave
+        try:
+            return db.jobs.insert_one(doc).inserted_id
+        except DuplicateKeyError:
+            # outra sessão enfileirou a mesma chave entre a consulta e o insert: devolve o job dela
+            continue
+
+
+def reservar(db, worker_id, lease=LEASE):
+    agora = datetime.now()
+    return db.jobs.find_one_and_update(
+        {"$or": [
+            {"status": PENDENTE, "proximo_em": {"$lte": agora}},
+            # worker que morreu no meio: lease venceu, outro assume
+            {"status": EXECUTANDO, "lease_ate": {"$lt": agora}},
+        ]},
+        {"$set": {"status": EXECUTANDO, "worker": worker_id, "lease_ate": agora + timedelta(seconds=lease), "atualizado_em": agora},
+         "$inc": {"tentativas": 1}},
+        sort=[("proximo_em", ASCENDING)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+def concluir(db, job, resultado):
+    agora = datetime.now()
+    db.jobs.update_one(
+        {"_id": job["_id"], "worker": job["worker"]},
+        {"$set": {"status": CONCLUIDO, "resultado": resultado, "atualizado_em": agora, "expira_em": agora + RETENCAO},
+         "$unset": {"payload": "", "lease_ate": ""}},
+    )
+
+
+def backoff(tentativas, base=BACKOFF_BASE):
+    return min(BACKOFF_MAX, base * 2 ** (tentativas - 1)) * random.uniform(0.8, 1.2)
+
+
+def falhar(db, job, erro):
+    agora = datetime.now()
+    remover = {"lease_ate": ""}
+    if job["tentativas"] >= job.get("max_tentativas", MAX_TENTATIVAS):
+        mudanca = {"status": FALHOU, "erro": str(erro), "expira_em": agora + RETENCAO}
+        remover["chave_ativa"] = ""  # a mesma imagem pode ser enfileirada de novo
+    else:
+        mudanca = {"status": PENDENTE, "erro": str(erro), "proximo_em": agora + timedelta(seconds=backoff(job["tentativas"]))}
+    mudanca["atualizado_em"] = agora
+    db.jobs.update_one({"_id": job["_id"], "worker": job["worker"]}, {"$set": mudanca, "$unset": remover})
+
+
+def estados(db, ids):
+    """Status (e laudo, quando pronto) de vários jobs numa query só; o PDF fica no banco (ver `pdf`)."""
+    if not ids:
+        return {}
+    docs = db.jobs.find({"_id": {"$in": list(ids)}}, {"payload": 0, "resultado.pdf": 0})
+    return {d["_id"]: d for d in docs}
+
+
+def pdf(db, jid):
+    """PDF de um job concluído, lido só quando o usuário clica em baixar."""
+    doc = db.jobs.find_one({"_id": jid}, {"resultado.pdf": 1})
+    return io.BytesIO(doc["resultado"]["pdf"]) if doc and doc.get("resultado") else io.BytesIO()
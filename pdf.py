@@ -0,0 +1,293 @@
+import copy
+import functools
+import io
+import os
+import re
+import shutil
+import tempfile
+
+from fontTools import subset, ttLib
+from fpdf import FPDF
+from fpdf.fonts import SubsetMap
+
+# --- PDF ENGINE ---
+# A fonte Unicode (DejaVu, com acentos) é recortada para latim + pontuação e
+# processada uma vez por processo; cada documento recebe um clone dela em vez
+# de reparsear o TTF. O laudo em Markdown vira títulos, listas e negrito numa
+# passada só, com a quebra de linha feita por tabela de larguras.
+DIRS_FONTE = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts"),
+    "/usr/share/fonts/truetype/dejavu",
+]
+ARQUIVOS_FONTE = {"": "DejaVuSans.ttf", "B": "DejaVuSans-Bold.ttf"}
+FAMILIA = "technobolt"
+LATIN1 = [*range(0x20, 0x7F), *range(0xA0, 0x100)]
+# latin-1 + o que o cp1252 acrescenta (aspas curvas, travessões, €) + setas e ≤ ≥:
+# poucos glifos deixam o recorte que o fpdf faz em cada PDF bem mais barato
+FAIXAS_UNICODE = [
+    *LATIN1, 0x152, 0x153, 0x160, 0x161, 0x178, 0x17D, 0x17E, 0x192,
+    *range(0x2013, 0x2015), *range(0x2018, 0x201F), *range(0x2020, 0x2023), 0x2026, 0x2030, 0x2039, 0x203A,
+    0x20AC, 0x2122, *range(0x2190, 0x2194), 0x2264, 0x2265,
+]
+MARROM = (62, 39, 35)
+CORPO = 11
+ENTRELINHA = 6
+TITULOS = {1: 15, 2: 13, 3: 12}
+RECUO_ITEM = 6
+
+_TITULO = re.compile(r"^\s*(#{1,6})\s+(.*)$")
+_ITEM = re.compile(r"^(\s*)([-*+•]|\d{1,2}[.)])\s+(.*)$")
+_REGRA = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+_NEGRITO = re.compile(r"(\*\*)")
+_PALAVRAS = re.compile(r"\S+\s*|\s+")
+
+
+class _Filtro(dict):
+    """Tabela para `str.translate`: mantém o que a fonte desenha, descarta o resto (emojis etc.)."""
+
+    def __init__(self, caracteres):
+        super().__init__()
+        self.caracteres = caracteres
+
+    def __missing__(self, codigo):
+        self[codigo] = codigo if chr(codigo) in self.caracteres else None
+        return self[codigo]
+
+
+class Fonte:
+    def __init__(self, familia, larguras, caracteres, prototipos=None, dados=None):
+        self.familia = familia
+        self.larguras = larguras  # {estilo: {caractere: largura em milésimos do corpo}}
+        self.prototipos = prototipos or {}
+        self.dados = dados or {}
+        self.marcador = "•" if "•" in caracteres else "-"
+        self._filtro = _Filtro(caracteres | {"\n", "\r"})
+
+    def instalar(self, pdf):
+        # o clone mexe em campos internos do TTFFont: fpdf2 fica fixado em requirements.txt
+        for estilo, proto in self.prototipos.items():
+            fonte = copy.copy(proto)
+            fonte.i = len(pdf.fonts) + 1
+            # o subsetter do fpdf altera o TTFont na saída: cada documento abre o seu
+            fonte.ttfont = ttLib.TTFont(io.BytesIO(self.dados[estilo]), recalcTimestamp=False, recalcBBoxes=False, lazy=True)
+            fonte._hbfont = None
+            fonte.biggest_size_pt = 0
+            fonte.missing_glyphs = []
+            fonte.subset = SubsetMap(fonte)
+            pdf.fonts[fonte.fontkey] = fonte
+
+    def limpar(self, texto):
+        return texto.translate(self._filtro) if texto else ""
+
+
+def _recortar(origem, destino):
+    opcoes = subset.Options()
+    opcoes.layout_features = []
+    opcoes.notdef_outline = True
+    opcoes.hinting = False
+    opcoes.drop_tables += ["FFTM", "GDEF", "GPOS", "GSUB", "MATH", "hdmx", "kern", "gasp"]
+    ttf = subset.load_font(origem, opcoes)
+    sub = subset.Subsetter(opcoes)
+    sub.populate(unicodes=FAIXAS_UNICODE)
+    sub.subset(ttf)
+    subset.save_font(ttf, destino, opcoes)
+    ttf.close()
+
+
+def _fonte_core():
+    base = FPDF()
+    larguras = {}
+    for estilo in ARQUIVOS_FONTE:
+        base.set_font("Helvetica", estilo, CORPO)
+        larguras[estilo] = dict(base.current_font.cw)
+    return Fonte("Helvetica", larguras, frozenset(map(chr, LATIN1)))
+
+
+@functools.lru_cache(maxsize=1)
+def fonte_padrao():
+    """DejaVu recortada (uma vez por processo); sem ela, Helvetica com latin-1."""
+    for pasta in DIRS_FONTE:
+        origens = {e: os.path.join(pasta, a) for e, a in ARQUIVOS_FONTE.items()}
+        if all(os.path.exists(o) for o in origens.values()):
+            break
+    else:
+        return _fonte_core()
+    destino_dir = tempfile.mkdtemp(prefix="technobolt-fontes-")
+    base = FPDF()
+    dados = {}
+    for estilo, origem in origens.items():
+        destino = os.path.join(destino_dir, os.path.basename(origem))
+        _recortar(origem, destino)
+        base.add_font(FAMILIA, estilo, destino)
+        with open(destino, "rb") as f:
+            dados[estilo] = f.read()
+    prototipos = {e: base.fonts[FAMILIA + e] for e in origens}
+    for proto in prototipos.values():
+        proto.ttfont.close()  # os clones abrem a partir de `dados`
+    shutil.rmtree(destino_dir, ignore_errors=True)
+    larguras = {e: {chr(c): w for c, w in p.cw.items()} for e, p in prototipos.items()}
+    caracteres = frozenset(larguras[""]).intersection(*larguras.values())
+    return Fonte(FAMILIA, larguras, caracteres, prototipos, dados)
+
+
+class TechnoboltPDF(FPDF):
+    def __init__(self, fonte=None):
+        super().__init__()
+        self.fonte = fonte or fonte_padrao()
+        self.fonte.instalar(self)
+        self.c_margin = 0  # trechos de estilos diferentes são células coladas
+
+    def header(self):
+        self.set_fill_color(*MARROM)
+        self.rect(0, 0, 210, 45, 'F')
+        self.set_y(15)
+        self.set_font(self.fonte.familia, 'B', 28)
+        self.set_text_color(255, 255, 255)
+        self.cell(0, 10, 'TECHNOBOLT', new_x="LMARGIN", new_y="NEXT", align='C')
+        self.set_font(self.fonte.familia, '', 11)
+        self.cell(0, 10, 'Health Analytics & Veterinary AI Report', new_x="LMARGIN", new_y="NEXT", align='C')
+        self.ln(20)
+
+
+# --- MARKDOWN DO LAUDO ---
+def _trechos(texto, estilo=""):
+    """'a **b** c' -> [('a ', ''), ('b', 'B'), (' c', '')]; demais marcas são descartadas."""
+    trechos = []
+    negrito = False
+    for parte in _NEGRITO.split(texto):
+        if parte == "**":
+            negrito = not negrito
+        elif parte:
+            trechos.append((parte.replace("*", "").replace("`", ""), "B" if negrito else estilo))
+    return trechos
+
+
+def _anexar(linha, texto, estilo):
+    if linha and linha[-1][1] == estilo:
+        linha[-1] = (linha[-1][0] + texto, estilo)
+    else:
+        linha.append((texto, estilo))
+
+
+def _fechar(linha, linhas):
+    while linha and not linha[-1][0].rstrip():
+        linha.pop()
+    if linha:
+        linha[-1] = (linha[-1][0].rstrip(), linha[-1][1])
+        linhas.append(linha)
+    return []
+
+
+def _quebrar(trechos, largura, larguras, escala):
+    """Quebra em linhas de no máximo `largura`, palavra a palavra, somando larguras tabeladas."""
+    linhas, linha, usado = [], [], 0.0
+    for texto, estilo in trechos:
+        cw = larguras[estilo]
+        for palavra in _PALAVRAS.findall(texto):
+            nua = palavra.rstrip()
+            if not nua:
+                if linha:
+                    _anexar(linha, palavra, estilo)
+                    usado += len(palavra) * cw[" "] * escala
+                continue
+            w = sum(cw[c] for c in nua) * escala
+            if linha and usado + w > largura:
+                linha, usado = _fechar(linha, linhas), 0.0
+            while w > largura and len(nua) > 1:
+                # palavra maior que a linha (URL, sequência sem espaço): corta onde couber
+                acum, corte = 0.0, 0
+                for c in nua:
+                    acum += cw[c] * escala
+                    if acum > largura:
+                        break
+                    corte += 1
+                corte = max(corte, 1)
+                linhas.append([(nua[:corte], estilo)])
+                nua, palavra = nua[corte:], palavra[corte:]
+                w = sum(cw[c] for c in nua) * escala
+            _anexar(linha, palavra, estilo)
+            usado += w + (len(palavra) - len(nua)) * cw[" "] * escala
+    _fechar(linha, linhas)
+    return linhas
+
+
+def _paragrafo(pdf, trechos, tamanho=CORPO, recuo=0, marcador=None):
+    pdf.set_font(pdf.fonte.familia, "", tamanho)
+    h = max(ENTRELINHA, pdf.font_size * 1.4)
+    linhas = _quebrar(trechos, pdf.epw - recuo, pdf.fonte.larguras, pdf.font_size / 1000)
+    for i, linha in enumerate(linhas):
+        if pdf.will_page_break(h):
+            pdf.add_page()
+        if marcador and i == 0:
+            pdf.set_x(pdf.l_margin + recuo - RECUO_ITEM)
+            pdf.set_font(style="")
+            pdf.cell(RECUO_ITEM, h, marcador)
+        pdf.set_x(pdf.l_margin + recuo)
+        for texto, estilo in linha:
+            pdf.set_font(style=estilo)
+            pdf.cell(h=h, text=texto)
+        pdf.ln(h)
+
+
+def _markdown(pdf, laudo):
+    for linha in pdf.fonte.limpar(laudo.expandtabs(4)).splitlines():
+        if not linha.strip():
+            pdf.ln(ENTRELINHA / 2)
+        elif _REGRA.match(linha):
+            y = pdf.get_y() + 1.5
+            pdf.line(pdf.l_margin, y, pdf.w - pdf.r_margin, y)
+            pdf.ln(3)
+        elif m := _TITULO.match(linha):
+            pdf.ln(2)
+            pdf.set_text_color(*MARROM)
+            _paragrafo(pdf, _trechos(m.group(2), "B"), TITULOS[min(len(m.group(1)), 3)])
+            pdf.set_text_color(0, 0, 0)
+        elif m := _ITEM.match(linha):
+            nivel = min(len(m.group(1)) // 2, 3)
+            marcador = m.group(2) if m.group(2)[0].isdigit() else pdf.fonte.marcador
+            _paragrafo(pdf, _trechos(m.group(3)), recuo=RECUO_ITEM * (nivel + 1), marcador=marcador)
+        else:
+            _paragrafo(pdf, _trechos(linha.strip()))
+
+
+def _pdf_secao(pdf, pet_name, especie, modo, sintomas, laudo):
+    limpar = pdf.fonte.limpar
+    pdf.add_page()
+    pdf.set_text_color(*MARROM)
+    pdf.set_font(pdf.fonte.familia, 'B', 16)
+    pdf.cell(0, 10, limpar(f"PACIENTE: {pet_name.upper()} ({especie.upper()})"), new_x="LMARGIN", new_y="NEXT")
+    pdf.ln(5)
+    pdf.set_text_color(0, 0, 0)
+    _paragrafo(pdf, [("Módulo: ", "B"), (limpar(modo), "")], 12)
+    _paragrafo(pdf, [("Sintomas: ", "B"), (limpar(sintomas or "Nenhum descrito"), "")], 12)
+    pdf.ln(5)
+    pdf.set_fill_color(245, 245, 245)
+    pdf.set_font(pdf.fonte.familia, 'B', 14)
+    pdf.cell(0, 12, limpar("PARECER TÉCNICO IA"), new_x="LMARGIN", new_y="NEXT", fill=True, align='C')
+    pdf.ln(5)
+    _markdown(pdf, laudo or "")
+
+
+def create_pdf_report(pet_name, especie, modo, sintomas, laudo):
+    pdf = TechnoboltPDF()
+    _pdf_secao(pdf, pet_name, especie, modo, sintomas, laudo)
+    return bytes(pdf.output())
+
+
+def create_pdf_lote(secoes, especie, modo, sintomas):
+    """Um único PDF com uma seção (página) por animal: secoes = [(nome, laudo)]."""
+    pdf = TechnoboltPDF()
+    for pet_name, laudo in secoes:
+        _pdf_secao(pdf, pet_name, especie, modo, sintomas, laudo)
+    return bytes(pdf.output())
+
+
+def render_lote(relatorios):
+    """Um PDF por relatório numa chamada: relatorios = [(pet_name, especie, modo, sintomas, laudo)]."""
+    fonte = fonte_padrao()
+    saida = []
+    for relatorio in relatorios:
+        pdf = TechnoboltPDF(fonte)
+        _pdf_secao(pdf, *relatorio)
+        saida.append(bytes(pdf.output()))
+    return saida
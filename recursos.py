@@ -0,0 +1,103 @@
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+import agenda
+import artefatos
+import auditoria
+import auth
+import chat
+import chat_vivo
+import cuidadores
+import geo
+import jobs
+import scans
+import telemetria
+from dados import ContadorComandos, Dados
+from db import conectar
+from ia_router import IARouter, MOTORES, chaves_gemini
+from scan_cache import ScanCache
+
+# --- RECURSOS POR PROCESSO ---
+# Tudo que é compartilhado entre sessões (st.cache_resource). As telas chamam
+# os getters direto: depois da primeira sessão é só uma consulta ao cache.
+
+
+# --- TELEMETRIA ---
+def sessao_atual():
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id[:8] if ctx else None
+
+@st.cache_resource
+def obter_coletor():
+    # Spans de Mongo, Gemini, imagem, PDF e reruns; JSON lines em logs/spans.jsonl (SPANS_ARQUIVO = "" desliga o arquivo)
+    return telemetria.Coletor(st.secrets.get("SPANS_ARQUIVO", telemetria.ARQUIVO_PADRAO), contexto=sessao_atual)
+
+# --- DATABASE ENGINE ---
+@st.cache_resource
+def obter_contador_mongo():
+    return ContadorComandos(telemetria.ObservadorComandos(obter_coletor()))
+
+@st.cache_resource
+def iniciar_conexao():
+    try:
+        if "MONGO_USER" not in st.secrets and "MONGO_URI" not in st.secrets:
+            st.error("⚠️ Secrets do MongoDB não configuradas no .streamlit/secrets.toml")
+            return None
+
+        return conectar(st.secrets, event_listeners=[obter_contador_mongo()])
+    except Exception as e:
+        st.error(f"⚠️ Erro de Database: {e}")
+        return None
+
+@st.cache_resource
+def preparar_indices():
+    # Índices (conversas, cuidadores, auditoria, scans, jobs, sessões, agenda) + migração de mensagens e agendamentos antigos, uma vez por processo
+    db = iniciar_conexao()
+    if db is not None:
+        chat.preparar(db)
+        cuidadores.preparar(db)
+        geo.preparar(db)
+        auditoria.preparar(db)
+        scans.preparar(db)
+        jobs.preparar(db)
+        auth.preparar(db)
+        agenda.preparar(db)
+    return True
+
+@st.cache_resource
+def obter_dados():
+    db = iniciar_conexao()
+    return Dados(db) if db is not None else None
+
+@st.cache_resource(on_release=lambda d: d is not None and d.parar())
+def obter_distribuidor():
+    # Um change stream por processo, compartilhado pelas sessões; mensagem nova de outro processo também derruba a lista em cache
+    db, dados = iniciar_conexao(), obter_dados()
+    if db is None:
+        return None
+    d = chat_vivo.Distribuidor(db.mensagens, ao_receber=lambda m: dados.cache.invalidar(m["receiver_id"], "conversas"))
+    d.iniciar()
+    return d
+
+@st.cache_resource
+def obter_chave_sessao():
+    return auth.chave_sessao(iniciar_conexao(), st.secrets)
+
+# --- AI CORE ENGINE ---
+@st.cache_resource
+def obter_ia_router():
+    router = IARouter(chaves_gemini(st.secrets), MOTORES)
+    router.observador = telemetria.observador_ia(obter_coletor())
+    return router
+
+@st.cache_resource
+def obter_scan_cache():
+    db = iniciar_conexao()
+    return ScanCache(db.scan_cache if db is not None else None)
+
+# --- ARTEFATOS DOS SCANS ---
+@st.cache_resource(on_release=lambda a: a.limpar())
+def obter_armazem():
+    # PDFs e miniaturas em disco; a sessão guarda só os ids (ARTEFATOS_DIR / ARTEFATOS_MAX_MB nos secrets)
+    max_mb = st.secrets.get("ARTEFATOS_MAX_MB", artefatos.MAX_BYTES // 2 ** 20)
+    return artefatos.Armazem(st.secrets.get("ARTEFATOS_DIR"), max_bytes=int(max_mb) * 2 ** 20)
@@ -0,0 +1,97 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+# --- CACHE DE RESULTADOS DO PETSCAN ---
+# Chave = hash da imagem já normalizada + prompt + cadeia de modelos (+ contexto
+# do pet, que entra no PDF). Mesma foto reenviada => nenhum call_ia nem PDF novo.
+MAX_ITENS = 256
+TTL_SEGUNDOS = 7 * 24 * 3600
+
+
+def chave_scan(image_bytes, prompt, modelos, *contexto):
+    h = hashlib.sha256()
+    h.update(hashlib.sha256(image_bytes).digest())
+    for parte in (prompt, "|".join(modelos), *contexto):
+        h.update(b"\x00")
+        h.update(str(parte).encode("utf-8"))
+    return h.hexdigest()
+
+
+class ScanCache:
+    def __init__(self, colecao=None, max_itens=MAX_ITENS, ttl=TTL_SEGUNDOS):
+        self.colecao = colecao
+        self.max_itens = max_itens
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.hits_db = 0
+        self.misses = 0
+        self.segundos_poupados = 0.0
+        if colecao is not None:
+            try:
+                colecao.create_index("criado_em", expireAfterSeconds=ttl)
+            except Exception:
+                pass
+
+    def get(self, chave):
+        with self._lock:
+            item = self._mem.get(chave)
+            if item is not None:
+                self._mem.move_to_end(chave)
+                self._contar_hit(item)
+                return item
+
+        if self.colecao is not None:
+            try:
+                doc = self.colecao.find_one({"_id": chave})
+            except Exception:
+                doc = None
+            if doc:
+                item = {"laudo": doc["laudo"], "pdf": bytes(doc["pdf"]), "latencia": doc.get("latencia", 0.0)}
+                with self._lock:
+                    self._guardar(chave, item)
+                    self.hits_db += 1
+                    self._contar_hit(item)
+                return item
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, chave, laudo, pdf, latencia=0.0):
+        item = {"laudo": laudo, "pdf": pdf, "latencia": latencia}
+        with self._lock:
+            self._guardar(chave, item)
+        if self.colecao is not None:
+            try:
+                self.colecao.replace_one(
+                    {"_id": chave},
+                    {"_id": chave, "laudo": laudo, "pdf": pdf, "latencia": latencia, "criado_em": datetime.now()},
+                    upsert=True,
+                )
+            except Exception:
+                pass
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "hits_db": self.hits_db,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "segundos_poupados": self.segundos_poupados,
+                "itens_memoria": len(self._mem),
+            }
+
+    def _contar_hit(self, item):
+        self.hits += 1
+        self.segundos_poupados += item.get("latencia", 0.0)
+
+    def _guardar(self, chave, item):
+        self._mem[chave] = item
+        self._mem.move_to_end(chave)
+        while len(self._mem) > self.max_itens:
+            self._mem.popitem(last=False)
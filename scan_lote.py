@@ -0,0 +1,62 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+
+from imaging import normalize_image
+
+# --- PETSCAN EM LOTE (CANIS / CRIADORES) ---
+# Normalização num pool de threads (o Pillow solta o GIL ao decodificar) e
+# chamadas ao modelo em paralelo; o limite por chave fica no IARouter.
+WORKERS_IMAGEM = min(4, os.cpu_count() or 1)
+
+
+@dataclass
+class ItemLote:
+    indice: int
+    nome: str
+    scan_img: object = None
+    laudo: str = None
+    erro: str = None
+    cache: bool = False
+    latencia: float = 0.0
+    chave: str = None
+
+
+def nome_do_arquivo(arquivo, indice):
+    nome = getattr(arquivo, "name", None) or f"Pet {indice + 1}"
+    return os.path.splitext(os.path.basename(nome))[0]
+
+
+def _analisar(analisar, item):
+    t0 = time.perf_counter()
+    try:
+        item.laudo, item.cache = analisar(item)
+    except Exception as e:
+        item.erro = str(e)
+    item.latencia = time.perf_counter() - t0
+    return item
+
+
+def executar_lote(arquivos, analisar, workers_ia=4, workers_imagem=WORKERS_IMAGEM):
+    """Gera cada `ItemLote` assim que termina, em ordem de conclusão.
+
+    `analisar(item)` roda numa thread do pool e devolve `(laudo, veio_do_cache)`.
+    O consumo (barra de progresso, widgets) fica na thread do script.
+    """
+    itens = [ItemLote(indice=i, nome=nome_do_arquivo(a, i)) for i, a in enumerate(arquivos)]
+    with ThreadPoolExecutor(workers_imagem) as pool_img, ThreadPoolExecutor(max(1, workers_ia)) as pool_ia:
+        normalizando = {pool_img.submit(normalize_image, a): item for a, item in zip(arquivos, itens)}
+        analisando = []
+        for fut in as_completed(normalizando):
+            # tira o future do dict: ele guarda o ScanImage, que assim some quando o consumidor solta o item
+            item = normalizando.pop(fut)
+            try:
+                item.scan_img = fut.result()
+            except Exception as e:
+                item.erro = f"Imagem inválida: {e}"
+                yield item
+                continue
+            analisando.append(pool_ia.submit(_analisar, analisar, item))
+        for fut in as_completed(analisando):
+            yield fut.result()
@@ -0,0 +1,70 @@
+import io
+import re
+from datetime import datetime
+
+from pymongo import ASCENDING, DESCENDING
+
+# --- HISTÓRICO DE SCANS POR PET ---
+# Cada laudo vira um documento em `scans` (campos estruturados + miniatura +
+# texto). O pet guarda agregados pré-calculados (último scan, série de ECC)
+# para o gráfico de tendência não precisar reler scans nem chamar o modelo.
+SERIE_MAX = 52
+THUMB_EDGE = 160
+INSTRUCAO_ESTRUTURA = (
+    " Ao final, inclua exatamente as linhas 'ECC: <1-9>/9' e "
+    "'SINAIS: <sinais de alerta separados por ;>' (ou 'SINAIS: nenhum')."
+)
+_ECC = re.compile(r"(?:ECC|escore(?:\s+de)?(?:\s+condi[çc][ãa]o)?\s+corporal|BCS)\W{0,5}(\d)\s*(?:/\s*9)?", re.IGNORECASE)
+_SINAIS = re.compile(r"^\W*SINAIS\W*:\s*(.+)$", re.IGNORECASE | re.MULTILINE)
+
+
+def preparar(db):
+    db.scans.create_index([("pet_id", ASCENDING), ("dt", DESCENDING)])
+
+
+def extrair_estrutura(laudo):
+    """ECC (1-9 ou None) e lista de sinais sinalizados a partir do texto do modelo."""
+    ecc = None
+    for m in _ECC.finditer(laudo or ""):
+        valor = int(m.group(1))
+        if 1 <= valor <= 9:
+            ecc = valor  # a última menção é a linha estruturada pedida no prompt
+    sinais = []
+    m = _SINAIS.search(laudo or "")
+    if m and m.group(1).strip().strip("*").lower() not in ("nenhum", "nenhum.", "-"):
+        sinais = [s.strip(" *.-") for s in m.group(1).split(";") if s.strip(" *.-")]
+    return ecc, sinais
+
+
+def miniatura(image_bytes, edge=THUMB_EDGE):
+    from PIL import Image  # só quem grava scan paga o import do Pillow
+
+    buf = io.BytesIO()
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        img.draft("RGB", (edge, edge))
+        img.thumbnail((edge, edge))
+        with img.convert("RGB") as rgb:
+            rgb.save(buf, format="JPEG", quality=70)
+    return buf.getvalue()
+
+
+def registrar(db, pet, laudo, image_bytes, chave=None):
+    ecc, sinais = extrair_estrutura(laudo)
+    agora = datetime.now()
+    doc = {
+        "pet_id": pet["_id"], "owner_id": pet["owner_id"], "dt": agora,
+        "ecc": ecc, "sinais": sinais, "laudo": laudo, "thumb": miniatura(image_bytes), "chave": chave,
+    }
+    db.scans.insert_one(doc)
+    atualizacao = {
+        "$set": {"ultimo_scan": {"dt": agora, "ecc": ecc, "sinais": sinais}},
+        "$inc": {"scans_total": 1},
+    }
+    if ecc is not None:
+        atualizacao["$push"] = {"serie_ecc": {"$each": [{"dt": agora, "ecc": ecc}], "$slice": -SERIE_MAX}}
+    db.pets.update_one({"_id": pet["_id"]}, atualizacao)
+    return doc
+
+
+def historico(db, pet_id, n=10):
+    return list(db.scans.find({"pet_id": pet_id}).sort("dt", DESCENDING).limit(n))
@@ -0,0 +1,119 @@
+from datetime import date, timedelta
+
+import streamlit as st
+
+import auditoria
+from componentes import botoes_paginador, paginador, renderizar_abas
+from recursos import iniciar_conexao, obter_coletor, obter_ia_router, obter_scan_cache
+
+# --- 1. ADMIN MASTER ---
+# pandas é importado dentro das abas que montam DataFrame: só entra no processo quando uma delas abre
+def admin_instrucoes():
+    scan_cache = obter_scan_cache()
+    st.markdown("""<div class='instruction-box'><b>Governança Admin Technobolt:</b><br>
+    1. <b>Instruções:</b> Guia de uso.<br>
+    2. <b>Auditoria:</b> Logs de todas as mensagens trocadas.<br>
+    3. <b>Controles:</b> Edição direta da base de usuários.<br>
+    4. <b>Performance:</b> Latência por operação, consultas e reruns lentos.</div>""", unsafe_allow_html=True)
+
+    cs = scan_cache.stats()
+    st.markdown("#### ⚡ Cache PetScan")
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Hits", cs["hits"], f"{cs['hits_db']} via MongoDB", delta_color="off")
+    m2.metric("Misses", cs["misses"])
+    m3.metric("Hit ratio", f"{cs['hit_ratio']:.0%}")
+    m4.metric("Tempo de IA poupado", f"{cs['segundos_poupados']:.1f}s")
+
+    st.markdown("#### 🛰️ Saúde do Roteador Gemini")
+    st.dataframe(obter_ia_router().stats(), use_container_width=True)
+
+@st.fragment
+def admin_auditoria():
+    import pandas as pd
+
+    db = iniciar_conexao()
+    st.subheader("Auditoria de Mensagens")
+    a1, a2, a3 = st.columns([2, 1, 1])
+    periodo = a1.date_input("Período", value=(date.today() - timedelta(days=7), date.today()), key="aud_periodo")
+    a_sender = a2.text_input("Remetente", key="aud_sender").strip().lower()
+    a_receiver = a3.text_input("Destinatário", key="aud_receiver").strip().lower()
+    inicio, fim = (tuple(periodo) + (None, None))[:2]
+    filtro_aud = auditoria.filtro(inicio, fim or inicio, a_sender, a_receiver)
+
+    if db is not None:
+        s1, s2 = st.columns(2)
+        with s1:
+            st.metric("Mensagens no filtro", auditoria.total(db, filtro_aud))
+            dias = auditoria.por_dia(db, filtro_aud)
+            if dias: st.bar_chart(pd.DataFrame(dias).rename(columns={"_id": "dia"}).set_index("dia"))
+        with s2:
+            st.markdown("**Top remetentes**")
+            top = auditoria.top_senders(db, filtro_aud)
+            if top: st.dataframe(pd.DataFrame(top).rename(columns={"_id": "remetente"}), use_container_width=True, hide_index=True)
+        
+        pag = paginador("aud_pag", filtro_aud)
+        logs, proximo = auditoria.pagina(db, filtro_aud, pag["cursores"][-1])
+        if logs: st.dataframe(pd.DataFrame(logs, columns=auditoria.COLUNAS), use_container_width=True, hide_index=True)
+        else: st.info("Sem logs disponíveis.")
+        botoes_paginador(pag, proximo, "aud")
+        
+        e1, e2 = st.columns([1, 3])
+        formato = e1.radio("Exportar", ["CSV", "Parquet"], horizontal=True, key="aud_fmt")
+        with e2:
+            if formato == "CSV":
+                st.download_button("📥 EXPORTAR CSV", data=lambda: auditoria.exportar_csv(db, filtro_aud), file_name="auditoria_mensagens.csv", mime="text/csv")
+            else:
+                st.download_button("📥 EXPORTAR PARQUET", data=lambda: auditoria.exportar_parquet(db, filtro_aud), file_name="auditoria_mensagens.parquet", mime="application/octet-stream")
+
+@st.fragment
+def admin_controles():
+    import pandas as pd
+
+    db = iniciar_conexao()
+    tipo_f = st.selectbox("Perfil", ["Todos", "Tutor", "Cuidador", "Admin"], key="ctl_tipo")
+    tipo_f = None if tipo_f == "Todos" else tipo_f
+    if db is not None:
+        pag = paginador("ctl_pag", tipo_f)
+        usuarios, proximo = auditoria.pagina_usuarios(db, tipo_f, pag["cursores"][-1])
+        if usuarios:
+            df_users = pd.DataFrame(usuarios)
+            df_users['_id'] = df_users['_id'].astype(str)
+            new_df = st.data_editor(df_users, use_container_width=True)
+        botoes_paginador(pag, proximo, "ctl")
+
+@st.fragment
+def admin_performance():
+    import pandas as pd
+
+    coletor = obter_coletor()
+    st.caption(f"Spans deste processo; histórico completo em JSON lines: `{coletor.arquivo or 'desligado'}`")
+    if st.button("🔄 Atualizar", key="perf_atualizar"):
+        coletor.descarregar()
+    st.markdown("#### p50 / p95 por operação")
+    ops = coletor.resumo_operacoes()
+    if ops: st.dataframe(pd.DataFrame(ops), use_container_width=True, hide_index=True)
+    else: st.info("Nenhum span coletado ainda.")
+
+    st.markdown(f"#### 🐢 Consultas lentas (≥ {coletor.limiar_consulta_ms:.0f} ms)")
+    lentas = coletor.recentes(coletor.consultas_lentas)
+    if lentas: st.dataframe(pd.DataFrame([{
+        "quando": c["ts"], "operação": c["nome"], "ms": c["ms"], "filtro": ", ".join(c.get("filtro", [])), "sessão": c["sessao"], "ok": c["ok"],
+    } for c in lentas]), use_container_width=True, hide_index=True)
+    else: st.caption("Nenhuma consulta lenta.")
+
+    st.markdown(f"#### 🐢 Reruns lentos (≥ {coletor.limiar_rerun_ms:.0f} ms)")
+    reruns = coletor.recentes(coletor.reruns_lentos)
+    if reruns: st.dataframe(pd.DataFrame([{
+        "quando": r["ts"], "ms": r["ms"], "sessão": r["sessao"], "usuário": r.get("usuario"), "aba": r.get("aba"),
+        **{f"{tipo} (n / ms)": f"{v['n']} / {v['ms']}" for tipo, v in r["por_tipo"].items()},
+    } for r in reruns]), use_container_width=True, hide_index=True)
+    else: st.caption("Nenhum rerun lento.")
+
+
+def render(user_data):
+    renderizar_abas("abas_admin", {
+        "🏠 Instruções": admin_instrucoes,
+        "💬 Auditoria de Chats": admin_auditoria,
+        "⚙️ Controles Master": admin_controles,
+        "⚡ Performance": admin_performance,
+    })
@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+
+import streamlit as st
+
+import agenda
+import geo
+from componentes import render_chat, renderizar_abas, rerun_fragmento
+from recursos import iniciar_conexao, obter_dados
+
+# --- 2. CUIDADOR MASTER ---
+def cuidador_instrucoes():
+    st.info("Bem-vindo ao painel do Cuidador. Gerencie sua agenda e perfil aqui.")
+
+def cuidador_perfil(user_data):
+    dados = obter_dados()
+    with st.form("perfil_form"):
+        n_n = st.text_input("Nome", value=user_data['nome'])
+        n_a = st.text_input("Endereço", value=user_data.get('endereco', ''))
+        n_v = st.number_input("Valor Diária", value=float(user_data.get('valores', 0)))
+        n_cap = st.number_input("Pets por dia", min_value=1, step=1, value=int(user_data.get('capacidade', agenda.CAPACIDADE_PADRAO)))
+        coords = geo.coordenadas(user_data)
+        n_c = st.text_input("Coordenadas (lat, lon)", value=f"{coords[0]}, {coords[1]}" if coords else "",
+                            help="Cole do Google Maps, ex.: -23.5614, -46.6559. Deixe vazio para sair do 'Perto de mim'.")
+        if st.form_submit_button("ATUALIZAR"):
+            campos = {"nome": n_n, "endereco": n_a, "valores": n_v, "capacidade": int(n_cap)}
+            remover = []
+            if n_c.strip():
+                latlon = geo.parse_coordenadas(n_c)
+                if not latlon:
+                    st.warning("Coordenadas inválidas; use o formato 'lat, lon'. Nada foi salvo.")
+                    return
+                campos["localizacao"] = geo.ponto(*latlon)
+            else:
+                remover.append("localizacao")
+            dados.atualizar_perfil(user_data['usuario'], campos, remover)
+            st.rerun()
+
+@st.fragment
+def cuidador_agenda(user_data):
+    import pandas as pd
+
+    db, dados = iniciar_conexao(), obter_dados()
+    hoje = date.today()
+    cap = int(user_data.get('capacidade', agenda.CAPACIDADE_PADRAO))
+    proximos = agenda.dias(hoje, hoje + timedelta(days=13))
+    ocup = dados.ocupacao(user_data['usuario'], proximos[0], proximos[-1]) if db is not None else {}
+    st.caption(f"Ocupação dos próximos 14 dias (capacidade: {cap} por dia)")
+    st.bar_chart(pd.DataFrame({"Pedidos": [ocup.get(d, 0) for d in proximos]}, index=[f"{d:%d/%m}" for d in proximos]), height=180)
+
+    pedidos = dados.pedidos_pendentes(user_data['usuario']) if db is not None else []
+    if not pedidos: st.write("Nenhum pedido pendente.")
+    else:
+        todos = st.checkbox("Selecionar todos", key="ag_todos")
+        df_ped = pd.DataFrame([{
+            "Selecionar": todos, "Tutor": p['tutor_id'], "Início": p['data'], "Fim": p.get('fim', p['data']), "Dias": p.get('dias', 1),
+        } for p in pedidos])
+        editado = st.data_editor(df_ped, disabled=["Tutor", "Início", "Fim", "Dias"], hide_index=True, use_container_width=True, key=f"ag_sel_{todos}")
+        ids = [p['_id'] for p, marcado in zip(pedidos, editado["Selecionar"]) if marcado]
+        c1, c2 = st.columns(2)
+        if c1.button(f"✅ APROVAR ({len(ids)})", disabled=not ids, key="ag_aprovar"):
+            dados.decidir_agendamentos(user_data['usuario'], ids, agenda.APROVADO)
+            rerun_fragmento()
+        if c2.button(f"❌ REPROVAR ({len(ids)})", disabled=not ids, key="ag_reprovar"):
+            dados.decidir_agendamentos(user_data['usuario'], ids, agenda.REPROVADO)
+            rerun_fragmento()
+
+
+def render(user_data):
+    renderizar_abas("abas_cuidador", {
+        "🏠 Instruções": cuidador_instrucoes,
+        "👤 Perfil": lambda: cuidador_perfil(user_data),
+        "📅 Agendamentos": lambda: cuidador_agenda(user_data),
+        "💬 Mensagens": lambda: render_chat("cuid", user_data['usuario']),
+    })
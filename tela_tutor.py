@@ -0,0 +1,302 @@
+import time
+from datetime import date, timedelta
+
+import streamlit as st
+
+import agenda
+import geo
+import jobs
+from componentes import painel_jobs, render_chat, renderizar_abas, rerun_fragmento
+from ia import PROMPT_SCAN, call_ia, laudo_valido
+from ia_router import MOTORES
+from recursos import iniciar_conexao, obter_armazem, obter_coletor, obter_dados, obter_ia_router, obter_scan_cache
+from scan_cache import chave_scan
+
+# --- 3. TUTOR MASTER ---
+# Pillow/HEIF (imaging), fpdf/fontTools (pdf) e pandas entram só no caminho que usa cada um.
+# Memória por sessão: o resultado do scan fica na sessão só como ids do armazém
+# de artefatos (PDF e miniatura em disco), e o uploader troca de chave depois
+# do scan para o Streamlit soltar os bytes da foto.
+def tutor_instrucoes():
+    st.markdown("""
+    ### Bem-vindo ao TechnoBolt Pets
+    - **PetScan IA:** Envie uma foto do seu pet para análise clínica preliminar.
+    - **Cuidadores:** Encontre profissionais e agende visitas.
+    """)
+
+def liberar_uploader(chave):
+    st.session_state[chave] = st.session_state.get(chave, 0) + 1
+
+def guardar_resultado(armazem, titulo, laudo, pdf_bytes, image_bytes):
+    from scans import miniatura
+
+    anterior = st.session_state.pop("scan_resultado", None)
+    if anterior:
+        armazem.remover(anterior["pdf"], anterior["thumb"])
+    st.session_state.scan_resultado = {
+        "titulo": titulo, "laudo": laudo,
+        "pdf": armazem.guardar(pdf_bytes, ".pdf"), "thumb": armazem.guardar(miniatura(image_bytes, 400), ".jpg"),
+    }
+
+def mostrar_resultado(armazem, resultado):
+    st.markdown(f"#### 🧬 {resultado['titulo']}")
+    thumb = armazem.caminho(resultado["thumb"])
+    if thumb:
+        st.image(thumb, width=400)
+    st.markdown(f"<div class='elite-card'>{resultado['laudo']}</div>", unsafe_allow_html=True)
+    if armazem.existe(resultado["pdf"]):
+        aid = resultado["pdf"]
+        st.download_button("📥 BAIXAR PDF TECHNOBOLT", data=lambda: armazem.ler(aid), file_name="laudo_technobolt.pdf", mime="application/pdf", on_click="ignore")
+    else:
+        st.caption("PDF expirado: execute o scan de novo para gerar outro.")
+
+@st.fragment
+def tutor_scan(user_data, cur_pet, pets):
+    db, dados, coletor, scan_cache, armazem = iniciar_conexao(), obter_dados(), obter_coletor(), obter_scan_cache(), obter_armazem()
+    st.subheader("🧬 Diagnóstico Biométrico Universal")
+    modo_lote = st.toggle("Modo lote (várias fotos / vários animais)")
+    pet_nome = cur_pet['nome'] if cur_pet else "Pet"
+    pet_especie = cur_pet['especie'] if cur_pet else "Geral"
+
+    if modo_lote:
+        ups = st.file_uploader("Amostras (uma foto por animal, nomeie o arquivo com o nome do pet)", type=['jpg', 'png', 'heic'], accept_multiple_files=True, key=f"scan_lote_{st.session_state.get('scan_lote_n', 0)}")
+        if ups and st.button("EXECUTAR SCAN EM LOTE"):
+            from pdf import create_pdf_lote, render_lote
+            from scan_lote import executar_lote
+
+            router = obter_ia_router()
+            pets_por_nome = {p['nome'].lower(): p for p in pets} if db is not None else {}
+            
+            def analisar(item):
+                item.chave = chave = chave_scan(item.scan_img.data, PROMPT_SCAN, MOTORES, item.nome, pet_especie)
+                cached = scan_cache.get(chave)
+                if cached:
+                    return cached["laudo"], True
+                res = call_ia(PROMPT_SCAN, img=item.scan_img.as_part(), router=router)
+                if laudo_valido(res):
+                    # Arquivo com o nome de um pet do tutor entra no histórico dele
+                    pet_item = pets_por_nome.get(item.nome.lower())
+                    if pet_item:
+                        dados.registrar_scan(pet_item, res, item.scan_img.data, chave)
+                return res, False
+            
+            barra = st.progress(0.0, text=f"0/{len(ups)} concluídos")
+            linhas = [st.empty() for _ in ups]
+            for i, l in enumerate(linhas):
+                l.markdown(f"⏳ **{ups[i].name}** — na fila")
+            
+            t0 = time.perf_counter()
+            itens = []
+            for n, item in enumerate(executar_lote(ups, analisar, workers_ia=router.workers_lote), 1):
+                itens.append(item)
+                if item.scan_img is not None:
+                    # normalizado numa thread do pool: o span sai daqui, com os tempos medidos lá
+                    t = item.scan_img.timings
+                    coletor.registrar("imagem", "normalize_image", sum(t.values()) * 1000, lote=True, **{f"{e}_ms": round(v * 1000, 1) for e, v in t.items()})
+                if item.erro:
+                    linhas[item.indice].markdown(f"❌ **{item.nome}** — {item.erro}")
+                else:
+                    origem = "cache" if item.cache else f"{item.latencia:.1f}s"
+                    linhas[item.indice].markdown(f"✅ **{item.nome}** — {origem}")
+                item.scan_img = None  # a chave já foi calculada; os bytes da foto não ficam até o fim do lote
+                barra.progress(n / len(ups), text=f"{n}/{len(ups)} concluídos")
+            total = time.perf_counter() - t0
+            st.caption(f"Lote em {total:.1f}s (soma das análises individuais: {sum(i.latencia for i in itens):.1f}s)")
+            
+            itens = sorted((i for i in itens if not i.erro), key=lambda i: i.indice)
+            # PDFs individuais para o cache saem numa chamada só, fora das threads do modelo
+            novos = [i for i in itens if not i.cache and laudo_valido(i.laudo)]
+            with coletor.span("pdf", "render_lote", relatorios=len(novos)):
+                pdfs = render_lote([(i.nome, pet_especie, "Scan IA", "Análise Visual", i.laudo) for i in novos])
+            for item, pdf_item in zip(novos, pdfs):
+                scan_cache.put(item.chave, item.laudo, pdf_item, item.latencia)
+            del pdfs
+            for item in itens:
+                with st.expander(f"🐾 {item.nome}"):
+                    st.markdown(f"<div class='elite-card'>{item.laudo}</div>", unsafe_allow_html=True)
+            if itens:
+                with coletor.span("pdf", "create_pdf_lote", relatorios=len(itens)):
+                    aid = armazem.guardar(create_pdf_lote([(i.nome, i.laudo) for i in itens], pet_especie, "Scan IA (Lote)", "Análise Visual"), ".pdf")
+                st.download_button("📥 BAIXAR PDF DO LOTE", data=lambda: armazem.ler(aid), file_name="laudos_lote_technobolt.pdf", mime="application/pdf", on_click="ignore")
+            liberar_uploader("scan_lote_n")
+
+    up = None if modo_lote else st.file_uploader("Amostra (Foto do Pet)", type=['jpg', 'png', 'heic'], key=f"scan_up_{st.session_state.get('scan_up_n', 0)}")
+    em_fila = not modo_lote and st.toggle("Processar em segundo plano (a página pode ser recarregada)")
+
+    if up and st.button("EXECUTAR SCAN"):
+        from imaging import normalize_image
+        from pdf import create_pdf_report
+
+        try:
+            with coletor.span("imagem", "normalize_image", bytes_origem=up.size) as attrs:
+                scan_img = normalize_image(up)
+                attrs.update({f"{etapa}_ms": round(s * 1000, 1) for etapa, s in scan_img.timings.items()})
+            
+            chave = chave_scan(scan_img.data, PROMPT_SCAN, MOTORES, pet_nome, pet_especie)
+            cached = scan_cache.get(chave)
+            
+            if cached:
+                res, pdf_bytes = cached["laudo"], cached["pdf"]
+                st.caption("⚡ Resultado recuperado do cache (mesma imagem já analisada).")
+            elif em_fila:
+                jid = jobs.enfileirar(db, "scan", {
+                    "prompt": PROMPT_SCAN, "imagem": scan_img.data, "mime_type": scan_img.mime_type,
+                    "pet_id": cur_pet['_id'] if cur_pet else None, "pet_nome": pet_nome, "pet_especie": pet_especie,
+                }, chave=chave, rotulo=f"{pet_nome} · {up.name}")
+                st.session_state.setdefault("scan_jobs", [])
+                st.session_state.setdefault("scan_jobs_vistos", set())
+                if jid not in st.session_state.scan_jobs:
+                    st.session_state.scan_jobs.append(jid)
+                st.session_state.scan_jobs_pendentes = True
+                liberar_uploader("scan_up_n")
+                st.rerun()
+            else:
+                card = st.empty()
+                partes = []
+                with st.spinner("IA processando biometria..."):
+                    t0 = time.perf_counter()
+                    for parte in call_ia(PROMPT_SCAN, img=scan_img.as_part(), stream=True):
+                        partes.append(parte)
+                        card.markdown(f"<div class='elite-card'>{''.join(partes)}</div>", unsafe_allow_html=True)
+                    latencia = time.perf_counter() - t0
+                card.empty()  # o laudo completo sai abaixo, pelo mesmo caminho do resultado guardado
+                res = "".join(partes)
+                with coletor.span("pdf", "create_pdf_report"):
+                    pdf_bytes = create_pdf_report(pet_nome, pet_especie, "Scan IA", "Análise Visual", res)
+                if laudo_valido(res):
+                    scan_cache.put(chave, res, pdf_bytes, latencia)
+                    if cur_pet:
+                        dados.registrar_scan(cur_pet, res, scan_img.data, chave)
+            
+            guardar_resultado(armazem, f"{pet_nome} · {up.name}", res, pdf_bytes, scan_img.data)
+            del scan_img, pdf_bytes
+            liberar_uploader("scan_up_n")
+            
+        except Exception as e:
+            st.error(f"Erro ao processar imagem: {e}")
+
+    if not modo_lote and "scan_resultado" in st.session_state:
+        mostrar_resultado(armazem, st.session_state.scan_resultado)
+
+    painel_jobs(user_data['usuario'])
+
+    if cur_pet and db is not None:
+        # o cur_pet veio do último rerun completo: um scan feito neste fragmento já mudou a série
+        cur_pet = next((p for p in dados.pets(user_data['usuario']) if p['_id'] == cur_pet['_id']), cur_pet)
+        st.divider()
+        st.markdown(f"### 📈 Histórico de {cur_pet['nome']}")
+        serie = cur_pet.get('serie_ecc', [])
+        if serie:
+            import pandas as pd
+
+            st.line_chart(pd.DataFrame(serie).set_index("dt")["ecc"], y_label="ECC (1-9)")
+        ultimo = cur_pet.get('ultimo_scan')
+        if ultimo:
+            sinais = ", ".join(ultimo['sinais']) or "nenhum"
+            st.caption(f"Último scan: {ultimo['dt']:%d/%m/%Y %H:%M} · ECC {ultimo['ecc'] or '?'}/9 · sinais: {sinais} · {cur_pet.get('scans_total', 0)} scans no total")
+            for sc in dados.historico_scans(cur_pet):
+                with st.expander(f"🧬 {sc['dt']:%d/%m/%Y %H:%M} — ECC {sc['ecc'] or '?'}/9"):
+                    h1, h2 = st.columns([1, 4])
+                    h1.image(sc['thumb'])
+                    h2.markdown(sc['laudo'])
+        else:
+            st.caption("Nenhum scan salvo para este pet ainda.")
+
+    st.divider()
+    st.markdown("### 📊 Guia de Referência Clínica")
+
+    st.markdown("""
+    > **Nota:** O Escore de Condição Corporal (ECC) varia de 1 a 9.
+    > - **1-3:** Abaixo do peso
+    > - **4-5:** Ideal
+    > - **6-9:** Acima do peso
+
+    *[Referência Visual: Consulte seu veterinário para exames presenciais]*
+    """)
+    # Diagrama para contexto clínico
+    st.markdown("""
+
+
+[Image of body condition score chart for dogs and cats]
+
+    """)
+
+@st.fragment
+def tutor_cuidadores(user_data):
+    db, dados = iniciar_conexao(), obter_dados()
+    perto = st.toggle("📍 Perto de mim")
+    if perto:
+        g1, g2 = st.columns([3, 2])
+        minha_pos = geo.parse_coordenadas(g1.text_input("Minha localização (lat, lon)", key="geo_pos"))
+        raio = g2.slider("Raio (km)", 1, 50, geo.RAIO_PADRAO_KM, key="geo_raio")
+        pagina = 0
+        lista_cuid = dados.cuidadores_proximos(*minha_pos, raio) if minha_pos and db is not None else []
+        if not minha_pos: st.caption("Informe suas coordenadas para ver cuidadores próximos.")
+        elif not lista_cuid: st.info(f"Nenhum cuidador em até {raio} km.")
+    else:
+        f1, f2, f3, f4 = st.columns([3, 1, 1, 2])
+        busca = f1.text_input("Buscar por nome ou endereço", key="cb_texto").strip()
+        preco_min = f2.number_input("Diária mín.", min_value=0.0, value=0.0, step=10.0, key="cb_min")
+        preco_max = f3.number_input("Diária máx.", min_value=0.0, value=0.0, step=10.0, key="cb_max", help="0 = sem limite")
+        ordens = {"rating": "⭐ Melhor avaliação", "preco_asc": "💲 Menor diária", "preco_desc": "💰 Maior diária"}
+        ordem = f4.selectbox("Ordenar por", list(ordens), format_func=ordens.get, key="cb_ordem")
+        
+        filtros = {"texto": busca or None, "preco_min": preco_min or None, "preco_max": preco_max or None, "ordem": ordem}
+        if st.session_state.get("cb_filtros") != filtros:
+            st.session_state.cb_filtros = filtros
+            st.session_state.cb_pagina = 0
+        pagina = st.session_state.get("cb_pagina", 0)
+        
+        lista_cuid, tem_mais = dados.buscar_cuidadores(pagina=pagina, **filtros) if db is not None else ([], False)
+        if not lista_cuid: st.info("Nenhum cuidador encontrado com esses filtros.")
+
+    for c in lista_cuid:
+        dist = f" · {c['distancia_m'] / 1000:.1f} km" if 'distancia_m' in c else ""
+        st.markdown(f"<div class='elite-card'><h3>{c['nome']}</h3><p>📍 {c.get('endereco', 'Não informado')}{dist} | R$ {c.get('valores', 0)}/dia | ⭐ {c.get('rating', 0):.1f}</p></div>", unsafe_allow_html=True)
+
+    if not perto:
+        p1, p2, p3 = st.columns([1, 2, 1])
+        if p1.button("⬅️ Anterior", disabled=pagina == 0, key="cb_prev"):
+            st.session_state.cb_pagina = pagina - 1
+            rerun_fragmento()
+        p2.caption(f"Página {pagina + 1}")
+        if p3.button("Próxima ➡️", disabled=not tem_mais, key="cb_next"):
+            st.session_state.cb_pagina = pagina + 1
+            rerun_fragmento()
+
+    # Chat/agenda só para o cuidador aberto, não um conjunto de widgets por card
+    por_usuario = {c['usuario']: c for c in lista_cuid}
+    aberto = st.selectbox("Abrir cuidador", [None] + list(por_usuario), format_func=lambda u: "—" if u is None else por_usuario[u]['nome'], key=f"cb_aberto_{pagina}")
+    if aberto:
+        c = por_usuario[aberto]
+        c1, c2 = st.columns(2)
+        with c1:
+            with st.expander("💬 Chat", expanded=True):
+                txt = st.text_area("Mensagem", key=f"t_{c['usuario']}")
+                if st.button("Enviar", key=f"s_{c['usuario']}"):
+                    dados.enviar_mensagem(user_data['usuario'], c['usuario'], txt)
+                    st.success("Enviado!")
+        with c2:
+            with st.expander("📅 Agendar", expanded=True):
+                cap = int(c.get('capacidade') or agenda.CAPACIDADE_PADRAO)
+                hoje = date.today()
+                lotados = sorted(d for d, n in dados.ocupacao(c['usuario'], hoje, hoje + timedelta(days=13)).items() if n >= cap)
+                st.caption("Sem vaga em: " + ", ".join(f"{d:%d/%m}" for d in lotados) if lotados else "Agenda livre nos próximos 14 dias")
+                periodo = st.date_input("Período", value=(hoje, hoje), min_value=hoje, key=f"d_{c['usuario']}")
+                if st.button("Solicitar", key=f"r_{c['usuario']}", disabled=not periodo):
+                    try:
+                        dados.solicitar_agendamento(user_data['usuario'], c['usuario'], periodo[0], periodo[-1], cap)
+                        st.success("Solicitado!")
+                    except agenda.DiaLotado as e:
+                        st.error(f"{e}. Escolha outro período.")
+                    except ValueError as e:
+                        st.warning(str(e))
+
+
+def render(user_data, cur_pet, pets):
+    renderizar_abas("abas_tutor", {
+        "🏠 Instruções": tutor_instrucoes,
+        "🧬 PetScan IA": lambda: tutor_scan(user_data, cur_pet, pets),
+        "🤝 Cuidadores": lambda: tutor_cuidadores(user_data),
+        "💬 Chats": lambda: render_chat("tut", user_data['usuario']),
+    })
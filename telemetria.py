@@ -0,0 +1,155 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime
+
+from ia_router import percentil
+
+# --- TELEMETRIA (SPANS POR RERUN E POR SESSÃO) ---
+# Um coletor por processo (st.cache_resource). Cada operação medida vira um
+# span {tipo, nome, ms, ok, ...}: comandos do MongoDB (command monitoring),
+# tentativas do Gemini por modelo (latência, tokens, falhas), decode de
+# imagem, PDF e o próprio rerun. Em memória ficam só janelas curtas para o
+# painel do Admin; o histórico completo vai em JSON lines para análise offline.
+ARQUIVO_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "spans.jsonl")
+MAX_ARQUIVO = 50 * 2 ** 20  # rotaciona para .1 acima disso
+JANELA_OPERACAO = 500
+MAX_LENTOS = 50
+LIMIAR_CONSULTA_MS = 100.0
+LIMIAR_RERUN_MS = 1000.0
+
+
+class Coletor:
+    def __init__(self, arquivo=ARQUIVO_PADRAO, contexto=None, limiar_consulta_ms=LIMIAR_CONSULTA_MS, limiar_rerun_ms=LIMIAR_RERUN_MS):
+        self.arquivo = arquivo
+        self.contexto = contexto or (lambda: None)  # -> id da sessão (ou None fora de uma sessão)
+        self.limiar_consulta_ms = limiar_consulta_ms
+        self.limiar_rerun_ms = limiar_rerun_ms
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._operacoes = defaultdict(lambda: {"ms": deque(maxlen=JANELA_OPERACAO), "n": 0, "falhas": 0})
+        self.consultas_lentas = deque(maxlen=MAX_LENTOS)
+        self.reruns_lentos = deque(maxlen=MAX_LENTOS)
+        self._saida = None
+        if arquivo:
+            os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+            self._saida = open(arquivo, "a", encoding="utf-8", buffering=2 ** 16)
+            atexit.register(self.descarregar)
+
+    # --- spans ---
+    def registrar(self, tipo, nome, ms, ok=True, **attrs):
+        rerun = getattr(self._local, "rerun", None)
+        span = {"ts": datetime.now().isoformat(timespec="milliseconds"), "sessao": self.contexto(), "rerun": rerun,
+                "tipo": tipo, "nome": nome, "ms": round(ms, 3), "ok": ok, **attrs}
+        if rerun is not None:
+            soma = self._local.somas[tipo]
+            soma[0] += 1
+            soma[1] += ms
+        with self._lock:
+            op = self._operacoes[(tipo, nome)]
+            op["ms"].append(ms)
+            op["n"] += 1
+            op["falhas"] += not ok
+            if tipo == "mongo" and ms >= self.limiar_consulta_ms:
+                self.consultas_lentas.append(span)
+            if self._saida:
+                self._saida.write(json.dumps(span, ensure_ascii=False, default=str) + "\n")
+        return span
+
+    @contextmanager
+    def span(self, tipo, nome, **attrs):
+        """Mede o bloco; exceção vira span com ok=False e continua subindo."""
+        t0 = time.perf_counter()
+        try:
+            yield attrs
+        except Exception as e:
+            self.registrar(tipo, nome, (time.perf_counter() - t0) * 1000, ok=False, erro=type(e).__name__, **attrs)
+            raise
+        self.registrar(tipo, nome, (time.perf_counter() - t0) * 1000, **attrs)
+
+    # --- reruns ---
+    def iniciar_rerun(self):
+        self._local.rerun = f"{time.time_ns():x}"
+        self._local.inicio = time.perf_counter()
+        self._local.somas = defaultdict(lambda: [0, 0.0])
+
+    def fim_rerun(self, **attrs):
+        """Fecha o rerun da thread atual: span `rerun` com o total por tipo e descarrega o arquivo."""
+        if getattr(self._local, "rerun", None) is None:
+            return None
+        ms = (time.perf_counter() - self._local.inicio) * 1000
+        por_tipo = {t: {"n": n, "ms": round(s, 1)} for t, (n, s) in self._local.somas.items()}
+        span = self.registrar("rerun", "script", ms, por_tipo=por_tipo, **attrs)
+        self._local.rerun = None
+        if ms >= self.limiar_rerun_ms:
+            with self._lock:
+                self.reruns_lentos.append(span)
+        self.descarregar()
+        return span
+
+    def descarregar(self):
+        with self._lock:
+            if not self._saida:
+                return
+            self._saida.flush()
+            if self._saida.tell() > MAX_ARQUIVO:
+                self._saida.close()
+                os.replace(self.arquivo, self.arquivo + ".1")
+                self._saida = open(self.arquivo, "a", encoding="utf-8", buffering=2 ** 16)
+
+    # --- painel ---
+    def resumo_operacoes(self):
+        with self._lock:
+            itens = [(k, list(op["ms"]), op["n"], op["falhas"]) for k, op in self._operacoes.items()]
+        linhas = [{
+            "tipo": tipo, "operação": nome, "chamadas": n, "falhas": falhas,
+            "p50_ms": round(percentil(ms, 0.5), 1), "p95_ms": round(percentil(ms, 0.95), 1), "máx_ms": round(max(ms), 1),
+        } for (tipo, nome), ms, n, falhas in itens if ms]
+        return sorted(linhas, key=lambda l: l["p95_ms"], reverse=True)
+
+    def recentes(self, fila):
+        with self._lock:
+            return list(reversed(fila))
+
+
+class ObservadorComandos:
+    """Parte do CommandListener que vira spans `mongo` (coleção e chaves do filtro, nunca valores)."""
+
+    def __init__(self, coletor):
+        self.coletor = coletor
+        self._pendentes = {}
+
+    def started(self, event):
+        cmd = event.command
+        colecao = cmd.get(event.command_name)
+        filtro = cmd.get("filter") or cmd.get("q") or {}
+        self._pendentes[event.request_id] = (
+            colecao if isinstance(colecao, str) else event.database_name,
+            sorted(filtro) if isinstance(filtro, dict) else [],
+        )
+
+    def _fechar(self, event, ok):
+        colecao, chaves = self._pendentes.pop(event.request_id, (event.database_name, []))
+        self.coletor.registrar("mongo", f"{event.command_name} {colecao}", event.duration_micros / 1000, ok=ok, filtro=chaves)
+
+    def succeeded(self, event):
+        self._fechar(event, True)
+
+    def failed(self, event):
+        self._fechar(event, False)
+
+
+def observador_ia(coletor):
+    """Callback para `IARouter.observador`: um span por tentativa (modelo, chave, tokens, erro)."""
+    def observar(motor, chave, latencia, erro=None, tokens=None):
+        attrs = {"chave": chave}
+        if tokens:
+            attrs["tokens_entrada"], attrs["tokens_saida"] = tokens
+        if erro is not None:
+            attrs["erro"] = type(erro).__name__
+        coletor.registrar("ia", motor, (latencia or 0.0) * 1000, ok=erro is None, **attrs)
+    return observar
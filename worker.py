@@ -0,0 +1,115 @@
+"""Worker da fila de jobs do TechnoBolt Pets (scans de IA + PDF).
+
+Uso: python worker.py [--threads 4] [--poll 1.0]
+
+Lê as mesmas credenciais do app (.streamlit/secrets.toml ou variáveis de
+ambiente MONGO_* / GEMINI_CHAVE_*). Rode quantos processos quiser: a reserva
+dos jobs é atômica e com lease, independente das sessões web.
+"""
+import argparse
+import logging
+import os
+import socket
+import threading
+import time
+
+from pymongo.errors import PyMongoError
+
+import jobs
+import scans
+from db import carregar_secrets, conectar
+from ia_router import SAFE_CONFIG, IARouter, MOTORES, chaves_gemini
+from pdf import create_pdf_report
+from scan_cache import ScanCache
+
+log = logging.getLogger("technobolt.worker")
+ESPERA_MAX_MONGO = 30.0
+
+
+def executar_scan(db, router, cache, job):
+    p = job["payload"]
+    t0 = time.perf_counter()
+    laudo = router.gerar([p["prompt"], {"mime_type": p["mime_type"], "data": p["imagem"]}], safety_settings=SAFE_CONFIG)
+    latencia = time.perf_counter() - t0
+    pdf_bytes = create_pdf_report(p["pet_nome"], p["pet_especie"], "Scan IA", "Análise Visual", laudo)
+    if p.get("pet_id"):
+        pet = db.pets.find_one({"_id": p["pet_id"]})
+        if pet:
+            scans.registrar(db, pet, laudo, p["imagem"], job.get("chave"))
+    if job.get("chave"):
+        cache.put(job["chave"], laudo, pdf_bytes, latencia)
+    return {"laudo": laudo, "pdf": pdf_bytes, "latencia": latencia}
+
+
+EXECUTORES = {"scan": executar_scan}
+
+
+def loop(db, router, cache, worker_id, poll, parar):
+    # Erro do MongoDB (ex.: AutoReconnect) não derruba a thread: espera com backoff e tenta de novo
+    erros_mongo = 0
+    while not parar.is_set():
+        try:
+            job = jobs.reservar(db, worker_id)
+        except PyMongoError as e:
+            erros_mongo += 1
+            espera = min(ESPERA_MAX_MONGO, jobs.backoff(erros_mongo, base=poll))
+            log.warning("reserva falhou (%s); nova tentativa em %.1fs", e, espera)
+            parar.wait(espera)
+            continue
+        erros_mongo = 0
+        if job is None:
+            parar.wait(poll)
+            continue
+        log.info("job %s (%s) tentativa %s", job["_id"], job["tipo"], job["tentativas"])
+        try:
+            resultado = EXECUTORES[job["tipo"]](db, router, cache, job)
+        except Exception as e:
+            log.warning("job %s falhou: %s", job["_id"], e)
+            resultado, erro = None, e
+        else:
+            erro = None
+        try:
+            if erro is None:
+                jobs.concluir(db, job, resultado)
+            else:
+                jobs.falhar(db, job, erro)
+        except PyMongoError as e:
+            # o job continua "executando": quando o lease vencer, este ou outro worker refaz
+            log.warning("job %s: não foi possível gravar o resultado (%s)", job["_id"], e)
+            parar.wait(min(ESPERA_MAX_MONGO, poll))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threads", type=int, default=4)
+    ap.add_argument("--poll", type=float, default=1.0)
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(threadName)s %(message)s")
+
+    secrets = carregar_secrets()
+    db = conectar(secrets)
+    jobs.preparar(db)
+    router = IARouter(chaves_gemini(secrets), MOTORES)
+    cache = ScanCache(db.scan_cache)
+    base_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    parar = threading.Event()
+    threads = [
+        threading.Thread(target=loop, args=(db, router, cache, f"{base_id}:{i}", args.poll, parar), name=f"worker-{i}")
+        for i in range(args.threads)
+    ]
+    for t in threads:
+        t.start()
+    log.info("%d threads consumindo a fila de jobs", len(threads))
+    try:
+        while any(t.is_alive() for t in threads):
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        log.info("encerrando (aguardando jobs em andamento)...")
+        parar.set()
+        for t in threads:
+            t.join()
+
+
+if __name__ == "__main__":
+    main()